@@ -0,0 +1,239 @@
+"""Benchmarks for the hot paths of streamlit_app.py on synthetic warranty data
+
+Generates month sheets with the real schema at several sizes, times the loading,
+filtering, summary, comparison and export functions, and writes the timings to a
+JSON file. Pass a previous results file with --compare to flag regressions:
+
+    $ python benchmark.py --sizes 10000 100000 1000000 --output benchmark_results.json
+    $ python benchmark.py --compare benchmark_results.json --output latest_results.json
+"""
+import argparse
+import ast
+import json
+import logging
+import os
+import platform
+import statistics
+import sys
+import time
+import types
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+from streamlit import config as streamlit_config
+from streamlit import logger as streamlit_logger
+
+from mock_apps_script import ITEM_CATEGORIES
+
+DASHBOARD_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'streamlit_app.py')
+
+# Months the generated rows are spread over; the last two are compared
+BENCHMARK_MONTHS = ['2025 OCT', '2025 NOV', '2025 DECEMBER']
+
+# Dimension cardinalities of the generated data, close to the production sheets
+BDM_COUNT = 6
+RBM_COUNT = 36
+STORE_COUNT = 360
+STAFF_PER_STORE = 8
+
+# Module level statements of the dashboard that only define things
+DEFINITION_NODES = (ast.Import, ast.ImportFrom, ast.FunctionDef, ast.ClassDef, ast.Assign, ast.AnnAssign)
+
+def load_dashboard(path=DASHBOARD_PATH):
+    """Run the dashboard's imports, functions and constants without building the page"""
+    # The page itself is plain module-level Streamlit code, so only the definitions are executed
+    with open(path, encoding='utf-8') as source_file:
+        tree = ast.parse(source_file.read(), path)
+    tree.body = [node for node in tree.body if isinstance(node, DEFINITION_NODES)]
+
+    module = types.ModuleType('streamlit_app')
+    module.__file__ = path
+    exec(compile(tree, path, 'exec'), module.__dict__)
+    return module
+
+def silence_streamlit_logs():
+    """Hide the warnings every Streamlit call logs when there is no `streamlit run` runtime"""
+    # The config is parsed lazily and resets the log level when it is, so parse it first
+    streamlit_config.get_option('logger.level')
+    streamlit_logger.set_log_level(logging.ERROR)
+
+def generate_month(rows, seed):
+    """Build one raw month sheet with the dashboard's required columns"""
+    rng = np.random.default_rng(seed)
+
+    # Staff belong to one store, stores to one RBM and RBMs to one BDM
+    store_ids = rng.integers(0, STORE_COUNT, rows)
+    staff_ids = store_ids * STAFF_PER_STORE + rng.integers(0, STAFF_PER_STORE, rows)
+    rbm_ids = store_ids % RBM_COUNT
+    bdm_ids = rbm_ids % BDM_COUNT
+
+    store_names = [f"{'FUTURE' if store % 4 == 0 else 'STORE'} {store:03d}" for store in range(STORE_COUNT)]
+    staff_names = [f"STAFF {store:03d}-{member + 1}" for store in range(STORE_COUNT) for member in range(STAFF_PER_STORE)]
+
+    total_count = rng.integers(1, 6, rows)
+    warranty_count = rng.binomial(total_count, 0.3)
+    return pd.DataFrame({
+        'Item Category': pd.Categorical.from_codes(rng.integers(0, len(ITEM_CATEGORIES), rows), ITEM_CATEGORIES),
+        'BDM': pd.Categorical.from_codes(bdm_ids, [f"BDM {number + 1}" for number in range(BDM_COUNT)]),
+        'RBM': pd.Categorical.from_codes(rbm_ids, [f"RBM {number + 1}" for number in range(RBM_COUNT)]),
+        'Store': pd.Categorical.from_codes(store_ids, store_names),
+        'Staff Name': pd.Categorical.from_codes(staff_ids, staff_names),
+        'TotalSoldPrice': total_count * rng.integers(1000, 60000, rows),
+        'WarrantyPrice': warranty_count * rng.integers(99, 2500, rows),
+        'TotalCount': total_count,
+        'WarrantyCount': warranty_count
+    })
+
+def generate_months(total_rows, months=BENCHMARK_MONTHS, seed=0):
+    """Spread total_rows over the benchmark months, returning {month: raw sheet}"""
+    rows_per_month = max(1, total_rows // len(months))
+    return {month: generate_month(rows_per_month, seed + number) for number, month in enumerate(months)}
+
+def time_call(func, repeat, setup=None):
+    """Return the wall-clock seconds of `repeat` calls; setup() runs untimed and its result is passed in"""
+    timings = []
+    for _ in range(repeat):
+        args = setup() if setup else ()
+        started = time.perf_counter()
+        func(*args)
+        timings.append(time.perf_counter() - started)
+    return timings
+
+def benchmark_size(app, total_rows, repeat):
+    """Time every hot function on one generated dataset, returning a list of result dicts"""
+    raw_months = generate_months(total_rows)
+    results = []
+
+    def record(name, timings, **details):
+        results.append({
+            'rows': total_rows,
+            'function': name,
+            'best_s': min(timings),
+            'median_s': statistics.median(timings),
+            'repeat': len(timings),
+            **details
+        })
+
+    # Load post-processing, over every month as the dashboard does
+    record('process_month_data', time_call(
+        lambda frames: [app.process_month_data(frame, month) for month, frame in frames.items()],
+        repeat,
+        setup=lambda: ({month: frame.copy() for month, frame in raw_months.items()},)
+    ))
+    processed = [app.process_month_data(frame.copy(), month) for month, frame in raw_months.items()]
+    combined = pd.concat(app.unify_categories(processed), ignore_index=True)
+
+    record('build_measure_cube', time_call(lambda: app.build_measure_cube(combined), repeat))
+    cube = app.build_measure_cube(combined)
+    month_cubes = app.split_cube_by_month(cube)
+
+    # Filters: the index is built once per frame, then every rerun only intersects positions
+    filters = {
+        'selected_bdm': 'All',
+        'selected_rbm': 'RBM 3',
+        'selected_store': 'All',
+        'selected_category': 'All',
+        'selected_staff': 'All',
+        'replacement_filter': False,
+        'speaker_filter': False,
+        'future_filter': True
+    }
+    record('build_filter_index', time_call(lambda: app.build_filter_index(cube), repeat))
+    app.get_filter_index(cube)
+    record('apply_comparison_filters', time_call(
+        lambda: app.apply_comparison_filters(cube, filters, 'Item Category', False, False), repeat
+    ), cube_rows=len(cube))
+
+    no_filters = dict(filters, selected_rbm='All', future_filter=False)
+    for summary in [
+        'create_product_monthly_summary',
+        'create_rbm_monthly_summary',
+        'create_rbm_monthly_value_conversion_summary',
+        'create_product_monthly_value_conversion_summary'
+    ]:
+        summary_function = getattr(app, summary)
+        record(summary, time_call(
+            lambda: summary_function(month_cubes, no_filters, 'Item Category', False, False), repeat
+        ))
+
+    current, baseline = BENCHMARK_MONTHS[-1], BENCHMARK_MONTHS[-2]
+    record('calculate_comparison', time_call(lambda: app.calculate_comparison(cube, current, baseline), repeat))
+
+    # Exports work on the staff table, the largest table on the page
+    staff_table = app.add_ratio_metrics(
+        cube.groupby(['Staff Name', 'Store'], observed=True)[app.MEASURE_COLUMNS].sum().reset_index()
+    )
+    record('add_total_row', time_call(
+        lambda: app.add_total_row(staff_table, ['Staff Name', 'Store'], app.MEASURE_COLUMNS), repeat
+    ), table_rows=len(staff_table))
+
+    build_excel_workbook = getattr(app.build_excel_workbook, '__wrapped__', app.build_excel_workbook)
+    record('build_excel_workbook', time_call(
+        lambda: build_excel_workbook('benchmark', [('Staff Performance', staff_table)]), repeat
+    ), table_rows=len(staff_table))
+    record('table_to_csv_gz', time_call(lambda: app.table_to_csv_gz(staff_table), repeat), table_rows=len(staff_table))
+    record('table_to_parquet', time_call(lambda: app.table_to_parquet(staff_table), repeat), table_rows=len(staff_table))
+
+    return results
+
+def compare_results(results, baseline, tolerance):
+    """Return the results that got slower than the baseline by more than tolerance"""
+    baseline_times = {(entry['rows'], entry['function']): entry['best_s'] for entry in baseline['results']}
+    regressions = []
+    for entry in results:
+        previous = baseline_times.get((entry['rows'], entry['function']))
+        if previous and entry['best_s'] > previous * (1 + tolerance):
+            regressions.append({**entry, 'baseline_s': previous, 'slowdown': entry['best_s'] / previous})
+    return regressions
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000, 1000000], help='Total generated rows per run')
+    parser.add_argument('--repeat', type=int, default=3, help='Timed calls per function')
+    parser.add_argument('--output', default='benchmark_results.json', help='Where to write the results')
+    parser.add_argument('--compare', help='Previous results file to check for regressions; must differ from --output')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='Allowed slowdown before a result counts as a regression')
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+
+    # The baseline is read up front, so writing this run's results can never replace it
+    baseline = None
+    if args.compare:
+        if os.path.realpath(args.compare) == os.path.realpath(args.output):
+            sys.exit(f"--compare and --output both point at {args.compare}; pass a different --output for this run")
+        with open(args.compare, encoding='utf-8') as baseline_file:
+            baseline = json.load(baseline_file)
+
+    silence_streamlit_logs()
+    app = load_dashboard()
+
+    results = []
+    for total_rows in args.sizes:
+        for entry in benchmark_size(app, total_rows, args.repeat):
+            results.append(entry)
+            print(f"{entry['rows']:>9,} rows  {entry['function']:<50} {entry['best_s'] * 1000:>10.1f} ms")
+
+    report = {
+        'created_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'results': results
+    }
+    with open(args.output, 'w', encoding='utf-8') as output_file:
+        json.dump(report, output_file, indent=2)
+    print(f"Results written to {args.output}")
+
+    if baseline is not None:
+        regressions = compare_results(results, baseline, args.tolerance)
+        for entry in regressions:
+            print(f"REGRESSION {entry['rows']:,} rows {entry['function']}: "
+                  f"{entry['baseline_s'] * 1000:.1f} ms -> {entry['best_s'] * 1000:.1f} ms ({entry['slowdown']:.2f}x)")
+        if regressions:
+            sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,143 @@
+"""Load test of the dashboard's sheet loading path against the Apps Script stand-in
+
+Simulates concurrent dashboard sessions, each loading its months the way a cold
+dashboard load does: the sheets are fetched in parallel through a retrying HTTP session
+of the load's own (the dashboard builds one per rerun) and processed with
+process_month_data. Reports p50/p95/p99 load latency.
+Without --url an in-process mock_apps_script server is started with the given faults:
+
+    $ python load_test.py --sessions 20 --loads 3 --error-rate 0.2 --retry-after 1
+    $ python load_test.py --url http://127.0.0.1:8765/exec --sessions 50 --sheets "2025 NOV" "2025 DECEMBER"
+"""
+import argparse
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from benchmark import load_dashboard, silence_streamlit_logs
+from mock_apps_script import add_data_arguments, add_fault_arguments, create_server, faults_from_args, store_from_args
+
+# Percentiles reported for the load latencies
+LATENCY_PERCENTILES = [50, 95, 99]
+
+def load_months(app, sheet_names):
+    """Fetch and process sheets like a cold dashboard load, returning the names that failed"""
+    # Every dashboard rerun builds its own session, so connections are set up per load and not shared
+    with app.make_http_session() as http:
+        def load_sheet(sheet_name):
+            df = app.fetch_data_from_sheets(sheet_name, http=http)
+            return df is not None and app.process_month_data(df, sheet_name) is not None
+
+        workers = max(1, min(app.MAX_CONCURRENT_FETCHES, len(sheet_names)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            loaded = list(executor.map(load_sheet, sheet_names))
+    return [sheet_name for sheet_name, ok in zip(sheet_names, loaded) if not ok]
+
+def run_session(app, session_number, sheet_names, loads, start_at):
+    """Run one simulated session's loads back to back, returning a result dict per load"""
+    time.sleep(max(0.0, start_at - time.monotonic()))
+    results = []
+    for load_number in range(loads):
+        started = time.perf_counter()
+        failed_sheets = load_months(app, sheet_names)
+        results.append({
+            'session': session_number,
+            'load': load_number,
+            'latency_s': time.perf_counter() - started,
+            'failed_sheets': failed_sheets
+        })
+    return results
+
+def latency_summary(latencies):
+    """Return count, mean, max and the LATENCY_PERCENTILES of a list of seconds"""
+    if not latencies:
+        return {'count': 0}
+    summary = {'count': len(latencies), 'mean_s': float(np.mean(latencies)), 'max_s': float(np.max(latencies))}
+    for percentile, value in zip(LATENCY_PERCENTILES, np.percentile(latencies, LATENCY_PERCENTILES)):
+        summary[f'p{percentile}_s'] = float(value)
+    return summary
+
+def format_summary(label, summary):
+    if not summary['count']:
+        return f"{label:<12} no loads"
+    percentiles = '  '.join(f"p{percentile} {summary[f'p{percentile}_s']:7.2f} s" for percentile in LATENCY_PERCENTILES)
+    return f"{label:<12} {summary['count']:>5} loads  {percentiles}  max {summary['max_s']:7.2f} s"
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--url', help='Apps Script endpoint to load from; starts an in-process stand-in server when omitted')
+    parser.add_argument('--sessions', type=int, default=10, help='Concurrent dashboard sessions')
+    parser.add_argument('--loads', type=int, default=3, help='Data loads per session')
+    parser.add_argument('--sheets', nargs='+', help='Sheets each load fetches (default: every month, like "All")')
+    parser.add_argument('--ramp-up', type=float, default=0.0, help='Seconds over which session starts are spread')
+    parser.add_argument('--client-timeout', type=float, help="Override the app's FETCH_TIMEOUT in seconds")
+    parser.add_argument('--output', help='Write the per-load results and summaries to this JSON file')
+    server_options = parser.add_argument_group('stand-in server', 'Used only when --url is omitted')
+    add_data_arguments(server_options)
+    add_fault_arguments(server_options)
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+
+    silence_streamlit_logs()
+    app = load_dashboard()
+
+    server = faults = None
+    if args.url:
+        app.APPS_SCRIPT_URL = args.url
+    else:
+        faults = faults_from_args(args)
+        server = create_server('127.0.0.1', 0, store_from_args(args), faults)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        app.APPS_SCRIPT_URL = f"http://127.0.0.1:{server.server_address[1]}/exec"
+    if args.client_timeout is not None:
+        app.FETCH_TIMEOUT = args.client_timeout
+
+    sheet_names = args.sheets or app.SHEETS
+    print(f"{args.sessions} sessions x {args.loads} loads of {len(sheet_names)} sheets from {app.APPS_SCRIPT_URL}")
+
+    try:
+        started = time.monotonic()
+        with ThreadPoolExecutor(max_workers=args.sessions) as executor:
+            futures = [
+                executor.submit(run_session, app, number, sheet_names, args.loads, started + args.ramp_up * number / args.sessions)
+                for number in range(args.sessions)
+            ]
+            results = [result for future in futures for result in future.result()]
+        elapsed = time.monotonic() - started
+    finally:
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+
+    succeeded = [result['latency_s'] for result in results if not result['failed_sheets']]
+    failed = [result['latency_s'] for result in results if result['failed_sheets']]
+    report = {
+        'sessions': args.sessions,
+        'loads_per_session': args.loads,
+        'sheets': sheet_names,
+        'elapsed_s': elapsed,
+        'all': latency_summary([result['latency_s'] for result in results]),
+        'succeeded': latency_summary(succeeded),
+        'failed': latency_summary(failed),
+        'server_responses': {str(outcome): count for outcome, count in faults.summary().items()} if faults else None,
+        'results': results
+    }
+
+    for label in ['all', 'succeeded', 'failed']:
+        print(format_summary(label, report[label]))
+    print(f"Throughput: {len(results) / elapsed:.2f} loads/s over {elapsed:.1f} s")
+    if report['server_responses']:
+        print(f"Server responses: {report['server_responses']}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as output_file:
+            json.dump(report, output_file, indent=2)
+        print(f"Results written to {args.output}")
+
+if __name__ == '__main__':
+    main()
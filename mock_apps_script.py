@@ -0,0 +1,299 @@
+"""Local stand-in for the Google Apps Script web app used by streamlit_app.py
+
+Serves synthetic warranty rows over the same `action=read&sheet=...` protocol,
+including the `after=<row index>` delta mode used to sync the live month and the
+`format=records|rows|csv` response layouts.
+
+Run it and point the dashboard at it:
+
+    $ python mock_apps_script.py --port 8765
+    $ APPS_SCRIPT_URL=http://127.0.0.1:8765/exec streamlit run streamlit_app.py
+
+To see how the dashboard copes with a slow or throttled endpoint, add latency,
+a bandwidth limit, injected 429/5xx responses or requests that never answer:
+
+    $ python mock_apps_script.py --latency 0.5 --error-rate 0.2 --retry-after 1 --timeout-rate 0.05
+"""
+import argparse
+import collections
+import csv
+import io
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+ITEM_CATEGORIES = [
+    'AC', 'TV', 'REFRIGERATOR', 'WASHING MACHINE', 'MICROWAVE OVEN', 'DISH WASHER',
+    'CEILING FAN', 'PEDESTAL FAN', 'TABLE FAN', 'MIXER GRINDER', 'IRON BOX', 'ELECTRIC KETTLE',
+    'OTG', 'GARMENTS STEAMER', 'INDUCTION COOKER', 'SOUND BAR', 'PARTY SPEAKER',
+    'BLUETOOTH SPEAKER', 'HOME THEATRE', 'LAPTOP', 'MOBILE'
+]
+
+COLUMNS = [
+    'Item Category', 'BDM', 'RBM', 'Store', 'Staff Name',
+    'TotalSoldPrice', 'WarrantyPrice', 'TotalCount', 'WarrantyCount'
+]
+
+# Function to generate one synthetic sheet row
+def make_row(rng):
+    """Build a row with the columns the dashboard expects"""
+    rbm_number = rng.randint(1, 12)
+    store_number = rng.randint(1, 60)
+    store_prefix = 'FUTURE' if store_number % 4 == 0 else 'STORE'
+    total_count = rng.randint(1, 5)
+    warranty_count = rng.randint(0, total_count)
+    return {
+        'Item Category': rng.choice(ITEM_CATEGORIES),
+        'BDM': f"BDM {rbm_number % 4 + 1}",
+        'RBM': f"RBM {rbm_number}",
+        'Store': f"{store_prefix} {store_number:03d}",
+        'Staff Name': f"STAFF {store_number:03d}-{rng.randint(1, 6)}",
+        'TotalSoldPrice': total_count * rng.randint(1000, 60000),
+        'WarrantyPrice': warranty_count * rng.randint(99, 2500),
+        'TotalCount': total_count,
+        'WarrantyCount': warranty_count
+    }
+
+class SheetStore:
+    """Deterministic synthetic sheets, with optional growth of the live sheet"""
+
+    def __init__(self, rows_per_sheet, live_sheet=None, growth_per_minute=0):
+        self.rows_per_sheet = rows_per_sheet
+        self.live_sheet = live_sheet
+        self.growth_per_minute = growth_per_minute
+        self.started_at = time.time()
+        self.sheets = {}
+        self.lock = threading.Lock()
+
+    def rows(self, sheet_name):
+        """Return the current rows of a sheet, generating them on first use"""
+        with self.lock:
+            rows = self.sheets.get(sheet_name)
+            if rows is None:
+                rng = random.Random(sheet_name)
+                rows = [make_row(rng) for _ in range(self.rows_per_sheet)]
+                self.sheets[sheet_name] = rows
+
+            # The live sheet keeps receiving rows while the server runs
+            if sheet_name == self.live_sheet and self.growth_per_minute:
+                elapsed_minutes = (time.time() - self.started_at) / 60
+                target = self.rows_per_sheet + int(elapsed_minutes * self.growth_per_minute)
+                rng = random.Random(f"{sheet_name}-{len(rows)}")
+                while len(rows) < target:
+                    rows.append(make_row(rng))
+
+            return list(rows)
+
+class FaultInjector:
+    """Decides per request how slowly to answer and whether to fail, to exercise the client's retries"""
+
+    def __init__(self, latency=0.0, jitter=0.0, error_rate=0.0, error_statuses=(429, 500, 502, 503, 504),
+                 retry_after=None, timeout_rate=0.0, stall_seconds=60.0, bytes_per_second=0, seed=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_statuses = list(error_statuses)
+        self.retry_after = retry_after
+        self.timeout_rate = timeout_rate
+        self.stall_seconds = stall_seconds
+        self.bytes_per_second = bytes_per_second
+        self.rng = random.Random(seed)
+        self.counts = collections.Counter()
+        self.lock = threading.Lock()
+
+    def plan(self):
+        """Return (delay in seconds, injected HTTP status or None, whether the request stalls)"""
+        with self.lock:
+            delay = self.latency + self.rng.uniform(0, self.jitter)
+            roll = self.rng.random()
+            if roll < self.timeout_rate:
+                self.counts['stalled'] += 1
+                return delay, None, True
+            if roll < self.timeout_rate + self.error_rate:
+                status = self.rng.choice(self.error_statuses)
+                self.counts[status] += 1
+                return delay, status, False
+            self.counts[200] += 1
+            return delay, None, False
+
+    def summary(self):
+        """Return a copy of the per-outcome request counts"""
+        with self.lock:
+            return dict(self.counts)
+
+def make_handler(store, faults=None, fixed_format=None):
+    """Create a request handler bound to a SheetStore and an optional FaultInjector
+
+    With fixed_format every read is answered in that layout whatever the request asks for,
+    like a deployment that predates the format parameter.
+    """
+
+    class AppsScriptHandler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def write_body(self, body):
+            # Without a bandwidth limit the body goes out in one write
+            if not faults or not faults.bytes_per_second:
+                self.wfile.write(body)
+                return
+            chunk_size = 64 * 1024
+            for start in range(0, len(body), chunk_size):
+                chunk = body[start:start + chunk_size]
+                self.wfile.write(chunk)
+                self.wfile.flush()
+                time.sleep(len(chunk) / faults.bytes_per_second)
+
+        def send_json(self, payload, status=200, headers=None):
+            body = json.dumps(payload).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.write_body(body)
+
+        def send_csv(self, rows):
+            text = io.StringIO()
+            writer = csv.DictWriter(text, fieldnames=COLUMNS)
+            writer.writeheader()
+            writer.writerows(rows)
+            body = text.getvalue().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/csv; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.write_body(body)
+
+        def inject_fault(self):
+            """Apply the planned latency and failure, returning True if the request was already answered"""
+            if faults is None:
+                return False
+            delay, status, stalls = faults.plan()
+            time.sleep(delay)
+
+            # A stalled request holds the connection without answering until the client gives up
+            if stalls:
+                time.sleep(faults.stall_seconds)
+                self.close_connection = True
+                return True
+
+            if status is not None:
+                headers = {'Retry-After': str(faults.retry_after)} if faults.retry_after is not None and status in (429, 503) else None
+                self.send_json({'status': 'error', 'message': f"Injected HTTP {status}"}, status, headers)
+                return True
+            return False
+
+        def do_GET(self):
+            try:
+                if not self.inject_fault():
+                    self.serve_read()
+            except (BrokenPipeError, ConnectionResetError):
+                # The client timed out or gave up while the response was still being sent
+                self.close_connection = True
+
+        def serve_read(self):
+            params = parse_qs(urlparse(self.path).query)
+            action = params.get('action', [''])[0]
+            sheet_name = params.get('sheet', [''])[0]
+
+            if action != 'read' or not sheet_name:
+                self.send_json({'status': 'error', 'message': 'Expected action=read and a sheet name'})
+                return
+
+            rows = store.rows(sheet_name)
+            response_format = fixed_format or params.get('format', ['records'])[0]
+
+            # CSV has no room for the delta fields, so it always carries the whole sheet
+            if response_format == 'csv':
+                self.send_csv(rows)
+                return
+
+            payload = {'status': 'success'}
+            if 'after' in params:
+                after = int(params['after'][0])
+                payload.update({'offset': after, 'total': len(rows)})
+                rows = rows[after:]
+
+            if response_format == 'rows':
+                payload['columns'] = COLUMNS
+                payload['rows'] = [[row[col] for col in COLUMNS] for row in rows]
+            else:
+                payload['data'] = rows
+            self.send_json(payload)
+
+    return AppsScriptHandler
+
+class StandInServer(ThreadingHTTPServer):
+    """Threaded server with a listen backlog deep enough for many concurrent sessions"""
+    request_queue_size = 128
+    daemon_threads = True
+
+def create_server(host, port, store, faults=None, fixed_format=None):
+    """Create a StandInServer serving a SheetStore; port 0 picks a free port"""
+    return StandInServer((host, port), make_handler(store, faults, fixed_format))
+
+def add_data_arguments(parser):
+    """Add the options controlling the served sheets (and so the payload size)"""
+    parser.add_argument('--rows', type=int, default=5000, help='Rows generated per sheet, i.e. the payload size')
+    parser.add_argument('--live-sheet', default='2025 DECEMBER', help='Sheet that keeps growing')
+    parser.add_argument('--growth-per-minute', type=int, default=0, help='Rows appended to the live sheet per minute')
+
+def add_fault_arguments(parser):
+    """Add the latency and failure injection options shared with load_test.py"""
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds added before every response')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Extra random latency, up to this many seconds')
+    parser.add_argument('--bytes-per-second', type=int, default=0, help='Bandwidth limit for response bodies (0 for none)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests answered with an injected error status')
+    parser.add_argument('--error-statuses', type=int, nargs='+', default=[429, 500, 502, 503, 504], help='Statuses injected errors are drawn from')
+    parser.add_argument('--retry-after', type=int, help='Retry-After seconds sent with injected 429 and 503 responses')
+    parser.add_argument('--timeout-rate', type=float, default=0.0, help='Fraction of requests that are held open without an answer')
+    parser.add_argument('--stall-seconds', type=float, default=60.0, help='How long a stalled request is held open')
+    parser.add_argument('--seed', type=int, help='Seed for the fault decisions')
+
+def store_from_args(args):
+    """Build the SheetStore described by add_data_arguments options"""
+    return SheetStore(args.rows, args.live_sheet, args.growth_per_minute)
+
+def faults_from_args(args):
+    """Build the FaultInjector described by add_fault_arguments options, or None if no fault is configured"""
+    if not any([args.latency, args.jitter, args.bytes_per_second, args.error_rate, args.timeout_rate]):
+        return None
+    return FaultInjector(
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        error_statuses=args.error_statuses,
+        retry_after=args.retry_after,
+        timeout_rate=args.timeout_rate,
+        stall_seconds=args.stall_seconds,
+        bytes_per_second=args.bytes_per_second,
+        seed=args.seed
+    )
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    add_data_arguments(parser)
+    add_fault_arguments(parser)
+    parser.add_argument('--format', choices=['records', 'rows', 'csv'], help='Answer every read in this layout, ignoring the requested one')
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    server = create_server(args.host, args.port, store_from_args(args), faults_from_args(args), args.format)
+    print(f"Serving synthetic Apps Script data on http://{args.host}:{args.port}/exec")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == '__main__':
+    main()
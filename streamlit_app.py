@@ -1,23 +1,166 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
 import requests
+import xlsxwriter
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 from io import BytesIO
+import codecs
+import contextlib
+import functools
+import hashlib
+import itertools
+import json
+import os
+import re
+import tempfile
+import threading
+import uuid
+import weakref
+import zipfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 import time
+import types
 
 # Streamlit page configuration
 st.set_page_config(page_title="Warranty Conversion Dashboard", layout="wide", initial_sidebar_state="expanded")
 
 # --- Google Sheets Integration Configuration ---
-APPS_SCRIPT_URL = "https://script.google.com/macros/s/AKfycbwqzSILXSQDecrzt7G_Y5uIKKYJSOTzo1EI9iiZa0hicYNJ42X6c6oDIQQo9iisbaPr8w/exec"  # Replace with your Apps Script web app URL
+# Set the APPS_SCRIPT_URL environment variable to point the dashboard at another deployment
+# (for example the local stand-in server in mock_apps_script.py)
+APPS_SCRIPT_URL = os.environ.get("APPS_SCRIPT_URL", "https://script.google.com/macros/s/AKfycbwqzSILXSQDecrzt7G_Y5uIKKYJSOTzo1EI9iiZa0hicYNJ42X6c6oDIQQo9iisbaPr8w/exec")  # Replace with your Apps Script web app URL
+
+# Maximum number of sheets fetched in parallel when loading several months
+MAX_CONCURRENT_FETCHES = 8
+
+# Seconds to wait for the endpoint to connect or to send the next part of a response
+# (APPS_SCRIPT_TIMEOUT overrides it, e.g. to load-test against a slow stand-in server)
+FETCH_TIMEOUT = float(os.environ.get("APPS_SCRIPT_TIMEOUT", 30))
+
+# Function to create the HTTP session used for every sheet request
+def make_http_session():
+    """Return a session that retries throttled and failed requests with exponential backoff"""
+    # The connection pool is sized to the fetch concurrency so parallel sheet
+    # requests reuse keep-alive connections instead of opening new ones
+    http_session = requests.Session()
+    retries = Retry(total=3, backoff_factor=1, status_forcelist=[429, 500, 502, 503, 504])
+    adapter = HTTPAdapter(max_retries=retries, pool_connections=MAX_CONCURRENT_FETCHES, pool_maxsize=MAX_CONCURRENT_FETCHES)
+    # Plain http gets the same policy so a local stand-in server behaves like the real endpoint
+    http_session.mount('https://', adapter)
+    http_session.mount('http://', adapter)
+    return http_session
 
 # Configure requests with retry logic
-session = requests.Session()
-retries = Retry(total=3, backoff_factor=1, status_forcelist=[429, 500, 502, 503, 504])
-session.mount('https', HTTPAdapter(max_retries=retries))
+session = make_http_session()
+
+# --- Timing Instrumentation ---
+# Spans time the fetch, transform, table, render and export steps of each rerun, with row
+# counts and payload bytes. Open the dashboard with ?debug=1 (or set DASHBOARD_DEBUG=1) to see
+# them in the sidebar; set DASHBOARD_TRACE_FILE to append every span to that file as JSON lines
+TRACE_FILE = os.environ.get("DASHBOARD_TRACE_FILE")
+DEBUG_PANEL_DEFAULT = os.environ.get("DASHBOARD_DEBUG") == "1"
+
+# The script's globals are rebuilt on every rerun, so these belong to the current rerun
+TRACE_RUN_ID = uuid.uuid4().hex[:12]
+TRACE_SPANS = []
+RERUN_STARTED = time.perf_counter()
+
+@st.cache_resource
+def trace_file_lock():
+    """Return the process-wide lock serialising writes to the trace file"""
+    return threading.Lock()
+
+# Function to record a finished span
+def record_span(span):
+    """Add a span to the current rerun and append it to the trace file when one is configured"""
+    TRACE_SPANS.append(span)
+    if not TRACE_FILE:
+        return
+    
+    ctx = get_script_run_ctx(suppress_warning=True)
+    entry = {
+        "ts": round(time.time(), 3),
+        "session": ctx.session_id if ctx else None,
+        "run": TRACE_RUN_ID,
+        "thread": threading.current_thread().name,
+        **span
+    }
+    try:
+        with trace_file_lock(), open(TRACE_FILE, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, default=str) + "\n")
+    except OSError:
+        # Tracing must never break the dashboard
+        pass
+
+# Function to time a block of code as one span
+@contextlib.contextmanager
+def trace_span(name, category, **details):
+    """Time the enclosed block; the yielded dict takes extra details such as rows or bytes"""
+    span = {"name": name, "category": category, **details}
+    started = time.perf_counter()
+    try:
+        yield span
+    except BaseException as e:
+        span["error"] = type(e).__name__
+        raise
+    finally:
+        span["duration_ms"] = round((time.perf_counter() - started) * 1000, 3)
+        record_span(span)
+
+def payload_details(value, prefix=""):
+    """Return the row count of a DataFrame or the size of bytes, for span details"""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return {f"{prefix}rows": len(value)}
+    if isinstance(value, (bytes, bytearray)):
+        return {f"{prefix}bytes": len(value)}
+    return {}
+
+# Function to record every call of a function as a span
+def traced(category, name=None):
+    """Decorator timing each call; name may be a callable taking the call's arguments
+
+    The size of the first DataFrame argument is recorded as input_rows and that of the result as rows or bytes.
+    Under st.cache_data it goes below the cache decorator so only real computations are recorded.
+    """
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            span_name = name(*args, **kwargs) if callable(name) else name or func.__name__
+            first_frame = next((arg for arg in args if isinstance(arg, pd.DataFrame)), None)
+            with trace_span(span_name, category, **payload_details(first_frame, "input_")) as span:
+                result = func(*args, **kwargs)
+                span.update(payload_details(result))
+                return result
+        return wrapper
+    return decorate
+
+# Function to summarise spans for the debug panel
+def trace_frame(spans):
+    """Return the spans as a DataFrame sorted by duration, slowest first"""
+    columns = ["name", "category", "duration_ms", "input_rows", "rows", "bytes", "error"]
+    frame = pd.DataFrame(spans, columns=columns)
+    return frame.dropna(axis=1, how="all").sort_values("duration_ms", ascending=False, ignore_index=True)
+
+# Function to show the timing breakdown in the sidebar
+def show_trace_panel(spans, load_spans=None):
+    """Render per-category totals and the slowest spans of this rerun (and of the last data load)"""
+    rerun_ms = (time.perf_counter() - RERUN_STARTED) * 1000
+    with st.sidebar.expander("⏱️ Timing Breakdown", expanded=True):
+        st.caption(f"This rerun took {rerun_ms:,.0f} ms; {len(spans)} spans recorded. Spans nest, so category totals overlap")
+        for title, title_spans in [("This rerun", spans), ("Last data load", load_spans or [])]:
+            if not title_spans:
+                continue
+            frame = trace_frame(title_spans)
+            st.markdown(f"**{title}**")
+            st.dataframe(
+                frame.groupby("category")["duration_ms"].agg(["count", "sum"]).sort_values("sum", ascending=False),
+                use_container_width=True
+            )
+            st.dataframe(frame, use_container_width=True, hide_index=True)
 
 # Available sheets
 SHEETS = [
@@ -36,15 +179,218 @@ SHEETS = [
     "2025 DECEMBER"
 ]
 
+# --- Streaming Response Parsing ---
+# Layout asked of the endpoint: "records" (a list of row objects under "data"), "rows"
+# (a "columns" header plus an array of row arrays) or "csv". Deployments that ignore the
+# format parameter keep answering with records, which are parsed the same way
+SHEETS_RESPONSE_FORMAT = "rows"
+RESPONSE_CHUNK_BYTES = 64 * 1024
+STREAM_CHUNK_ROWS = 20000  # Rows held as Python objects before being packed into typed columns
+ROW_ARRAY_KEYS = ("data", "rows")  # Top-level keys whose arrays hold sheet rows
+JSON_WHITESPACE = re.compile(r"[ \t\n\r]*")
+JSON_ARRAY_SEPARATOR = re.compile(r"[ \t\n\r]*([,\]])")
+
+class JSONStream:
+    """Decodes JSON values one at a time from an iterator of byte chunks"""
+    
+    def __init__(self, chunks):
+        self.chunks = iter(chunks)
+        self.decoder = json.JSONDecoder()
+        self.text_decoder = codecs.getincrementaldecoder("utf-8")()
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+    
+    def fill(self):
+        """Append the next chunk to the buffer, dropping text that was already consumed"""
+        chunk = next(self.chunks, None)
+        if chunk is None:
+            text = self.text_decoder.decode(b"", final=True)
+            self.eof = True
+        else:
+            text = self.text_decoder.decode(chunk)
+        self.buffer = self.buffer[self.pos:] + text
+        self.pos = 0
+    
+    def peek(self):
+        """Return the next non-whitespace character without consuming it"""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in " \t\r\n":
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if self.eof:
+                raise ValueError("Unexpected end of JSON response")
+            self.fill()
+    
+    def expect(self, characters):
+        """Consume one of the given structural characters and return it"""
+        character = self.peek()
+        if character not in characters:
+            raise ValueError(f"Unexpected {character!r} in JSON response")
+        self.pos += 1
+        return character
+    
+    def value(self):
+        """Decode the next complete JSON value"""
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+                self.fill()
+                continue
+            # A number or literal ending exactly at the buffer edge may continue in the next chunk
+            if end == len(self.buffer) and not self.eof:
+                self.fill()
+                continue
+            self.pos = end
+            return value
+    
+    def array_batches(self):
+        """Yield the elements of the array whose "[" was just consumed, one list per buffered chunk"""
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        
+        scan_once = self.decoder.scan_once
+        while True:
+            buffer, pos = self.buffer, self.pos
+            batch = []
+            closed = False
+            
+            # Rows are flat objects or arrays, so everything up to the last "}," or "]," is usually
+            # a run of complete rows that one json.loads call decodes. If that cut lands inside a
+            # string the slice is not valid JSON and the rows are decoded one by one below instead
+            cut = max(buffer.rfind("},", pos), buffer.rfind("],", pos))
+            if cut > pos:
+                try:
+                    batch = json.loads("[" + buffer[pos:cut + 1] + "]")
+                    pos = cut + 2
+                except json.JSONDecodeError:
+                    batch = []
+            
+            while True:
+                try:
+                    value, end = scan_once(buffer, JSON_WHITESPACE.match(buffer, pos).end())
+                except (StopIteration, json.JSONDecodeError):
+                    break
+                separator = JSON_ARRAY_SEPARATOR.match(buffer, end)
+                if separator is None:
+                    break
+                batch.append(value)
+                pos = separator.end()
+                if separator.group(1) == "]":
+                    closed = True
+                    break
+            
+            self.pos = pos
+            if batch:
+                yield batch
+            if closed:
+                return
+            if self.eof:
+                raise ValueError(f"Malformed row array in JSON response near {buffer[pos:pos + 40]!r}")
+            self.fill()
+
+# Function to walk a JSON object response without materialising its row arrays
+def iter_json_payload(chunks):
+    """Yield ("field", key, value) for top-level fields and ("rows", key, batch) for batches of row array elements"""
+    stream = JSONStream(chunks)
+    stream.expect("{")
+    if stream.peek() == "}":
+        return
+    
+    while True:
+        key = stream.value()
+        stream.expect(":")
+        if key in ROW_ARRAY_KEYS and stream.peek() == "[":
+            stream.expect("[")
+            for batch in stream.array_batches():
+                yield "rows", key, batch
+        else:
+            yield "field", key, stream.value()
+        
+        if stream.expect(",}") == "}":
+            return
+
+class ColumnarRowBuilder:
+    """Packs streamed rows (objects or arrays) into typed column chunks"""
+    
+    def __init__(self, chunk_rows=STREAM_CHUNK_ROWS):
+        self.chunk_rows = chunk_rows
+        self.columns = None  # Header of array rows; object rows carry their own keys
+        self.pending = []
+        self.frames = []
+    
+    def add_rows(self, rows):
+        self.pending.extend(rows)
+        if len(self.pending) >= self.chunk_rows:
+            self.flush()
+    
+    def flush(self):
+        """Convert the pending rows into one DataFrame chunk"""
+        if not self.pending:
+            return
+        
+        if isinstance(self.pending[0], dict):
+            frame = pd.DataFrame(self.pending)
+        elif self.columns is None:
+            return  # Array rows arrived before their header; keep them until it does
+        else:
+            frame = pd.DataFrame(self.pending, columns=self.columns)
+        self.pending = []
+        
+        for col in frame.columns.intersection(CATEGORICAL_COLUMNS):
+            frame[col] = frame[col].astype("category")
+        self.frames.append(frame)
+    
+    def to_frame(self):
+        self.flush()
+        if self.pending:
+            raise ValueError("Row arrays were returned without a columns header")
+        if not self.frames:
+            return pd.DataFrame(columns=self.columns or [])
+        if len(self.frames) == 1:
+            return self.frames[0]
+        return pd.concat(unify_categories(self.frames), ignore_index=True)
+
+# Function to parse a streamed Apps Script response into its fields and a DataFrame of rows
+def read_sheet_payload(response):
+    """Return (top-level fields, rows DataFrame or None when the response holds no rows)"""
+    if "csv" in response.headers.get("Content-Type", ""):
+        # CSV responses carry no envelope; pandas parses the socket stream straight into columns
+        response.raw.decode_content = True
+        df = pd.read_csv(response.raw, dtype={col: "category" for col in CATEGORICAL_COLUMNS})
+        return {"status": "success"}, df
+    
+    fields = {}
+    builder = ColumnarRowBuilder()
+    has_rows = False
+    for kind, key, value in iter_json_payload(response.iter_content(chunk_size=RESPONSE_CHUNK_BYTES)):
+        if kind == "rows":
+            builder.add_rows(value)
+            has_rows = True
+        else:
+            fields[key] = value
+            if key == "columns":
+                builder.columns = value
+    
+    return fields, builder.to_frame() if has_rows else None
+
 # Function to fetch data from Google Sheets for a specific sheet
-@st.cache_data(ttl=60)  # Cache for 60 seconds
-def fetch_data_from_sheets(sheet_name):
+# Not cached itself: processed months are cached per sheet by load_cached_month
+# http replaces this rerun's session, e.g. for load_test.py's simulated sessions
+def fetch_data_from_sheets(sheet_name, http=None):
     try:
-        response = session.get(APPS_SCRIPT_URL, params={"action": "read", "sheet": sheet_name}, timeout=30)
-        response.raise_for_status()
-        data = response.json()
-        if data.get("status") == "success" and data.get("data"):
-            df = pd.DataFrame(data["data"])
+        params = {"action": "read", "sheet": sheet_name, "format": SHEETS_RESPONSE_FORMAT}
+        with trace_span(f"fetch {sheet_name}", "fetch") as span, (http or session).get(APPS_SCRIPT_URL, params=params, timeout=FETCH_TIMEOUT, stream=True) as response:
+            response.raise_for_status()
+            data, df = read_sheet_payload(response)
+            span.update(rows=0 if df is None else len(df), bytes=response.raw.tell())
+        if data.get("status") == "success" and df is not None and not df.empty:
             return df
         else:
             st.error(f"Error fetching data from Google Sheets for {sheet_name}: {data.get('message', 'No data returned or invalid response')}")
@@ -52,6 +398,214 @@ def fetch_data_from_sheets(sheet_name):
     except requests.exceptions.RequestException as e:
         st.error(f"Failed to connect to Google Sheets for {sheet_name}: {str(e)}")
         return None
+    except ValueError as e:
+        st.error(f"Invalid response from Google Sheets for {sheet_name}: {str(e)}")
+        return None
+
+# Function to fetch only the rows appended to a sheet after a known row index
+# The Apps Script endpoint returns rows[after:] together with "offset" (the echoed
+# row index) and "total" (the current row count of the sheet)
+def fetch_sheet_delta(sheet_name, after):
+    """Return (new rows DataFrame, is_full_sheet), (None, True) if a full reload is needed, or None if the request failed"""
+    try:
+        params = {"action": "read", "sheet": sheet_name, "after": after, "format": SHEETS_RESPONSE_FORMAT}
+        with trace_span(f"fetch delta {sheet_name}", "fetch", after=after) as span, session.get(APPS_SCRIPT_URL, params=params, timeout=FETCH_TIMEOUT, stream=True) as response:
+            response.raise_for_status()
+            data, rows = read_sheet_payload(response)
+            span.update(rows=0 if rows is None else len(rows), bytes=response.raw.tell())
+        if data.get("status") != "success":
+            st.error(f"Error fetching new rows from Google Sheets for {sheet_name}: {data.get('message', 'Invalid response')}")
+            return None
+        
+        if rows is None:
+            rows = pd.DataFrame()
+        
+        # Deployments without delta support ignore "after" and send the whole sheet
+        if "offset" not in data:
+            return rows, True
+        
+        # Fewer rows than we already hold means the sheet was rewritten, so a full reload is needed
+        if data.get("total", after) < after:
+            return None, True
+        
+        return rows, False
+    except requests.exceptions.RequestException as e:
+        st.error(f"Failed to connect to Google Sheets for {sheet_name}: {str(e)}")
+        return None
+    except ValueError as e:
+        st.error(f"Invalid response from Google Sheets for {sheet_name}: {str(e)}")
+        return None
+
+# Function to turn a sheet or table name into a file name
+def slugify(name):
+    """Return a file-system safe, lower-case version of a name, used for cache files and downloads"""
+    return "".join(ch if ch.isalnum() else "_" for ch in name.lower())
+
+# --- Persistent Month Cache Configuration ---
+# Processed months are stored on disk as Parquet so restarts and cache clears
+# don't have to download closed months from Google Sheets again
+# (set the MONTH_CACHE_DIR environment variable to keep them somewhere else)
+MONTH_CACHE_DIR = os.environ.get("MONTH_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".month_cache"))
+MONTH_CACHE_VERSION = 2  # Bump when load_cached_month changes the processed columns
+
+# The latest sheet is still receiving rows; every other month is closed and cached permanently,
+# once it has been synced after closing (a copy written while it was live may be missing rows)
+LIVE_SHEET = SHEETS[-1]
+LIVE_MONTH_CACHE_TTL = 60  # Seconds before the live month is fetched again
+MONTH_CACHE_SWEEP_GRACE = 300  # Seconds a replaced file is kept, in case another writer of the month still uses it
+
+# Function to build the on-disk cache paths for a sheet
+def is_month_cache_file(file_name, sheet_name):
+    """Check whether a file in the cache directory belongs to a sheet"""
+    slug = slugify(sheet_name)
+    return file_name == f"{slug}.json" or file_name.startswith(f"{slug}-")
+
+def month_cache_paths(sheet_name, fingerprint=None):
+    """Return the (metadata path, data path) for a cached month"""
+    slug = slugify(sheet_name)
+    meta_path = os.path.join(MONTH_CACHE_DIR, f"{slug}.json")
+    data_path = os.path.join(MONTH_CACHE_DIR, f"{slug}-{fingerprint}.parquet") if fingerprint else None
+    return meta_path, data_path
+
+# Function to fingerprint the content of a processed month
+def month_fingerprint(df):
+    """Return a short content hash of a DataFrame"""
+    row_hashes = pd.util.hash_pandas_object(df, index=False).values
+    return hashlib.sha1(row_hashes.tobytes()).hexdigest()[:16]
+
+# Function to read a processed month from the on-disk cache
+@traced('cache', name=lambda sheet_name: f"read_month_cache {sheet_name}")
+def read_month_cache(sheet_name):
+    """Return (cached DataFrame, is_fresh) for a month, or (None, False) if it is missing"""
+    meta_path, _ = month_cache_paths(sheet_name)
+    try:
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        
+        if meta.get("version") != MONTH_CACHE_VERSION:
+            return None, False
+        
+        # Entries from before the flag was recorded are treated as written while live
+        if meta.get("stale"):
+            is_fresh = False
+        elif sheet_name == LIVE_SHEET:
+            is_fresh = time.time() - meta.get("saved_at", 0) <= LIVE_MONTH_CACHE_TTL
+        else:
+            is_fresh = not meta.get("live", True)
+        
+        _, data_path = month_cache_paths(sheet_name, meta["fingerprint"])
+        return pd.read_parquet(data_path), is_fresh
+    except (OSError, ValueError, KeyError, ImportError):
+        return None, False
+
+# Function to replace a cache file without readers or other writers seeing it half written
+def write_cache_file(path, write):
+    """Call write(temporary path) on a uniquely named file in the cache directory, then move it to path"""
+    # The dot keeps temporary files out of is_month_cache_file, so no sweep removes them mid-write
+    handle, tmp_path = tempfile.mkstemp(dir=MONTH_CACHE_DIR, prefix=".", suffix=".tmp")
+    os.close(handle)
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(tmp_path)
+        raise
+
+# Function to replace the JSON sidecar of a cached month
+def write_month_meta(meta_path, meta):
+    """Write a month's metadata through write_cache_file"""
+    def write_meta(tmp_path):
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+    write_cache_file(meta_path, write_meta)
+
+# Function to write a processed month to the on-disk cache
+@traced('cache', name=lambda sheet_name, df: f"write_month_cache {sheet_name}")
+def write_month_cache(sheet_name, df):
+    """Store a processed month on disk, keyed by sheet name and content fingerprint"""
+    try:
+        os.makedirs(MONTH_CACHE_DIR, exist_ok=True)
+        fingerprint = month_fingerprint(df)
+        meta_path, data_path = month_cache_paths(sheet_name, fingerprint)
+        
+        # Unchanged content is only re-stamped, not rewritten
+        if not os.path.exists(data_path):
+            write_cache_file(data_path, lambda tmp_path: df.to_parquet(tmp_path, index=False))
+        
+        # Remove files left behind by older versions of this month; recent ones may belong to
+        # a concurrent writer whose metadata still points at them, so they wait for a later sweep
+        for file_name in os.listdir(MONTH_CACHE_DIR):
+            stale_path = os.path.join(MONTH_CACHE_DIR, file_name)
+            if not is_month_cache_file(file_name, sheet_name) or stale_path in (meta_path, data_path):
+                continue
+            with contextlib.suppress(OSError):
+                if time.time() - os.path.getmtime(stale_path) > MONTH_CACHE_SWEEP_GRACE:
+                    os.remove(stale_path)
+        
+        write_month_meta(meta_path, {
+            "sheet": sheet_name,
+            "fingerprint": fingerprint,
+            "saved_at": time.time(),
+            "live": sheet_name == LIVE_SHEET,
+            "version": MONTH_CACHE_VERSION
+        })
+    except Exception:
+        # The disk cache is only an accelerator; a failed write just means the next load fetches again
+        pass
+
+# Function to mark months as stale so the next load syncs them
+def expire_month_cache(sheet_names):
+    """Flag the given cached months as stale, without deleting their data, until their next sync rewrites them"""
+    for sheet_name in sheet_names:
+        meta_path, _ = month_cache_paths(sheet_name)
+        try:
+            with open(meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            write_month_meta(meta_path, {**meta, "stale": True})
+        except (OSError, ValueError):
+            pass
+
+# Function to drop months from the on-disk cache
+def invalidate_month_cache(sheet_names=None):
+    """Remove the cached files for the given sheets, or for every sheet if none are given"""
+    if not os.path.isdir(MONTH_CACHE_DIR):
+        return
+    
+    for file_name in os.listdir(MONTH_CACHE_DIR):
+        if sheet_names is None or any(is_month_cache_file(file_name, name) for name in sheet_names):
+            try:
+                os.remove(os.path.join(MONTH_CACHE_DIR, file_name))
+            except OSError:
+                pass
+
+# --- Month Cache Manager ---
+# Loaded months are held in st.cache_data under a versioned key per sheet, so one sheet
+# can be invalidated without clearing the others. The key combines the processing
+# version, a per-sheet generation that invalidation bumps and, for the live month,
+# the current refresh window
+@st.cache_resource
+def month_cache_generations():
+    """Return the process-wide {sheet_name: generation} map"""
+    return {}
+
+def month_cache_key(sheet_name):
+    """Return the versioned cache key a month is loaded under"""
+    key = f"v{MONTH_CACHE_VERSION}-g{month_cache_generations().get(sheet_name, 0)}"
+    if sheet_name == LIVE_SHEET:
+        key += f"-w{int(time.time() // LIVE_MONTH_CACHE_TTL)}"
+    return key
+
+def invalidate_months(sheet_names, refetch=False):
+    """Drop months from the in-memory cache; their disk copies are re-synced, or deleted when refetch is set"""
+    generations = month_cache_generations()
+    for sheet_name in sheet_names:
+        generations[sheet_name] = generations.get(sheet_name, 0) + 1
+    
+    if refetch:
+        invalidate_month_cache(sheet_names)
+    else:
+        expire_month_cache(sheet_names)
 
 # Enhanced CSS for modern, attractive styling with loading animation
 st.markdown("""
@@ -548,26 +1102,106 @@ st.markdown("""
     </style>
 """, unsafe_allow_html=True)
 
-# Function to convert DataFrame to Excel for download
-def to_excel(df, sheet_name='Data'):
-    # Shorten sheet name if it's too long for Excel
-    if len(sheet_name) > 31:
-        sheet_name = sheet_name[:31]
+# Tables with at least this many rows are written with xlsxwriter's constant_memory mode,
+# which flushes every row to a temporary file instead of keeping the sheet in memory
+EXCEL_CONSTANT_MEMORY_ROWS = 20000
+
+# Number of built downloads kept across reruns and sessions
+EXPORT_CACHE_ENTRIES = 64
+
+# Function to make sheet names Excel accepts
+def excel_sheet_names(names):
+    """Strip invalid characters, shorten to 31 characters and keep the names unique within a workbook"""
+    used = set()
+    sheet_names = []
+    for name in names:
+        base = re.sub(r'[\[\]:*?/\\]', '', str(name))[:31] or 'Data'
+        sheet_name, copy_number = base, 2
+        while sheet_name.lower() in used:
+            suffix = f" ({copy_number})"
+            sheet_name = base[:31 - len(suffix)] + suffix
+            copy_number += 1
+        used.add(sheet_name.lower())
+        sheet_names.append(sheet_name)
+    return sheet_names
+
+# Function to convert a column to the values written to Excel
+def excel_column_values(column):
+    """Return Python scalars, with blanks for missing values and 'inf' for infinities as pandas writes them"""
+    values = column.astype(object).where(column.notna(), None)
+    if pd.api.types.is_float_dtype(column):
+        values = values.mask(column == np.inf, 'inf').mask(column == -np.inf, '-inf')
+    return values.tolist()
+
+# Function to write one table as a formatted worksheet
+def write_excel_sheet(workbook, formats, sheet_name, df):
+    """Write a table top to bottom, one row at a time, so constant_memory mode can stream it"""
+    worksheet = workbook.add_worksheet(sheet_name)
+    
+    # Percentages are stored as fractions so the percent format shows the on-screen value
+    percentage_columns = [col for col in df.columns if 'Conv (%)' in col]
+    df_export = df.assign(**{col: df[col] / 100.0 for col in percentage_columns}) if percentage_columns else df
+    
+    # Column formats and conditional formats don't depend on the row order
+    for col_num, col_name in enumerate(df_export.columns):
+        if 'Conv (%)' in col_name:
+            worksheet.set_column(col_num, col_num, 15, formats['percent'])
+        elif 'AHSP' in col_name:
+            worksheet.set_column(col_num, col_num, 15, formats['currency'])
+        elif 'Sales' in col_name:
+            worksheet.set_column(col_num, col_num, 18, formats['currency'])
+        elif 'Units' in col_name:
+            worksheet.set_column(col_num, col_num, 15, formats['integer'])
+        elif df_export[col_name].dtype in ['float64']:
+            worksheet.set_column(col_num, col_num, 15, formats['number'])
+        elif df_export[col_name].dtype in ['int64']:
+            worksheet.set_column(col_num, col_num, 15, formats['integer'])
+        else:
+            worksheet.set_column(col_num, col_num, 20, formats['text'])
+    
+    if 'Value Conv (%)' in df_export.columns:
+        value_conv_col = df_export.columns.get_loc('Value Conv (%)')
+        worksheet.conditional_format(1, value_conv_col, len(df_export), value_conv_col, {
+            'type': 'cell',
+            'criteria': '<',
+            'value': 0.02,
+            'format': formats['low_conversion']
+        })
     
+    # The total row is bolded as it is written; constant_memory ignores formats set on flushed rows
+    total_row_number = None
+    if 'Store' in df_export.columns:
+        total_positions = np.flatnonzero((df_export['Store'] == 'Total').to_numpy(dtype=bool, na_value=False))
+        if len(total_positions):
+            total_row_number = int(total_positions[0]) + 1
+    
+    worksheet.write_row(0, 0, [str(col) for col in df_export.columns], formats['header'])
+    columns = [excel_column_values(df_export[col]) for col in df_export.columns]
+    for row_number, row in enumerate(zip(*columns), start=1):
+        if row_number == total_row_number:
+            worksheet.set_row(row_number, None, formats['total_row'])
+        worksheet.write_row(row_number, 0, row)
+
+# Function to fingerprint the tables of a workbook
+def export_fingerprint(tables):
+    """Return a content hash covering the sheet names, headers and values of every table"""
+    digest = hashlib.sha1()
+    for sheet_name, table in tables:
+        digest.update(repr((sheet_name, list(table.columns))).encode('utf-8'))
+        digest.update(month_fingerprint(table).encode('ascii'))
+    return digest.hexdigest()[:16]
+
+# Function to build an Excel workbook with one sheet per table
+@st.cache_data(max_entries=EXPORT_CACHE_ENTRIES, show_spinner=False)
+@traced('export')
+def build_excel_workbook(fingerprint, _tables):
+    """Return the .xlsx bytes for [(sheet name, DataFrame)]; the cache is keyed on the fingerprint alone"""
+    total_rows = sum(len(table) for _, table in _tables)
     output = BytesIO()
-    with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-        df_export = df.copy()
-        
-        percentage_columns = [col for col in df_export.columns if 'Conv (%)' in col]
-        for col in percentage_columns:
-            if col in df_export.columns:
-                df_export[col] = df_export[col] / 100.0
-        
-        df_export.to_excel(writer, index=False, sheet_name=sheet_name)
-        workbook = writer.book
-        worksheet = writer.sheets[sheet_name]
-        
-        header_format = workbook.add_format({
+    workbook = xlsxwriter.Workbook(output, {'constant_memory': total_rows >= EXCEL_CONSTANT_MEMORY_ROWS})
+    
+    formats = {
+        'header': workbook.add_format({
             'bold': True,
             'text_wrap': True,
             'valign': 'top',
@@ -575,100 +1209,216 @@ def to_excel(df, sheet_name='Data'):
             'font_color': 'white',
             'border': 1,
             'align': 'center'
-        })
-        
-        for col_num, value in enumerate(df_export.columns.values):
-            worksheet.write(0, col_num, value, header_format)
-        
-        low_conversion_format = workbook.add_format({'bg_color': '#fee2e2'})
-        value_conv_col = df_export.columns.get_loc('Value Conv (%)') if 'Value Conv (%)' in df_export.columns else None
-        
-        if value_conv_col is not None:
-            worksheet.conditional_format(1, value_conv_col, len(df_export), value_conv_col, {
-                'type': 'cell',
-                'criteria': '<',
-                'value': 0.02,
-                'format': low_conversion_format
-            })
-        
-        num_format = workbook.add_format({'num_format': '#,##0.00', 'align': 'center'})
-        percent_format = workbook.add_format({'num_format': '0.00%', 'align': 'center'})
-        currency_format = workbook.add_format({'num_format': '₹#,##0.00', 'align': 'center'})
-        integer_format = workbook.add_format({'num_format': '#,##0', 'align': 'center'})
-        text_format = workbook.add_format({'align': 'center'})
-        
-        for col_num, col_name in enumerate(df_export.columns):
-            if 'Conv (%)' in col_name:
-                worksheet.set_column(col_num, col_num, 15, percent_format)
-            elif 'AHSP' in col_name:
-                worksheet.set_column(col_num, col_num, 15, currency_format)
-            elif 'Sales' in col_name:
-                worksheet.set_column(col_num, col_num, 18, currency_format)
-            elif 'Units' in col_name:
-                worksheet.set_column(col_num, col_num, 15, integer_format)
-            elif df_export[col_name].dtype in ['float64']:
-                worksheet.set_column(col_num, col_num, 15, num_format)
-            elif df_export[col_name].dtype in ['int64']:
-                worksheet.set_column(col_num, col_num, 15, integer_format)
-            else:
-                worksheet.set_column(col_num, col_num, 20, text_format)
-        
-        if 'Total' in df_export['Store'].values if 'Store' in df_export.columns else False:
-            total_row_format = workbook.add_format({'bold': True, 'align': 'center'})
-            total_row_index = df_export.index[df_export['Store'] == 'Total'][0] + 1
-            worksheet.set_row(total_row_index, None, total_row_format)
+        }),
+        'low_conversion': workbook.add_format({'bg_color': '#fee2e2'}),
+        'number': workbook.add_format({'num_format': '#,##0.00', 'align': 'center'}),
+        'percent': workbook.add_format({'num_format': '0.00%', 'align': 'center'}),
+        'currency': workbook.add_format({'num_format': '₹#,##0.00', 'align': 'center'}),
+        'integer': workbook.add_format({'num_format': '#,##0', 'align': 'center'}),
+        'text': workbook.add_format({'align': 'center'}),
+        'total_row': workbook.add_format({'bold': True, 'align': 'center'})
+    }
+    
+    sheet_names = excel_sheet_names([sheet_name for sheet_name, _ in _tables])
+    for sheet_name, (_, table) in zip(sheet_names, _tables):
+        write_excel_sheet(workbook, formats, sheet_name, table)
     
-    processed_data = output.getvalue()
-    return processed_data
+    workbook.close()
+    return output.getvalue()
+
+# Function to write one table as gzip-compressed CSV
+def table_to_csv_gz(df):
+    """Return the table as .csv.gz bytes; mtime is fixed so equal tables give equal bytes"""
+    output = BytesIO()
+    df.to_csv(output, index=False, compression={'method': 'gzip', 'compresslevel': 6, 'mtime': 0})
+    return output.getvalue()
+
+# Function to write one table as Parquet
+def table_to_parquet(df):
+    """Return the table as .parquet bytes, handing the columns to Arrow as they are"""
+    output = BytesIO()
+    df.to_parquet(output, index=False)
+    return output.getvalue()
+
+# Download formats: label -> (file extension, MIME type, writer for one table)
+# Excel is handled by build_excel_workbook, which keeps all tables in one formatted workbook
+EXPORT_FORMATS = {
+    'Excel': ('xlsx', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', None),
+    'CSV (gzip)': ('csv.gz', 'application/gzip', table_to_csv_gz),
+    'Parquet': ('parquet', 'application/vnd.apache.parquet', table_to_parquet)
+}
+
+# Function to build a CSV or Parquet download
+@st.cache_data(max_entries=EXPORT_CACHE_ENTRIES, show_spinner=False)
+@traced('export', name=lambda fingerprint, export_format, _tables: f"build_table_files {export_format}")
+def build_table_files(fingerprint, export_format, _tables):
+    """Return the file for a single table, or a zip archive with one file per table"""
+    extension, _, write_table = EXPORT_FORMATS[export_format]
+    if len(_tables) == 1:
+        return write_table(_tables[0][1])
+    
+    # The files are compressed already (or columnar), so the archive only stores them
+    output = BytesIO()
+    with zipfile.ZipFile(output, 'w', zipfile.ZIP_STORED) as archive:
+        file_stems = excel_sheet_names([sheet_name for sheet_name, _ in _tables])
+        for file_stem, (_, table) in zip(file_stems, _tables):
+            archive.writestr(f"{slugify(file_stem)}.{extension}", write_table(table))
+    return output.getvalue()
+
+# Function to prepare a download that is only built when it is requested
+def export_download(tables, export_format):
+    """Return (callable for st.download_button, file extension, MIME type) for {sheet name: DataFrame}
+
+    The tables are read when the button is clicked, so tables replaced by a fragment rerun since are exported as shown.
+    """
+    extension, mime, _ = EXPORT_FORMATS[export_format]
+    if extension == 'xlsx':
+        def build():
+            current = list(tables.items())
+            return build_excel_workbook(export_fingerprint(current), current)
+        return build, extension, mime
+    if len(tables) > 1:
+        extension, mime = 'zip', 'application/zip'
+    def build():
+        current = list(tables.items())
+        return build_table_files(export_fingerprint(current), export_format, current)
+    return build, extension, mime
+
+# Function to render the download button of a single table
+def table_download_button(label, df, sheet_name, file_stem, export_format, bundle=None):
+    """Offer a table in the chosen format, also putting it in the all-tables bundle dict if given"""
+    if bundle is not None:
+        bundle[sheet_name] = df
+    data, extension, mime = export_download({sheet_name: df}, export_format)
+    st.download_button(
+        label=f"{label} as {export_format}",
+        data=data,
+        file_name=f"{file_stem}.{extension}",
+        mime=mime
+    )
+
+# Replacement warranty classification rules, checked in order:
+# (replacement category, keywords matched against the upper-cased item category)
+REPLACEMENT_CATEGORY_RULES = [
+    ('FAN', ['CEILING FAN', 'PEDESTAL FAN', 'RECHARGABLE FAN', 'TABLE FAN', 'TOWER FAN', 'WALL FAN']),
+    ('MIXER GRINDER', ['MIXER GRINDER']),
+    ('IRON BOX', ['IRON BOX']),
+    ('ELECTRIC KETTLE', ['ELECTRIC KETTLE']),
+    ('OTG', ['OTG']),
+    ('STEAMER', ['GARMENTS STEAMER', 'STEAMER']),
+    ('INDUCTION COOKER', ['INDUCTION'])
+]
+
+# Item categories that are major appliances; anything else is a small appliance
+MAJOR_APPLIANCES = ['AC', 'TV', 'WASHING MACHINE', 'REFRIGERATOR', 'MICROWAVE OVEN', 'DISH WASHER', 'DRYER']
 
 # Function to map item categories to replacement warranty categories
 def map_to_replacement_category(item_category):
-    fan_categories = ['CEILING FAN', 'PEDESTAL FAN', 'RECHARGABLE FAN', 'TABLE FAN', 'TOWER FAN', 'WALL FAN']
-    steamer_categories = ['GARMENTS STEAMER', 'STEAMER']
-    
-    if any(fan in str(item_category).upper() for fan in fan_categories):
-        return 'FAN'
-    elif 'MIXER GRINDER' in str(item_category).upper():
-        return 'MIXER GRINDER'
-    elif 'IRON BOX' in str(item_category).upper():
-        return 'IRON BOX'
-    elif 'ELECTRIC KETTLE' in str(item_category).upper():
-        return 'ELECTRIC KETTLE'
-    elif 'OTG' in str(item_category).upper():
-        return 'OTG'
-    elif any(steamer in str(item_category).upper() for steamer in steamer_categories):
-        return 'STEAMER'
-    elif 'INDUCTION' in str(item_category).upper():
-        return 'INDUCTION COOKER'
-    else:
-        return item_category
+    item_category_upper = str(item_category).upper()
+    for replacement_category, keywords in REPLACEMENT_CATEGORY_RULES:
+        if any(keyword in item_category_upper for keyword in keywords):
+            return replacement_category
+    return item_category
 
 # Function to check if category is small appliance
 def is_small_appliance(item_category):
-    major_appliances = ['AC', 'TV', 'WASHING MACHINE', 'REFRIGERATOR', 'MICROWAVE OVEN', 'DISH WASHER', 'DRYER']
-    return not any(appliance in str(item_category).upper() for appliance in major_appliances)
+    return not any(appliance in str(item_category).upper() for appliance in MAJOR_APPLIANCES)
 
 # Function to get appliance type
 def get_appliance_type(item_category):
-    major_appliances = ['AC', 'TV', 'WASHING MACHINE', 'REFRIGERATOR', 'MICROWAVE OVEN', 'DISH WASHER', 'DRYER']
-    if any(appliance in str(item_category).upper() for appliance in major_appliances):
+    if any(appliance in str(item_category).upper() for appliance in MAJOR_APPLIANCES):
         return 'Large Appliance'
     else:
         return 'Small Appliance'
 
+# Function to apply a classification once per distinct value of a column
+def map_distinct(series, func):
+    """Evaluate func for each distinct value only and broadcast the results to every row via categorical codes"""
+    categorical = series if isinstance(series.dtype, pd.CategoricalDtype) else series.astype('category')
+    codes = categorical.cat.codes.to_numpy()
+    
+    # The extra trailing entry is the result for missing values, which have code -1
+    lookup = pd.Categorical([func(value) for value in categorical.cat.categories] + [func(np.nan)])
+    mapped = pd.Categorical.from_codes(lookup.codes[codes], categories=lookup.categories)
+    return pd.Series(mapped, index=series.index, name=series.name)
+
 # Function to display loading animation
-def show_loading_animation(message="Loading Data", submessage="Please wait while we fetch your data..."):
-    st.markdown(f"""
+def show_loading_animation(message="Loading Data", submessage="Please wait while we fetch your data...", progress=0.0, placeholder=None):
+    """Draw the loading card; pass an st.empty() placeholder to redraw it in place as progress (0-1) changes"""
+    target = placeholder if placeholder is not None else st
+    target.markdown(f"""
         <div class="loading-container">
             <div class="loading-spinner"></div>
             <div class="loading-text pulse">{message}</div>
             <div class="loading-subtext">{submessage}</div>
             <div class="progress-container">
-                <div class="progress-bar" style="width: 70%;"></div>
+                <div class="progress-bar" style="width: {progress * 100:.0f}%;"></div>
             </div>
         </div>
     """, unsafe_allow_html=True)
 
+# Ratio metrics derived from the additive measures: name -> (numerator, denominator, scale)
+# CORRECTED: Use WarrantyCount for count conversion and AHSP
+RATIO_METRICS = {
+    'Count Conv (%)': ('WarrantyCount', 'TotalCount', 100),
+    'Value Conv (%)': ('WarrantyPrice', 'TotalSoldPrice', 100),
+    'AHSP': ('WarrantyPrice', 'WarrantyCount', 1)
+}
+
+# Function to derive the ratio metrics from summed measures
+def ratio_metrics(measures, metrics=None, decimals=2):
+    """Return {metric: ratio} for RATIO_METRICS (or the named subset) in one NumPy pass
+
+    measures maps measure names to scalars, Series, arrays or 2-D frames of equal shape; scalars
+    come back as floats, anything else as float64 arrays. A ratio is 0 wherever its denominator is ≤ 0,
+    so net returns (negative totals) give 0 rather than a negative rate.
+    """
+    names = list(RATIO_METRICS) if metrics is None else list(metrics)
+    numerators = np.stack([np.asarray(measures[RATIO_METRICS[name][0]], dtype='float64') for name in names])
+    denominators = np.stack([np.asarray(measures[RATIO_METRICS[name][1]], dtype='float64') for name in names])
+    scales = np.array([RATIO_METRICS[name][2] for name in names], dtype='float64').reshape((-1,) + (1,) * (numerators.ndim - 1))
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratios = np.where(denominators > 0, numerators / denominators * scales, 0.0)
+    if decimals is not None:
+        ratios = np.round(ratios, decimals)
+
+    if ratios.ndim == 1:
+        return {name: float(ratio) for name, ratio in zip(names, ratios)}
+    return dict(zip(names, ratios))
+
+# Function to add the ratio metrics to a frame of summed measures
+def add_ratio_metrics(summary, decimals=2):
+    """Add the RATIO_METRICS columns to a frame holding the summed measure columns"""
+    for name, ratios in ratio_metrics(summary, decimals=decimals).items():
+        summary[name] = ratios
+    return summary
+
+# Function to show the headline KPI metrics from summed measures
+def show_kpi_metrics(total_warranty, total_warranty_units, total_units, total_sales):
+    """Render the five KPI metrics in a row of columns"""
+    ratios = ratio_metrics({
+        'WarrantyPrice': total_warranty,
+        'WarrantyCount': total_warranty_units,
+        'TotalCount': total_units,
+        'TotalSoldPrice': total_sales
+    }, decimals=None)
+    count_conversion = ratios['Count Conv (%)']
+    value_conversion = ratios['Value Conv (%)']
+    ahsp = ratios['AHSP']
+    
+    col1, col2, col3, col4, col5 = st.columns(5)
+    with col1:
+        st.metric("💰 Warranty Sales", f"₹{total_warranty:,.0f}")
+    with col2:
+        st.metric("📦 Warranty Units", f"{total_warranty_units:,.0f}")  # CORRECTED: Show WarrantyCount
+    with col3:
+        st.metric("📊 Count Conversion", f"{count_conversion:.2f}%")
+    with col4:
+        st.metric("📈 Value Conversion", f"{value_conversion:.2f}%")
+    with col5:
+        st.metric("💵 AHSP", f"₹{ahsp:,.2f}")
+
 # Function to format numbers in lakhs, crores, and thousands
 def format_indian_currency(value):
     """Format numbers in Indian currency format (Cr, L, T)"""
@@ -689,517 +1439,297 @@ def format_indian_currency(value):
     else:
         return f"{value:.0f}"
 
-# Function to create product-wise monthly summary table with filters applied
-def create_product_monthly_summary(individual_data, filters, category_column, replacement_filter, speaker_filter):
-    """Create a product-wise monthly summary table with formatted values and filters applied"""
-    
-    # Define the main product categories we want to track
-    main_categories = ['AC', 'TV', 'REFRIGERATOR', 'WASHING MACHINE', 'MICROWAVE OVEN']
-    
-    # Initialize the summary dictionary
-    summary_data = []
-    
-    # Get all available months
-    available_months = list(individual_data.keys())
-    
-    for category in main_categories:
-        category_data = {'Product': category}
-        
-        for month in available_months:
-            month_df = individual_data[month]
-            
-            # Apply filters to the month data
-            filtered_month_data = apply_comparison_filters(
-                month_df, 
-                filters, 
-                category_column,
-                replacement_filter,
-                speaker_filter
-            )
-            
-            # Filter data for this category
-            category_sales = filtered_month_data[filtered_month_data['Item Category'] == category]
-            
-            # Calculate warranty sales for this category
-            warranty_sales = category_sales['WarrantyPrice'].sum()
-            
-            # Format the value
-            category_data[month] = format_indian_currency(warranty_sales)
-        
-        summary_data.append(category_data)
+# Main product categories tracked as separate rows in the product-wise monthly summaries
+MAIN_PRODUCT_CATEGORIES = ['AC', 'TV', 'REFRIGERATOR', 'WASHING MACHINE', 'MICROWAVE OVEN']
+
+# Function to aggregate warranty and total sales by row group and month in a single pass
+@traced('table')
+def build_monthly_measures(individual_data, filters, category_column, replacement_filter, speaker_filter, group_by):
+    """Filter each month once and sum the sales measures by [group, month]
+
+    group_by is 'RBM' (one row per RBM) or 'Product' (main categories plus OTHERS).
+    The result feeds both the warranty sales and the value conversion summaries.
+    """
+    months = list(individual_data.keys())
+    measure_columns = ['WarrantyPrice', 'TotalSoldPrice']
+    
+    # Each month is filtered exactly once and stacked with its month as the key
+    filtered_months = [
+        apply_comparison_filters(individual_data[month], filters, category_column, replacement_filter, speaker_filter)[['Item Category', 'RBM'] + measure_columns]
+        for month in months
+    ]
+    filtered = pd.concat(filtered_months, keys=months, names=['Month', None]).reset_index(level='Month') if months else pd.DataFrame(columns=['Month', 'Item Category', 'RBM'] + measure_columns)
+    
+    if group_by == 'RBM':
+        group_keys = filtered['RBM']
+        row_order = sorted(group_keys.dropna().unique().tolist())
+    else:
+        group_keys = map_distinct(filtered['Item Category'], lambda category: category if category in MAIN_PRODUCT_CATEGORIES else 'OTHERS')
+        row_order = MAIN_PRODUCT_CATEGORIES + ['OTHERS']
     
-    # Add "OTHERS" category
-    others_data = {'Product': 'OTHERS'}
+    grouped = filtered.groupby([group_keys.rename('Group'), 'Month'], sort=False, observed=True)[measure_columns].sum()
+    month_totals = filtered.groupby('Month', sort=False, observed=True)[measure_columns].sum().reindex(months, fill_value=0)
     
-    for month in available_months:
-        month_df = individual_data[month]
-        
-        # Apply filters to the month data
-        filtered_month_data = apply_comparison_filters(
-            month_df, 
-            filters, 
-            category_column,
-            replacement_filter,
-            speaker_filter
+    return {
+        'warranty': grouped['WarrantyPrice'].unstack('Month').reindex(index=row_order, columns=months).fillna(0),
+        'sales': grouped['TotalSoldPrice'].unstack('Month').reindex(index=row_order, columns=months).fillna(0),
+        'total_warranty': month_totals['WarrantyPrice'],
+        'total_sales': month_totals['TotalSoldPrice']
+    }
+
+# Function to pivot monthly measures into the wide summary tables shown on the dashboard
+@traced('table')
+def format_monthly_summary(monthly_measures, label_column, view):
+    """Build a formatted row-per-group, column-per-month table with a TOTAL row
+
+    view is 'sales' for warranty sales in Indian currency format or
+    'value_conversion' for warranty sales as a percentage of total sales.
+    """
+    if view == 'value_conversion':
+        warranty = monthly_measures['warranty']
+        total_warranty = monthly_measures['total_warranty']
+        values = pd.DataFrame(
+            ratio_metrics({'WarrantyPrice': warranty, 'TotalSoldPrice': monthly_measures['sales']}, ['Value Conv (%)'], decimals=None)['Value Conv (%)'],
+            index=warranty.index, columns=warranty.columns
         )
-        
-        # Filter data for non-main categories
-        other_categories_sales = filtered_month_data[~filtered_month_data['Item Category'].isin(main_categories)]
-        
-        # Calculate warranty sales for other categories
-        others_warranty_sales = other_categories_sales['WarrantyPrice'].sum()
-        
-        # Format the value
-        others_data[month] = format_indian_currency(others_warranty_sales)
-    
-    summary_data.append(others_data)
-    
-    # Add "TOTAL" row
-    total_data = {'Product': 'TOTAL'}
-    
-    for month in available_months:
-        month_df = individual_data[month]
-        
-        # Apply filters to the month data
-        filtered_month_data = apply_comparison_filters(
-            month_df, 
-            filters, 
-            category_column,
-            replacement_filter,
-            speaker_filter
+        totals = pd.Series(
+            ratio_metrics({'WarrantyPrice': total_warranty, 'TotalSoldPrice': monthly_measures['total_sales']}, ['Value Conv (%)'], decimals=None)['Value Conv (%)'],
+            index=total_warranty.index
         )
-        
-        # Calculate total warranty sales for the month
-        total_warranty_sales = filtered_month_data['WarrantyPrice'].sum()
-        
-        # Format the value
-        total_data[month] = format_indian_currency(total_warranty_sales)
-    
-    summary_data.append(total_data)
+        formatter = lambda value: f"{value:.2f}%"
+    else:
+        values = monthly_measures['warranty']
+        totals = monthly_measures['total_warranty']
+        formatter = format_indian_currency
     
-    # Convert to DataFrame
-    summary_df = pd.DataFrame(summary_data)
+    summary_df = values.apply(lambda month_values: month_values.map(formatter)).astype(object)
+    summary_df.loc['TOTAL'] = totals.map(formatter)
+    summary_df.index.name = label_column
+    summary_df.columns.name = None
     
-    return summary_df
+    return summary_df.reset_index()
+
+# Function to create product-wise monthly summary table with filters applied
+def create_product_monthly_summary(individual_data, filters, category_column, replacement_filter, speaker_filter, monthly_measures=None):
+    """Create a product-wise monthly summary table with formatted values and filters applied"""
+    if monthly_measures is None:
+        monthly_measures = build_monthly_measures(individual_data, filters, category_column, replacement_filter, speaker_filter, 'Product')
+    return format_monthly_summary(monthly_measures, 'Product', 'sales')
 
 # Function to create RBM-wise monthly summary table with filters applied
-def create_rbm_monthly_summary(individual_data, filters, category_column, replacement_filter, speaker_filter):
+def create_rbm_monthly_summary(individual_data, filters, category_column, replacement_filter, speaker_filter, monthly_measures=None):
     """Create an RBM-wise monthly summary table with formatted values and filters applied"""
-    
-    # Initialize the summary dictionary
-    summary_data = []
-    
-    # Get all available months
-    available_months = list(individual_data.keys())
-    
-    # Get all unique RBMs across all months
-    all_rbms = set()
-    for month_data in individual_data.values():
-        filtered_month_data = apply_comparison_filters(
-            month_data, 
-            filters, 
-            category_column,
-            replacement_filter,
-            speaker_filter
-        )
-        all_rbms.update(filtered_month_data['RBM'].unique())
-    
-    all_rbms = sorted(list(all_rbms))
-    
-    for rbm in all_rbms:
-        rbm_data = {'RBM': rbm}
-        
-        for month in available_months:
-            month_df = individual_data[month]
-            
-            # Apply filters to the month data
-            filtered_month_data = apply_comparison_filters(
-                month_df, 
-                filters, 
-                category_column,
-                replacement_filter,
-                speaker_filter
-            )
-            
-            # Filter data for this RBM
-            rbm_sales = filtered_month_data[filtered_month_data['RBM'] == rbm]
-            
-            # Calculate warranty sales for this RBM
-            warranty_sales = rbm_sales['WarrantyPrice'].sum()
-            
-            # Format the value
-            rbm_data[month] = format_indian_currency(warranty_sales)
-        
-        summary_data.append(rbm_data)
-    
-    # Add "TOTAL" row
-    total_data = {'RBM': 'TOTAL'}
-    
-    for month in available_months:
-        month_df = individual_data[month]
-        
-        # Apply filters to the month data
-        filtered_month_data = apply_comparison_filters(
-            month_df, 
-            filters, 
-            category_column,
-            replacement_filter,
-            speaker_filter
-        )
-        
-        # Calculate total warranty sales for the month
-        total_warranty_sales = filtered_month_data['WarrantyPrice'].sum()
-        
-        # Format the value
-        total_data[month] = format_indian_currency(total_warranty_sales)
-    
-    summary_data.append(total_data)
-    
-    # Convert to DataFrame
-    summary_df = pd.DataFrame(summary_data)
-    
-    return summary_df
+    if monthly_measures is None:
+        monthly_measures = build_monthly_measures(individual_data, filters, category_column, replacement_filter, speaker_filter, 'RBM')
+    return format_monthly_summary(monthly_measures, 'RBM', 'sales')
 
 # Function to create RBM-wise monthly value conversion summary table with filters applied
-def create_rbm_monthly_value_conversion_summary(individual_data, filters, category_column, replacement_filter, speaker_filter):
+def create_rbm_monthly_value_conversion_summary(individual_data, filters, category_column, replacement_filter, speaker_filter, monthly_measures=None):
     """Create an RBM-wise monthly value conversion summary table with filters applied"""
-    
-    # Initialize the summary dictionary
-    summary_data = []
-    
-    # Get all available months
-    available_months = list(individual_data.keys())
-    
-    # Get all unique RBMs across all months
-    all_rbms = set()
-    for month_data in individual_data.values():
-        filtered_month_data = apply_comparison_filters(
-            month_data, 
-            filters, 
-            category_column,
-            replacement_filter,
-            speaker_filter
-        )
-        all_rbms.update(filtered_month_data['RBM'].unique())
-    
-    all_rbms = sorted(list(all_rbms))
-    
-    for rbm in all_rbms:
-        rbm_data = {'RBM': rbm}
-        
-        for month in available_months:
-            month_df = individual_data[month]
-            
-            # Apply filters to the month data
-            filtered_month_data = apply_comparison_filters(
-                month_df, 
-                filters, 
-                category_column,
-                replacement_filter,
-                speaker_filter
-            )
-            
-            # Filter data for this RBM
-            rbm_filtered_data = filtered_month_data[filtered_month_data['RBM'] == rbm]
-            
-            # Calculate value conversion for this RBM
-            total_sales = rbm_filtered_data['TotalSoldPrice'].sum()
-            warranty_sales = rbm_filtered_data['WarrantyPrice'].sum()
-            value_conversion = (warranty_sales / total_sales * 100) if total_sales > 0 else 0
-            
-            # Format the value as percentage
-            rbm_data[month] = f"{value_conversion:.2f}%"
-        
-        summary_data.append(rbm_data)
-    
-    # Add "TOTAL" row
-    total_data = {'RBM': 'TOTAL'}
-    
-    for month in available_months:
-        month_df = individual_data[month]
-        
-        # Apply filters to the month data
-        filtered_month_data = apply_comparison_filters(
-            month_df, 
-            filters, 
-            category_column,
-            replacement_filter,
-            speaker_filter
-        )
-        
-        # Calculate overall value conversion for the month
-        total_sales_month = filtered_month_data['TotalSoldPrice'].sum()
-        warranty_sales_month = filtered_month_data['WarrantyPrice'].sum()
-        value_conversion_month = (warranty_sales_month / total_sales_month * 100) if total_sales_month > 0 else 0
-        
-        # Format the value as percentage
-        total_data[month] = f"{value_conversion_month:.2f}%"
-    
-    summary_data.append(total_data)
-    
-    # Convert to DataFrame
-    summary_df = pd.DataFrame(summary_data)
-    
-    return summary_df
+    if monthly_measures is None:
+        monthly_measures = build_monthly_measures(individual_data, filters, category_column, replacement_filter, speaker_filter, 'RBM')
+    return format_monthly_summary(monthly_measures, 'RBM', 'value_conversion')
 
-# NEW FUNCTION: Create product-wise monthly value conversion summary table
-def create_product_monthly_value_conversion_summary(individual_data, filters, category_column, replacement_filter, speaker_filter):
+# Function to create product-wise monthly value conversion summary table with filters applied
+def create_product_monthly_value_conversion_summary(individual_data, filters, category_column, replacement_filter, speaker_filter, monthly_measures=None):
     """Create a product-wise monthly value conversion summary table with filters applied"""
-    
-    # Define the main product categories we want to track
-    main_categories = ['AC', 'TV', 'REFRIGERATOR', 'WASHING MACHINE', 'MICROWAVE OVEN']
-    
-    # Initialize the summary dictionary
-    summary_data = []
-    
-    # Get all available months
-    available_months = list(individual_data.keys())
-    
-    for category in main_categories:
-        category_data = {'Product': category}
-        
-        for month in available_months:
-            month_df = individual_data[month]
-            
-            # Apply filters to the month data
-            filtered_month_data = apply_comparison_filters(
-                month_df, 
-                filters, 
-                category_column,
-                replacement_filter,
-                speaker_filter
-            )
-            
-            # Filter data for this category
-            category_data_filtered = filtered_month_data[filtered_month_data['Item Category'] == category]
-            
-            # Calculate value conversion for this category
-            total_sales = category_data_filtered['TotalSoldPrice'].sum()
-            warranty_sales = category_data_filtered['WarrantyPrice'].sum()
-            value_conversion = (warranty_sales / total_sales * 100) if total_sales > 0 else 0
-            
-            # Format the value as percentage
-            category_data[month] = f"{value_conversion:.2f}%"
-        
-        summary_data.append(category_data)
-    
-    # Add "OTHERS" category
-    others_data = {'Product': 'OTHERS'}
-    
-    for month in available_months:
-        month_df = individual_data[month]
-        
-        # Apply filters to the month data
-        filtered_month_data = apply_comparison_filters(
-            month_df, 
-            filters, 
-            category_column,
-            replacement_filter,
-            speaker_filter
-        )
-        
-        # Filter data for non-main categories
-        other_categories_data = filtered_month_data[~filtered_month_data['Item Category'].isin(main_categories)]
-        
-        # Calculate value conversion for other categories
-        total_sales_others = other_categories_data['TotalSoldPrice'].sum()
-        warranty_sales_others = other_categories_data['WarrantyPrice'].sum()
-        value_conversion_others = (warranty_sales_others / total_sales_others * 100) if total_sales_others > 0 else 0
-        
-        # Format the value as percentage
-        others_data[month] = f"{value_conversion_others:.2f}%"
-    
-    summary_data.append(others_data)
-    
-    # Add "TOTAL" row
-    total_data = {'Product': 'TOTAL'}
-    
-    for month in available_months:
-        month_df = individual_data[month]
-        
-        # Apply filters to the month data
-        filtered_month_data = apply_comparison_filters(
-            month_df, 
-            filters, 
-            category_column,
-            replacement_filter,
-            speaker_filter
-        )
-        
-        # Calculate overall value conversion for the month
-        total_sales_month = filtered_month_data['TotalSoldPrice'].sum()
-        warranty_sales_month = filtered_month_data['WarrantyPrice'].sum()
-        value_conversion_month = (warranty_sales_month / total_sales_month * 100) if total_sales_month > 0 else 0
-        
-        # Format the value as percentage
-        total_data[month] = f"{value_conversion_month:.2f}%"
-    
-    summary_data.append(total_data)
-    
-    # Convert to DataFrame
-    summary_df = pd.DataFrame(summary_data)
-    
-    return summary_df
+    if monthly_measures is None:
+        monthly_measures = build_monthly_measures(individual_data, filters, category_column, replacement_filter, speaker_filter, 'Product')
+    return format_monthly_summary(monthly_measures, 'Product', 'value_conversion')
+
+# Measures summed per key and period before any comparison rate is derived
+COMPARISON_MEASURES = ['WarrantyPrice', 'TotalSoldPrice', 'WarrantyCount', 'TotalCount']
+
+# Rate and measure columns compared between periods, with the name of their change column
+COMPARISON_CHANGES = {
+    'Value Conv (%)': 'Value Conv Change',
+    'Count Conv (%)': 'Count Conv Change',
+    'AHSP': 'AHSP Change',
+    'WarrantyPrice': 'Warranty Sales Change',
+    'WarrantyCount': 'Warranty Units Change'
+}
+
+# Months averaged into the rolling baseline of the month-over-month section
+ROLLING_BASELINE_MONTHS = 3
+
+# Key columns of each comparison table
+COMPARISON_TABLES = {
+    'store_comparison': ['Store'],
+    'staff_comparison': ['Staff Name', 'Store'],
+    'rbm_comparison': ['RBM'],
+    'category_comparison': ['Item Category']
+}
+
+# Function to pick the periods a rolling baseline averages over
+def rolling_baseline(current, window=3, periods=SHEETS):
+    """Return up to `window` periods immediately before `current`, oldest first"""
+    position = periods.index(current)
+    return periods[max(0, position - window):position]
+
+def baseline_label(baseline):
+    """Column suffix for a baseline given as one period or a list of periods"""
+    if isinstance(baseline, str):
+        return baseline
+    if not baseline:
+        return "No baseline"
+    return f"Avg {baseline[0]} to {baseline[-1]}" if len(baseline) > 1 else baseline[0]
+
+# Function to derive the comparison rates from summed measure arrays
+def period_rates(measures, present):
+    """Return Value Conv, Count Conv and AHSP arrays; rates are NaN where the key has no rows in the period"""
+    rates = ratio_metrics(measures, ['Value Conv (%)', 'Count Conv (%)', 'AHSP'])
+    return {name: np.where(present, values, np.nan) for name, values in rates.items()}
+
+# Function to sum the measures of every key in every period into aligned arrays
+def sum_by_key_and_period(data, keys, periods, period_column='Month'):
+    """Return (key frame, {measure: keys x periods array}, keys x periods presence array)
+
+    Keys are numbered in sorted order and rows with a missing key are dropped, as groupby does.
+    With no keys every row belongs to a single overall key.
+    """
+    # Rows of other periods get -1 and are dropped
+    period_codes = pd.Index(periods).get_indexer(data[period_column])
+    if (period_codes < 0).any():
+        data = data[period_codes >= 0]
+        period_codes = period_codes[period_codes >= 0]
+    
+    if keys:
+        factorized = [pd.factorize(data[key], sort=True) for key in keys]
+        sizes = [len(uniques) for _, uniques in factorized]
+        valid = np.logical_and.reduce([codes >= 0 for codes, _ in factorized])
+        combined = np.ravel_multi_index([codes[valid] for codes, _ in factorized], sizes)
+        key_combinations, key_ids = np.unique(combined, return_inverse=True)
+        key_codes = np.unravel_index(key_combinations, sizes)
+        key_frame = pd.DataFrame({key: uniques.take(codes) for key, (_, uniques), codes in zip(keys, factorized, key_codes)})
+        if not valid.all():
+            data = data[valid]
+            period_codes = period_codes[valid]
+    else:
+        key_ids = np.zeros(len(data), dtype=np.intp)
+        key_frame = pd.DataFrame(index=range(1))
+    
+    cells = key_ids * len(periods) + period_codes
+    shape = (len(key_frame), len(periods))
+    present = np.bincount(cells, minlength=shape[0] * shape[1]).reshape(shape) > 0
+    
+    sums = {}
+    for measure in COMPARISON_MEASURES:
+        values = data[measure].to_numpy()
+        totals = np.bincount(cells, weights=values, minlength=shape[0] * shape[1]).reshape(shape)
+        sums[measure] = np.rint(totals).astype(np.int64) if np.issubdtype(values.dtype, np.integer) else totals
+    return key_frame, sums, present
+
+# Function to compare a period with a baseline for every key in one grouped pass
+def compare_periods(data, keys, current, baseline, how='inner', period_column='Month'):
+    """Return one row per key with both sides' measures and rates followed by every change column
+
+    baseline is a period name, or a list of periods whose measures are averaged per key (see
+    rolling_baseline). how='inner' keeps keys present on both sides; how='outer' also keeps keys
+    seen on one side only, counting the missing side's measures as 0. An empty baseline (the
+    rolling baseline of the first period) has no keys, so inner gives an empty frame.
+    """
+    baseline_periods = [baseline] if isinstance(baseline, str) else list(baseline)
+    key_frame, sums, present = sum_by_key_and_period(data, keys, baseline_periods + [current], period_column)
+    
+    current_present = present[:, -1]
+    baseline_present = present[:, :-1].any(axis=1)
+    keep = (current_present & baseline_present) if how == 'inner' else (current_present | baseline_present)
+    
+    after = {measure: totals[keep, -1] for measure, totals in sums.items()}
+    if len(baseline_periods) == 1:
+        before = {measure: totals[keep, 0] for measure, totals in sums.items()}
+    else:
+        # Summed and divided rather than averaged, so an empty baseline gives 0 instead of a NaN warning
+        before = {measure: totals[keep, :-1].sum(axis=1) / max(len(baseline_periods), 1) for measure, totals in sums.items()}
+    before.update(period_rates(before, baseline_present[keep]))
+    after.update(period_rates(after, current_present[keep]))
+    
+    columns = {key: values.array for key, values in key_frame[keep].items()}
+    for side, label in [(before, baseline_label(baseline)), (after, current)]:
+        for column, values in side.items():
+            columns[f'{column}_{label}'] = values
+    
+    for column, change in COMPARISON_CHANGES.items():
+        columns[change] = after[column] - before[column]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for measure, change in [('WarrantyPrice', 'Warranty Sales Change'), ('WarrantyCount', 'Warranty Units Change')]:
+            columns[f'{change} %'] = np.round(np.where(before[measure] > 0, columns[change] / before[measure] * 100, 0), 2)
+    
+    return pd.DataFrame(columns)
+
+# Function to build the month-over-month metrics of every key in long format
+@traced('table')
+def build_period_metrics(data, keys, periods, period_column='Month'):
+    """Return one row per (key, period) with the measures, rates and changes from the previous period
+
+    periods should be in chronological order. Every key gets a row for every period; periods where
+    it has no rows show 0 sales and blank rates. The first period has blank changes.
+    """
+    key_frame, sums, present = sum_by_key_and_period(data, keys, periods, period_column)
+    metrics = dict(sums)
+    metrics.update(period_rates(sums, present))
+    
+    # Month-over-month changes are a shift/diff along the period axis of the aligned arrays
+    changes = {}
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for column, change in COMPARISON_CHANGES.items():
+            changes[change] = np.diff(metrics[column].astype(np.float64), axis=1, prepend=np.nan)
+        for measure, change in [('WarrantyPrice', 'Warranty Sales Change'), ('WarrantyCount', 'Warranty Units Change')]:
+            previous = metrics[measure][:, :-1].astype(np.float64)
+            change_pct = np.round(np.where(previous > 0, changes[change][:, 1:] / previous * 100, 0), 2)
+            changes[f'{change} %'] = np.hstack([np.full((len(key_frame), 1), np.nan), change_pct])
+    
+    # Flatten the (key, period) arrays row by row into the long table
+    key_rows = np.repeat(np.arange(len(key_frame)), len(periods))
+    columns = {key: values.array.take(key_rows) for key, values in key_frame.items()}
+    columns[period_column] = pd.Categorical(np.tile(periods, len(key_frame)), categories=periods, ordered=True)
+    for column, values in {**metrics, **changes}.items():
+        columns[column] = values.ravel()
+    return pd.DataFrame(columns)
+
+# Dimensions and metrics offered by the month-over-month comparison
+PERIOD_COMPARISON_DIMENSIONS = {
+    'Overall': [],
+    'RBM': ['RBM'],
+    'Store': ['Store'],
+    'Staff': ['Staff Name', 'Store'],
+    'Product Category': ['Item Category']
+}
+PERIOD_COMPARISON_METRICS = {  # label: (column, value format, change format)
+    'Value Conv (%)': ('Value Conv (%)', '{:.2f}%', '{:+.2f}%'),
+    'Count Conv (%)': ('Count Conv (%)', '{:.2f}%', '{:+.2f}%'),
+    'AHSP (₹)': ('AHSP', '₹{:,.2f}', '₹{:+,.2f}'),
+    'Warranty Sales (₹)': ('WarrantyPrice', '₹{:,.0f}', '₹{:+,.0f}'),
+    'Warranty Units': ('WarrantyCount', '{:,.0f}', '{:+,.0f}')
+}
 
 # Function to calculate comparison metrics for all tables
-def calculate_comparison(month1_data, month2_data, month1_name, month2_name):
-    """Calculate comparison metrics between two months for all tables"""
-    comparison_data = {}
-    
-    # Store Performance Comparison
-    store_comp1 = month1_data.groupby('Store').agg({
-        'WarrantyPrice': 'sum',
-        'TotalSoldPrice': 'sum',
-        'WarrantyCount': 'sum',
-        'TotalCount': 'sum'
-    }).reset_index()
-    
-    store_comp2 = month2_data.groupby('Store').agg({
-        'WarrantyPrice': 'sum',
-        'TotalSoldPrice': 'sum',
-        'WarrantyCount': 'sum',
-        'TotalCount': 'sum'
-    }).reset_index()
-    
-    # Calculate metrics for both months - CORRECTED: Use WarrantyCount for warranty units and count conversion
-    store_comp1['Value Conv (%)'] = (store_comp1['WarrantyPrice'] / store_comp1['TotalSoldPrice'] * 100).round(2)
-    store_comp1['Count Conv (%)'] = (store_comp1['WarrantyCount'] / store_comp1['TotalCount'] * 100).round(2)
-    store_comp1['AHSP'] = (store_comp1['WarrantyPrice'] / store_comp1['WarrantyCount']).where(store_comp1['WarrantyCount'] > 0, 0).round(2)
-    
-    store_comp2['Value Conv (%)'] = (store_comp2['WarrantyPrice'] / store_comp2['TotalSoldPrice'] * 100).round(2)
-    store_comp2['Count Conv (%)'] = (store_comp2['WarrantyCount'] / store_comp2['TotalCount'] * 100).round(2)
-    store_comp2['AHSP'] = (store_comp2['WarrantyPrice'] / store_comp2['WarrantyCount']).where(store_comp2['WarrantyCount'] > 0, 0).round(2)
-    
-    # Merge for comparison
-    store_comparison = pd.merge(store_comp1, store_comp2, on='Store', suffixes=(f'_{month1_name}', f'_{month2_name}'))
-    
-    # Calculate changes
-    store_comparison['Value Conv Change'] = store_comparison[f'Value Conv (%)_{month2_name}'] - store_comparison[f'Value Conv (%)_{month1_name}']
-    store_comparison['Count Conv Change'] = store_comparison[f'Count Conv (%)_{month2_name}'] - store_comparison[f'Count Conv (%)_{month1_name}']
-    store_comparison['AHSP Change'] = store_comparison[f'AHSP_{month2_name}'] - store_comparison[f'AHSP_{month1_name}']
-    store_comparison['Warranty Sales Change'] = store_comparison[f'WarrantyPrice_{month2_name}'] - store_comparison[f'WarrantyPrice_{month1_name}']
-    store_comparison['Warranty Units Change'] = store_comparison[f'WarrantyCount_{month2_name}'] - store_comparison[f'WarrantyCount_{month1_name}']
-    
-    # Calculate percentage changes
-    store_comparison['Warranty Sales Change %'] = ((store_comparison[f'WarrantyPrice_{month2_name}'] - store_comparison[f'WarrantyPrice_{month1_name}']) / store_comparison[f'WarrantyPrice_{month1_name}'] * 100).where(store_comparison[f'WarrantyPrice_{month1_name}'] > 0, 0).round(2)
-    store_comparison['Warranty Units Change %'] = ((store_comparison[f'WarrantyCount_{month2_name}'] - store_comparison[f'WarrantyCount_{month1_name}']) / store_comparison[f'WarrantyCount_{month1_name}'] * 100).where(store_comparison[f'WarrantyCount_{month1_name}'] > 0, 0).round(2)
-    
-    comparison_data['store_comparison'] = store_comparison
-    
-    # Staff Performance Comparison
-    staff_comp1 = month1_data.groupby(['Staff Name', 'Store']).agg({
-        'WarrantyPrice': 'sum',
-        'TotalSoldPrice': 'sum',
-        'WarrantyCount': 'sum',
-        'TotalCount': 'sum'
-    }).reset_index()
-    
-    staff_comp2 = month2_data.groupby(['Staff Name', 'Store']).agg({
-        'WarrantyPrice': 'sum',
-        'TotalSoldPrice': 'sum',
-        'WarrantyCount': 'sum',
-        'TotalCount': 'sum'
-    }).reset_index()
-    
-    staff_comp1['Value Conv (%)'] = (staff_comp1['WarrantyPrice'] / staff_comp1['TotalSoldPrice'] * 100).round(2)
-    staff_comp1['Count Conv (%)'] = (staff_comp1['WarrantyCount'] / staff_comp1['TotalCount'] * 100).round(2)
-    staff_comp1['AHSP'] = (staff_comp1['WarrantyPrice'] / staff_comp1['WarrantyCount']).where(staff_comp1['WarrantyCount'] > 0, 0).round(2)
-    
-    staff_comp2['Value Conv (%)'] = (staff_comp2['WarrantyPrice'] / staff_comp2['TotalSoldPrice'] * 100).round(2)
-    staff_comp2['Count Conv (%)'] = (staff_comp2['WarrantyCount'] / staff_comp2['TotalCount'] * 100).round(2)
-    staff_comp2['AHSP'] = (staff_comp2['WarrantyPrice'] / staff_comp2['WarrantyCount']).where(staff_comp2['WarrantyCount'] > 0, 0).round(2)
-    
-    staff_comparison = pd.merge(staff_comp1, staff_comp2, on=['Staff Name', 'Store'], suffixes=(f'_{month1_name}', f'_{month2_name}'))
-    
-    staff_comparison['Value Conv Change'] = staff_comparison[f'Value Conv (%)_{month2_name}'] - staff_comparison[f'Value Conv (%)_{month1_name}']
-    staff_comparison['Count Conv Change'] = staff_comparison[f'Count Conv (%)_{month2_name}'] - staff_comparison[f'Count Conv (%)_{month1_name}']
-    staff_comparison['AHSP Change'] = staff_comparison[f'AHSP_{month2_name}'] - staff_comparison[f'AHSP_{month1_name}']
-    staff_comparison['Warranty Sales Change'] = staff_comparison[f'WarrantyPrice_{month2_name}'] - staff_comparison[f'WarrantyPrice_{month1_name}']
-    staff_comparison['Warranty Units Change'] = staff_comparison[f'WarrantyCount_{month2_name}'] - staff_comparison[f'WarrantyCount_{month1_name}']
-    
-    comparison_data['staff_comparison'] = staff_comparison
-    
-    # RBM Performance Comparison
-    rbm_comp1 = month1_data.groupby('RBM').agg({
-        'WarrantyPrice': 'sum',
-        'TotalSoldPrice': 'sum',
-        'WarrantyCount': 'sum',
-        'TotalCount': 'sum'
-    }).reset_index()
-    
-    rbm_comp2 = month2_data.groupby('RBM').agg({
-        'WarrantyPrice': 'sum',
-        'TotalSoldPrice': 'sum',
-        'WarrantyCount': 'sum',
-        'TotalCount': 'sum'
-    }).reset_index()
-    
-    rbm_comp1['Value Conv (%)'] = (rbm_comp1['WarrantyPrice'] / rbm_comp1['TotalSoldPrice'] * 100).round(2)
-    rbm_comp1['Count Conv (%)'] = (rbm_comp1['WarrantyCount'] / rbm_comp1['TotalCount'] * 100).round(2)
-    rbm_comp1['AHSP'] = (rbm_comp1['WarrantyPrice'] / rbm_comp1['WarrantyCount']).where(rbm_comp1['WarrantyCount'] > 0, 0).round(2)
-    
-    rbm_comp2['Value Conv (%)'] = (rbm_comp2['WarrantyPrice'] / rbm_comp2['TotalSoldPrice'] * 100).round(2)
-    rbm_comp2['Count Conv (%)'] = (rbm_comp2['WarrantyCount'] / rbm_comp2['TotalCount'] * 100).round(2)
-    rbm_comp2['AHSP'] = (rbm_comp2['WarrantyPrice'] / rbm_comp2['WarrantyCount']).where(rbm_comp2['WarrantyCount'] > 0, 0).round(2)
-    
-    rbm_comparison = pd.merge(rbm_comp1, rbm_comp2, on='RBM', suffixes=(f'_{month1_name}', f'_{month2_name}'))
-    
-    rbm_comparison['Value Conv Change'] = rbm_comparison[f'Value Conv (%)_{month2_name}'] - rbm_comparison[f'Value Conv (%)_{month1_name}']
-    rbm_comparison['Count Conv Change'] = rbm_comparison[f'Count Conv (%)_{month2_name}'] - rbm_comparison[f'Count Conv (%)_{month1_name}']
-    rbm_comparison['AHSP Change'] = rbm_comparison[f'AHSP_{month2_name}'] - rbm_comparison[f'AHSP_{month1_name}']
-    rbm_comparison['Warranty Sales Change'] = rbm_comparison[f'WarrantyPrice_{month2_name}'] - rbm_comparison[f'WarrantyPrice_{month1_name}']
-    rbm_comparison['Warranty Units Change'] = rbm_comparison[f'WarrantyCount_{month2_name}'] - rbm_comparison[f'WarrantyCount_{month1_name}']
-    
-    comparison_data['rbm_comparison'] = rbm_comparison
-    
-    # Product Category Performance Comparison
-    category_comp1 = month1_data.groupby('Item Category').agg({
-        'WarrantyPrice': 'sum',
-        'TotalSoldPrice': 'sum',
-        'WarrantyCount': 'sum',
-        'TotalCount': 'sum'
-    }).reset_index()
-    
-    category_comp2 = month2_data.groupby('Item Category').agg({
-        'WarrantyPrice': 'sum',
-        'TotalSoldPrice': 'sum',
-        'WarrantyCount': 'sum',
-        'TotalCount': 'sum'
-    }).reset_index()
-    
-    category_comp1['Value Conv (%)'] = (category_comp1['WarrantyPrice'] / category_comp1['TotalSoldPrice'] * 100).round(2)
-    category_comp1['Count Conv (%)'] = (category_comp1['WarrantyCount'] / category_comp1['TotalCount'] * 100).round(2)
-    category_comp1['AHSP'] = (category_comp1['WarrantyPrice'] / category_comp1['WarrantyCount']).where(category_comp1['WarrantyCount'] > 0, 0).round(2)
-    
-    category_comp2['Value Conv (%)'] = (category_comp2['WarrantyPrice'] / category_comp2['TotalSoldPrice'] * 100).round(2)
-    category_comp2['Count Conv (%)'] = (category_comp2['WarrantyCount'] / category_comp2['TotalCount'] * 100).round(2)
-    category_comp2['AHSP'] = (category_comp2['WarrantyPrice'] / category_comp2['WarrantyCount']).where(category_comp2['WarrantyCount'] > 0, 0).round(2)
-    
-    category_comparison = pd.merge(category_comp1, category_comp2, on='Item Category', suffixes=(f'_{month1_name}', f'_{month2_name}'))
-    
-    category_comparison['Value Conv Change'] = category_comparison[f'Value Conv (%)_{month2_name}'] - category_comparison[f'Value Conv (%)_{month1_name}']
-    category_comparison['Count Conv Change'] = category_comparison[f'Count Conv (%)_{month2_name}'] - category_comparison[f'Count Conv (%)_{month1_name}']
-    category_comparison['AHSP Change'] = category_comparison[f'AHSP_{month2_name}'] - category_comparison[f'AHSP_{month1_name}']
-    category_comparison['Warranty Sales Change'] = category_comparison[f'WarrantyPrice_{month2_name}'] - category_comparison[f'WarrantyPrice_{month1_name}']
-    category_comparison['Warranty Units Change'] = category_comparison[f'WarrantyCount_{month2_name}'] - category_comparison[f'WarrantyCount_{month1_name}']
-    
-    comparison_data['category_comparison'] = category_comparison
+@traced('table')
+def calculate_comparison(data, current, baseline, how='inner'):
+    """Calculate comparison metrics between a period and a baseline (a period or a list of periods) for all tables"""
+    baseline_periods = [baseline] if isinstance(baseline, str) else list(baseline)
+    data = data[data['Month'].isin(baseline_periods + [current])]
+    
+    comparison_data = {
+        table: compare_periods(data, keys, current, baseline, how)
+        for table, keys in COMPARISON_TABLES.items()
+    }
     
     # Overall KPIs comparison
-    overall_kpis = {
-        'total_warranty_1': month1_data['WarrantyPrice'].sum(),
-        'total_warranty_2': month2_data['WarrantyPrice'].sum(),
-        'total_units_1': month1_data['TotalCount'].sum(),
-        'total_units_2': month2_data['TotalCount'].sum(),
-        'warranty_units_1': month1_data['WarrantyCount'].sum(),
-        'warranty_units_2': month2_data['WarrantyCount'].sum(),
-        'count_conv_1': (month1_data['WarrantyCount'].sum() / month1_data['TotalCount'].sum() * 100) if month1_data['TotalCount'].sum() > 0 else 0,
-        'count_conv_2': (month2_data['WarrantyCount'].sum() / month2_data['TotalCount'].sum() * 100) if month2_data['TotalCount'].sum() > 0 else 0,
-        'value_conv_1': (month1_data['WarrantyPrice'].sum() / month1_data['TotalSoldPrice'].sum() * 100) if month1_data['TotalSoldPrice'].sum() > 0 else 0,
-        'value_conv_2': (month2_data['WarrantyPrice'].sum() / month2_data['TotalSoldPrice'].sum() * 100) if month2_data['TotalSoldPrice'].sum() > 0 else 0,
-        'ahsp_1': (month1_data['WarrantyPrice'].sum() / month1_data['WarrantyCount'].sum()) if month1_data['WarrantyCount'].sum() > 0 else 0,
-        'ahsp_2': (month2_data['WarrantyPrice'].sum() / month2_data['WarrantyCount'].sum()) if month2_data['WarrantyCount'].sum() > 0 else 0,
-    }
+    totals_1 = data[data['Month'].isin(baseline_periods)][COMPARISON_MEASURES].sum()
+    if len(baseline_periods) > 1:
+        totals_1 = totals_1 / len(baseline_periods)
+    totals_2 = data[data['Month'] == current][COMPARISON_MEASURES].sum()
+    
+    overall_kpis = {}
+    for side, totals in [('1', totals_1), ('2', totals_2)]:
+        overall_kpis[f'total_warranty_{side}'] = totals['WarrantyPrice']
+        overall_kpis[f'total_units_{side}'] = totals['TotalCount']
+        overall_kpis[f'warranty_units_{side}'] = totals['WarrantyCount']
+        ratios = ratio_metrics(totals, decimals=None)
+        overall_kpis[f'count_conv_{side}'] = ratios['Count Conv (%)']
+        overall_kpis[f'value_conv_{side}'] = ratios['Value Conv (%)']
+        overall_kpis[f'ahsp_{side}'] = ratios['AHSP']
     
     # Calculate overall changes
     overall_kpis['warranty_change'] = overall_kpis['total_warranty_2'] - overall_kpis['total_warranty_1']
@@ -1215,12 +1745,12 @@ def calculate_comparison(month1_data, month2_data, month1_name, month2_name):
     return comparison_data
 
 # Function to create monthly warranty sales trend chart
-def create_monthly_trend_chart(individual_data):
+@traced('render')
+def create_monthly_trend_chart(monthly_warranty_sales):
     """Create a line chart showing warranty sales trend across all months"""
     monthly_trend = []
-    
-    for month_name, month_data in individual_data.items():
-        total_warranty = month_data['WarrantyPrice'].sum()
+
+    for month_name, total_warranty in monthly_warranty_sales.items():
         monthly_trend.append({
             'Month': month_name,
             'Warranty Sales': total_warranty
@@ -1255,7 +1785,127 @@ def create_monthly_trend_chart(individual_data):
         return fig
     return None
 
+# Display formats of the table columns, shared by every table on the page
+COLUMN_FORMATS = {
+    'Value Conv (%)': '{:.2f}%',
+    'Count Conv (%)': '{:.2f}%',
+    'AHSP (₹)': '₹{:.2f}',
+    'Warranty Sales (₹)': '₹{:,.0f}',
+    'Warranty Units': '{:,.0f}',
+    'Value Conv Change (%)': '{:+.2f}%',
+    'Count Conv Change (%)': '{:+.2f}%',
+    'AHSP Change (₹)': '₹{:+.2f}',
+    'Warranty Sales Change (₹)': '₹{:+,.0f}',
+    'Warranty Sales Change (%)': '{:+.2f}%',
+    'Warranty Units Change': '{:+,.0f}',
+    'Warranty Units Change (%)': '{:+.2f}%'
+}
+
+# Rows under this Value Conv (%) are highlighted when a table asks for it
+LOW_VALUE_CONVERSION = 2.0
+LOW_VALUE_CONVERSION_STYLE = 'background-color: #fee2e2'
+POSITIVE_CHANGE_STYLE = 'color: #059669; font-weight: 700'
+NEGATIVE_CHANGE_STYLE = 'color: #dc2626; font-weight: 700'
+
+# Function to look up the display formats of a table
+def column_formats(columns):
+    """Return {column: format string} for the columns that have a registered format"""
+    return {col: COLUMN_FORMATS[col] for col in columns if col in COLUMN_FORMATS}
+
+# Function to colour change columns by their sign
+def change_styles(df):
+    """Return a frame of CSS with green positive and red negative changes, built one column at a time"""
+    styles = pd.DataFrame('', index=df.index, columns=df.columns)
+    for col in df.columns:
+        if 'Change' in col and pd.api.types.is_numeric_dtype(df[col]):
+            values = df[col].to_numpy(dtype='float64', na_value=np.nan)
+            styles[col] = np.where(values > 0, POSITIVE_CHANGE_STYLE, np.where(values < 0, NEGATIVE_CHANGE_STYLE, ''))
+    return styles
+
+# Function to highlight rows with a low value conversion
+def low_value_conversion_styles(df):
+    """Return a frame of CSS that shades every row under LOW_VALUE_CONVERSION, except the Total row"""
+    low = (df['Value Conv (%)'] < LOW_VALUE_CONVERSION).to_numpy() & (df.iloc[:, 0] != 'Total').to_numpy()
+    row_styles = np.where(low, LOW_VALUE_CONVERSION_STYLE, '')
+    return pd.DataFrame(np.repeat(row_styles[:, None], len(df.columns), axis=1), index=df.index, columns=df.columns)
+
+# Function to style a table for st.dataframe
+def style_table(df, na_rep=None, highlight_low_value_conv=False):
+    """Format a table from COLUMN_FORMATS and apply the highlight masks to the whole frame at once"""
+    styler = df.style.format(column_formats(df.columns), na_rep=na_rep)
+    if any('Change' in col for col in df.columns):
+        styler = styler.apply(change_styles, axis=None)
+    if highlight_low_value_conv and 'Value Conv (%)' in df.columns:
+        styler = styler.apply(low_value_conversion_styles, axis=None)
+    return styler
+
+# Tables longer than this are paged on the server, and only the visible page goes through style_table
+LARGE_TABLE_ROWS = 500
+TABLE_PAGE_SIZES = [50, 100, 250, 500]
+
+# Function to match a search text against one column
+def search_mask(column, text):
+    """Return a boolean array of the rows whose value contains text, ignoring case"""
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        # Search the distinct values once and map the hits back through the codes
+        hits = np.flatnonzero(column.cat.categories.astype(str).str.contains(text, case=False, regex=False))
+        return np.isin(column.cat.codes.to_numpy(), hits)
+    return column.astype(str).str.contains(text, case=False, regex=False).to_numpy(dtype=bool)
+
+# Function to render a table, paging it when it is large
+# A fragment, so searching or paging one table reruns only that table
+@st.fragment
+@traced('render', name=lambda df, key, **kwargs: f"render_table {key}")
+def render_table(df, key, na_rep=None, pin_total=False, highlight_low_value_conv=False):
+    """Show small tables through style_table and large ones one searchable page at a time
+
+    With pin_total the last row (the Total row) stays under every page and is left out of the search.
+    """
+    if len(df) <= LARGE_TABLE_ROWS:
+        st.dataframe(style_table(df, na_rep, highlight_low_value_conv), use_container_width=True)
+        return
+
+    body = df.iloc[:-1] if pin_total else df
+    total = df.iloc[-1:] if pin_total else df.iloc[:0]
+
+    # A new search or page size starts again from the first page
+    page_key = f"{key}_page"
+    def reset_page():
+        st.session_state[page_key] = 1
+
+    search_col, size_col, page_col = st.columns([3, 1, 1])
+    with search_col:
+        search = st.text_input("🔎 Search", key=f"{key}_search", placeholder="Filter rows by name or store", on_change=reset_page)
+    if search:
+        text_columns = [col for col in body.columns if not pd.api.types.is_numeric_dtype(body[col])]
+        matches = np.zeros(len(body), dtype=bool)
+        for col in text_columns:
+            matches |= search_mask(body[col], search)
+        body = body[matches]
+
+    with size_col:
+        page_size = st.selectbox("Rows per page", TABLE_PAGE_SIZES, key=f"{key}_page_size", on_change=reset_page)
+    page_count = max(1, -(-len(body) // page_size))
+
+    # Data or filter changes can still leave the remembered page past the end
+    if st.session_state.get(page_key, 1) > page_count:
+        st.session_state[page_key] = page_count
+    with page_col:
+        page = st.number_input("Page", min_value=1, max_value=page_count, step=1, key=page_key)
+
+    # Only the visible page is styled and sent to the browser, with the same formats and highlights as small tables
+    start = (page - 1) * page_size
+    page_rows = body.iloc[start:start + page_size]
+    st.dataframe(style_table(pd.concat([page_rows, total]), na_rep, highlight_low_value_conv), use_container_width=True)
+
+    if page_rows.empty:
+        st.caption(f"No rows match '{search}'.")
+    else:
+        matching = f" matching '{search}'" if search else ""
+        st.caption(f"Showing rows {start + 1:,}–{start + len(page_rows):,} of {len(body):,}{matching}")
+
 # Function to add total row to any dataframe with numeric columns
+@traced('table')
 def add_total_row(df, group_by_columns, numeric_columns):
     """Add a total row to a dataframe"""
     if df.empty:
@@ -1279,15 +1929,819 @@ def add_total_row(df, group_by_columns, numeric_columns):
     
     return result_df
 
+# Dimensions and additive measures held by the pre-aggregated cube
+CUBE_DIMENSIONS = ['Month', 'BDM', 'RBM', 'Store', 'Staff Name', 'Item Category', 'Replacement Category']
+MEASURE_COLUMNS = ['TotalSoldPrice', 'WarrantyPrice', 'TotalCount', 'WarrantyCount']
+
+# Function to pre-aggregate the loaded rows into a measure cube
+@traced('transform')
+def build_measure_cube(df):
+    """Sum the four additive measures over every dimension the dashboard filters or groups by"""
+    # Month frames store measures as int32 where possible; widen them so roll-ups can't overflow
+    wide_measures = df[MEASURE_COLUMNS].astype({
+        col: 'int64' if pd.api.types.is_integer_dtype(df[col]) else 'float64' for col in MEASURE_COLUMNS
+    })
+    return wide_measures.groupby([df[col] for col in CUBE_DIMENSIONS], sort=False, dropna=False, observed=True).sum().reset_index()
+
+# Function to split the cube into per-month slices
+@traced('transform')
+def split_cube_by_month(cube):
+    """Return a {month: cube rows} dict in load order"""
+    return {month: month_cube.reset_index(drop=True) for month, month_cube in cube.groupby('Month', sort=False, observed=True)}
+
+# Function to compute the dataset-wide figures that don't depend on any filter
+@traced('transform')
+def compute_load_statistics(cube, month_cubes):
+    """Return the value conversion slider bounds and the monthly warranty sales totals of a load"""
+    store_totals = cube.groupby('Store', observed=True)[['TotalSoldPrice', 'WarrantyPrice']].sum()
+    store_value_conv = ratio_metrics(store_totals, ['Value Conv (%)'])['Value Conv (%)']
+
+    min_conv = float(store_value_conv.min())
+    max_conv = float(store_value_conv.max())
+
+    if min_conv == max_conv:
+        min_conv = max(0, min_conv - 0.1)
+        max_conv = max_conv + 0.1
+
+    return {
+        'value_conv_bounds': (min_conv, max_conv),
+        'monthly_warranty_sales': {month: month_cube['WarrantyPrice'].sum() for month, month_cube in month_cubes.items()}
+    }
+
+# Category groups used by the replacement and speaker checkboxes
+REPLACEMENT_CATEGORIES = ['FAN', 'MIXER GRINDER', 'IRON BOX', 'ELECTRIC KETTLE', 'OTG', 'STEAMER', 'INDUCTION COOKER']
+SPEAKER_CATEGORIES = ['SOUND BAR', 'PARTY SPEAKER', 'BLUETOOTH SPEAKER', 'HOME THEATRE']
+
+# Dimensions that the sidebar filters select on
+FILTER_DIMENSIONS = ['BDM', 'RBM', 'Store', 'Staff Name', 'Item Category', 'Replacement Category']
+
+# Function to precompute the row positions behind every filter value of a frame
+@traced('transform')
+def build_filter_index(data):
+    """Map each filter dimension value (and the FUTURE / replacement / speaker groups) to sorted row positions"""
+    index = {
+        column: data.groupby(column, sort=False, observed=True).indices
+        for column in FILTER_DIMENSIONS if column in data.columns
+    }
+    
+    def union(column, values):
+        positions = [index[column][value] for value in values if value in index.get(column, {})]
+        return np.sort(np.concatenate(positions)) if positions else np.array([], dtype=np.intp)
+    
+    # Group flags are resolved once per distinct value instead of once per row
+    index['replacement'] = union('Replacement Category', REPLACEMENT_CATEGORIES)
+    index['speaker'] = union('Item Category', SPEAKER_CATEGORIES)
+    index['future'] = union('Store', [store for store in index.get('Store', {}) if 'FUTURE' in str(store)])
+    return index
+
+# Filter indexes are kept per frame object for as long as the frame is alive
+# The registry is a cached resource because the script's own globals are rebuilt on every rerun
+@st.cache_resource
+def filter_index_registry():
+    """Return the process-wide {id(frame): (weakref to frame, index)} map"""
+    return {}
+
+def get_filter_index(data):
+    """Return the filter index for a frame, building it on first use"""
+    registry = filter_index_registry()
+    key = id(data)
+    entry = registry.get(key)
+    if entry is not None and entry[0]() is data:
+        return entry[1]
+    
+    index = build_filter_index(data)
+    registry[key] = (weakref.ref(data, lambda _, key=key: registry.pop(key, None)), index)
+    return index
+
+# Sidebar dropdown filters: filter key -> column, where None stands for the active category column
+DROPDOWN_FILTERS = {
+    'selected_bdm': 'BDM',
+    'selected_rbm': 'RBM',
+    'selected_store': 'Store',
+    'selected_category': None,
+    'selected_staff': 'Staff Name'
+}
+
+# Function to check whether any filter would drop rows
+def has_active_filters(filters, replacement_filter, speaker_filter):
+    """Return True when a checkbox is ticked or a dropdown is set to anything but 'All'"""
+    return bool(
+        replacement_filter or speaker_filter or filters['future_filter']
+        or any(filters[filter_key] != 'All' for filter_key in DROPDOWN_FILTERS)
+    )
+
+# Function to resolve the active filters to row positions
+def filter_positions(index, filters, category_column, replacement_filter, speaker_filter):
+    """Intersect the row positions of every active filter; None means no filter is active"""
+    selections = []
+    
+    # Apply replacement or speaker filter first
+    if replacement_filter:
+        selections.append(index['replacement'])
+    elif speaker_filter:
+        selections.append(index['speaker'])
+    
+    empty = np.array([], dtype=np.intp)
+    for filter_key, column in DROPDOWN_FILTERS.items():
+        if filters[filter_key] != 'All':
+            selections.append(index[column or category_column].get(filters[filter_key], empty))
+    if filters['future_filter']:
+        selections.append(index['future'])
+    
+    if not selections:
+        return None
+    
+    # Intersect from the smallest selection so every step stays as small as possible
+    selections.sort(key=len)
+    positions = selections[0]
+    for other in selections[1:]:
+        positions = np.intersect1d(positions, other, assume_unique=True)
+    return positions
+
+# Function to filter a frame that is only filtered once
+def filter_mask(data, filters, category_column, replacement_filter, speaker_filter):
+    """Return a boolean row mask of the active filters, compared column by column without building an index"""
+    mask = np.ones(len(data), dtype=bool)
+    if replacement_filter:
+        mask &= data['Replacement Category'].isin(REPLACEMENT_CATEGORIES).to_numpy()
+    elif speaker_filter:
+        mask &= data['Item Category'].isin(SPEAKER_CATEGORIES).to_numpy()
+    
+    for filter_key, column in DROPDOWN_FILTERS.items():
+        if filters[filter_key] != 'All':
+            mask &= (data[column or category_column] == filters[filter_key]).to_numpy(dtype=bool)
+    if filters['future_filter']:
+        mask &= map_distinct(data['Store'], lambda store: 'FUTURE' in str(store)).to_numpy(dtype=bool)
+    return mask
+
+# Apply filters function for comparison data
+@traced('transform')
+def apply_comparison_filters(data, filters, category_column, replacement_filter, speaker_filter):
+    """Apply filters to comparison data, returning the frame itself when no filter is active"""
+    # Without an active filter there is nothing to look up, so no index is built for the frame
+    if not has_active_filters(filters, replacement_filter, speaker_filter):
+        return data
+    positions = filter_positions(get_filter_index(data), filters, category_column, replacement_filter, speaker_filter)
+    if positions is None:
+        return data
+    return data.take(positions)
+
+# Sidebar dropdowns that cascade, from the broadest level to the narrowest
+HIERARCHY_LEVELS = ['BDM', 'RBM', 'Store', 'Staff Name']
+
+# Function to index the BDM → RBM → Store → Staff hierarchy of a frame
+@traced('transform')
+def build_dimension_hierarchy(data, category_column):
+    """Precompute the sorted options of every level under every combination of broader selections
+
+    options[level] is keyed by the selections of the levels above it, with 'All' for an open level.
+    """
+    paths = data[HIERARCHY_LEVELS].drop_duplicates().dropna()
+    options = {}
+
+    for depth, level in enumerate(HIERARCHY_LEVELS):
+        options[level] = {(): sorted(paths[level].unique().tolist())}
+        for fixed in itertools.product([True, False], repeat=depth):
+            parents = [parent for parent, is_fixed in zip(HIERARCHY_LEVELS, fixed) if is_fixed]
+            if not parents:
+                continue
+            for key, values in paths.groupby(parents, observed=True)[level].unique().items():
+                selected = iter(key if isinstance(key, tuple) else (key,))
+                full_key = tuple(next(selected) if is_fixed else 'All' for is_fixed in fixed)
+                options[level][full_key] = sorted(values.tolist())
+
+        # The all-open key of deeper levels is the same list as the level's own root
+        options[level][('All',) * depth] = options[level][()]
+
+    return {
+        'options': options,
+        'categories': sorted(data[category_column].dropna().unique().tolist())
+    }
+
+# Function to get the hierarchy of the loaded cube for the active category scope
+def get_dimension_hierarchy(dataset, replacement_filter, speaker_filter):
+    """Return the hierarchy of a SharedDataset for the current scope, building it once per dataset"""
+    scope = 'replacement' if replacement_filter else 'speaker' if speaker_filter else 'all'
+    return dataset.dimension_hierarchy(scope)
+
+# Function to look up the options of one hierarchy level
+def hierarchy_options(hierarchy, level, selections):
+    """Return 'All' plus the values of a level under the selections of the levels above it"""
+    depth = HIERARCHY_LEVELS.index(level)
+    return ['All'] + hierarchy['options'][level].get(tuple(selections[:depth]), [])
+
+# --- Dashboard Sections ---
+# Sections with controls of their own run as fragments: changing one of those controls reruns only its
+# section, not the filters, styling and unrelated tables of the whole script. A section gets everything
+# it shows as arguments, so its data dependencies are explicit and a fragment rerun reuses the frames of
+# the last full run. Sidebar controls are drawn into containers that the full run reserves for them.
+
+# Columns the performance tables can be sorted by
+SORT_OPTIONS = ["Count Conv (%)", "Value Conv (%)", "AHSP (₹)", "Warranty Sales (₹)", "Warranty Units"]
+
+# Display names of the summed measures and ratio metrics in the performance tables
+PERFORMANCE_COLUMNS = {
+    'WarrantyPrice': 'Warranty Sales (₹)',
+    'WarrantyCount': 'Warranty Units',  # CORRECTED: Use WarrantyCount for warranty units
+    'Count Conv (%)': 'Count Conv (%)',
+    'Value Conv (%)': 'Value Conv (%)',
+    'AHSP': 'AHSP (₹)'
+}
+
+# Function to sum the filtered measures by one grouping
+def summarise_performance(display_df, by, name):
+    """Return the summed measures and ratio metrics per group, timed as the '<name>_summary' span"""
+    with trace_span(f"{name}_summary", "table", input_rows=len(display_df)) as span:
+        summary = add_ratio_metrics(display_df.groupby(by, observed=True)[MEASURE_COLUMNS].sum().reset_index())
+        span["rows"] = len(summary)
+    return summary
+
+# Function to build a sorted performance table with its Total row
+def performance_table(summary, label_columns, measure_columns, sort_by, sort_order, row_filter=None):
+    """Return the display columns of a summary sorted by sort_by, with a Total row at the bottom
+
+    label_columns maps summary columns to display names; row_filter may drop display rows before sorting.
+    """
+    columns = {**label_columns, **{column: PERFORMANCE_COLUMNS[column] for column in measure_columns}}
+    display = summary[list(columns)].rename(columns=columns)
+    if row_filter is not None:
+        display = display[row_filter(display)]
+    display = display.sort_values(sort_by, ascending=sort_order == "Ascending")
+
+    totals = summary[MEASURE_COLUMNS].sum()
+    total_values = {**totals.to_dict(), **ratio_metrics(totals)}
+    first_label = next(iter(label_columns.values()))
+    total_row = pd.DataFrame({
+        name: [total_values.get(column, 'Total' if name == first_label else '')]
+        for column, name in columns.items()
+    })
+    return pd.concat([display, total_row], ignore_index=True)
+
+# Function to show the monthly comparison of two months
+@st.fragment
+def show_comparison_section(filtered_df, month1, month2, export_format, bundle):
+    """Comparison KPIs, change tables and downloads; the unmatched rows checkbox reruns only this section"""
+    st.markdown(f'<div class="comparison-header">📊 Monthly Comparison Analysis</div>', unsafe_allow_html=True)
+    
+    st.markdown(f'### 🔄 Comparison: {month1} vs {month2}')
+    
+    include_unmatched = st.checkbox(
+        "Include stores, staff and categories present in only one month",
+        key="comparison_include_unmatched",
+        help="Rows missing from one month count its sales as 0; their rate changes are left blank"
+    )
+    
+    # Calculate comparison metrics for all tables from the filtered data of both months
+    comparison_data = calculate_comparison(
+        filtered_df, 
+        month2, 
+        month1,
+        how='outer' if include_unmatched else 'inner'
+    )
+    
+    # Display overall KPI comparison - Show only changes, not combined totals
+    kpis = comparison_data['overall_kpis']
+    col1, col2, col3, col4, col5 = st.columns(5)
+    
+    with col1:
+        st.metric(
+            "💰 Warranty Sales Change", 
+            f"₹{kpis['warranty_change']:+,.0f}",
+            f"{kpis['warranty_change_pct']:+.1f}%",
+            delta_color="normal"
+        )
+    
+    with col2:
+        st.metric(
+            "📦 Warranty Units Change", 
+            f"{kpis['warranty_units_change']:+,.0f}",
+            f"{kpis['warranty_units_change_pct']:+.1f}%",
+            delta_color="normal"
+        )
+    
+    with col3:
+        st.metric(
+            "📊 Count Conversion Change", 
+            f"{kpis['count_conv_change']:+.2f}%",
+            delta_color="normal"
+        )
+    
+    with col4:
+        st.metric(
+            "📈 Value Conversion Change", 
+            f"{kpis['value_conv_change']:+.2f}%",
+            delta_color="normal"
+        )
+    
+    with col5:
+        st.metric(
+            "💵 AHSP Change", 
+            f"₹{kpis['ahsp_change']:+.2f}",
+            delta_color="normal"
+        )
+    
+    # Store comparison table - Show only changes
+    st.markdown(f'#### 🏬 Store Performance Changes')
+    store_comp = comparison_data['store_comparison']
+    
+    # Create display table with only change columns
+    display_cols = ['Store']
+    # Add change columns only
+    display_cols.extend([
+        'Value Conv Change', 
+        'Count Conv Change', 
+        'AHSP Change', 
+        'Warranty Sales Change',
+        'Warranty Sales Change %',
+        'Warranty Units Change',
+        'Warranty Units Change %'
+    ])
+    
+    # Check if all required columns exist
+    missing_cols = [col for col in display_cols if col not in store_comp.columns]
+    if missing_cols:
+        st.warning(f"Some comparison data is missing: {missing_cols}")
+        # Use only available columns
+        display_cols = [col for col in display_cols if col in store_comp.columns]
+    
+    comparison_display = store_comp[display_cols].copy()
+    
+    # Rename columns for better display
+    column_mapping = {
+        'Value Conv Change': 'Value Conv Change (%)',
+        'Count Conv Change': 'Count Conv Change (%)',
+        'AHSP Change': 'AHSP Change (₹)',
+        'Warranty Sales Change': 'Warranty Sales Change (₹)',
+        'Warranty Sales Change %': 'Warranty Sales Change (%)',
+        'Warranty Units Change': 'Warranty Units Change',
+        'Warranty Units Change %': 'Warranty Units Change (%)'
+    }
+    
+    comparison_display = comparison_display.rename(columns=column_mapping)
+    
+    render_table(comparison_display, key='store_comparison_table', na_rep='—')
+    
+    # Staff Performance Comparison
+    st.markdown(f'#### 👨‍💼 Staff Performance Changes')
+    staff_comp = comparison_data['staff_comparison']
+    
+    # Create display table with only change columns
+    staff_display_cols = ['Staff Name', 'Store']
+    staff_display_cols.extend([
+        'Value Conv Change', 
+        'Count Conv Change', 
+        'AHSP Change', 
+        'Warranty Sales Change',
+        'Warranty Units Change'
+    ])
+    
+    staff_comparison_display = staff_comp[staff_display_cols].copy()
+    
+    # Rename columns for better display
+    staff_column_mapping = {
+        'Value Conv Change': 'Value Conv Change (%)',
+        'Count Conv Change': 'Count Conv Change (%)',
+        'AHSP Change': 'AHSP Change (₹)',
+        'Warranty Sales Change': 'Warranty Sales Change (₹)',
+        'Warranty Units Change': 'Warranty Units Change'
+    }
+    
+    staff_comparison_display = staff_comparison_display.rename(columns=staff_column_mapping)
+    
+    render_table(staff_comparison_display, key='staff_comparison_table', na_rep='—')
+    
+    # RBM Performance Comparison
+    st.markdown(f'#### 👥 RBM Performance Changes')
+    rbm_comp = comparison_data['rbm_comparison']
+    
+    # Create display table with only change columns
+    rbm_display_cols = ['RBM']
+    rbm_display_cols.extend([
+        'Value Conv Change', 
+        'Count Conv Change', 
+        'AHSP Change', 
+        'Warranty Sales Change',
+        'Warranty Units Change'
+    ])
+    
+    rbm_comparison_display = rbm_comp[rbm_display_cols].copy()
+    
+    # Rename columns for better display
+    rbm_column_mapping = {
+        'Value Conv Change': 'Value Conv Change (%)',
+        'Count Conv Change': 'Count Conv Change (%)',
+        'AHSP Change': 'AHSP Change (₹)',
+        'Warranty Sales Change': 'Warranty Sales Change (₹)',
+        'Warranty Units Change': 'Warranty Units Change'
+    }
+    
+    rbm_comparison_display = rbm_comparison_display.rename(columns=rbm_column_mapping)
+    
+    render_table(rbm_comparison_display, key='rbm_comparison_table', na_rep='—')
+    
+    # Product Category Performance Comparison
+    st.markdown(f'#### 📦 Product Category Performance Changes')
+    category_comp = comparison_data['category_comparison']
+    
+    # Create display table with only change columns
+    category_display_cols = ['Item Category']
+    category_display_cols.extend([
+        'Value Conv Change', 
+        'Count Conv Change', 
+        'AHSP Change', 
+        'Warranty Sales Change',
+        'Warranty Units Change'
+    ])
+    
+    category_comparison_display = category_comp[category_display_cols].copy()
+    
+    # Rename columns for better display
+    category_column_mapping = {
+        'Value Conv Change': 'Value Conv Change (%)',
+        'Count Conv Change': 'Count Conv Change (%)',
+        'AHSP Change': 'AHSP Change (₹)',
+        'Warranty Sales Change': 'Warranty Sales Change (₹)',
+        'Warranty Units Change': 'Warranty Units Change'
+    }
+    
+    category_comparison_display = category_comparison_display.rename(columns=category_column_mapping)
+    
+    render_table(category_comparison_display, key='category_comparison_table', na_rep='—')
+    
+    # Download option for comparison data
+    st.markdown("---")
+    st.markdown("#### 📥 Download Comparison Data")
+    
+    col1, col2, col3, col4 = st.columns(4)
+    
+    with col1:
+        store_comparison_download = store_comp[['Store'] + [col for col in store_comp.columns if 'Change' in col]]
+        table_download_button(
+            label="Download Store Comparison",
+            df=store_comparison_download,
+            sheet_name='Store Comparison',
+            file_stem=f"store_comparison_{month1}_vs_{month2}",
+            export_format=export_format,
+            bundle=bundle
+        )
+    
+    with col2:
+        staff_comparison_download = staff_comp[['Staff Name', 'Store'] + [col for col in staff_comp.columns if 'Change' in col]]
+        table_download_button(
+            label="Download Staff Comparison",
+            df=staff_comparison_download,
+            sheet_name='Staff Comparison',
+            file_stem=f"staff_comparison_{month1}_vs_{month2}",
+            export_format=export_format,
+            bundle=bundle
+        )
+    
+    with col3:
+        rbm_comparison_download = rbm_comp[['RBM'] + [col for col in rbm_comp.columns if 'Change' in col]]
+        table_download_button(
+            label="Download RBM Comparison",
+            df=rbm_comparison_download,
+            sheet_name='RBM Comparison',
+            file_stem=f"rbm_comparison_{month1}_vs_{month2}",
+            export_format=export_format,
+            bundle=bundle
+        )
+    
+    with col4:
+        category_comparison_download = category_comp[['Item Category'] + [col for col in category_comp.columns if 'Change' in col]]
+        table_download_button(
+            label="Download Category Comparison",
+            df=category_comparison_download,
+            sheet_name='Category Comparison',
+            file_stem=f"category_comparison_{month1}_vs_{month2}",
+            export_format=export_format,
+            bundle=bundle
+        )
+    
+    # Add some space between comparisons
+    st.markdown("---")
+
+# Function to show the store performance table
+@st.fragment
+def show_store_performance(store_summary, view_label, file_suffix, sort_by, sort_order, value_conv_bounds, value_conv_slot, export_format, bundle):
+    """Store table and its Value Conversion range slider; moving the slider reruns only this section"""
+    st.markdown(f'<h3 class="subheader">🏬 Store Performance Analysis - {view_label}</h3>', unsafe_allow_html=True)
+
+    # Bounds come from the whole dataset, so they are worked out once per load
+    min_conv, max_conv = value_conv_bounds
+    with value_conv_slot:
+        st.markdown('<hr>', unsafe_allow_html=True)
+        st.markdown('<h4 style="color: #1e293b; font-weight: 600;">📊 Value Conversion Filter</h4>', unsafe_allow_html=True)
+        value_conv_range = st.slider(
+            "Filter by Value Conversion (%)",
+            min_value=min_conv,
+            max_value=max_conv,
+            value=(min_conv, max_conv),
+            step=0.1,
+            help="Filter stores based on Value Conversion percentage range"
+        )
+
+    def store_rows(display):
+        rows = display['Store'] != 'Total'
+        if value_conv_range != (min_conv, max_conv):
+            rows &= (display['Value Conv (%)'] >= value_conv_range[0]) & (display['Value Conv (%)'] <= value_conv_range[1])
+        return rows
+
+    final_store_display = performance_table(
+        store_summary,
+        {'Store': 'Store'},
+        ['WarrantyPrice', 'WarrantyCount', 'Count Conv (%)', 'Value Conv (%)', 'AHSP'],
+        sort_by,
+        sort_order,
+        row_filter=store_rows
+    )
+
+    render_table(final_store_display, key='store_performance_table', highlight_low_value_conv=True)
+
+    table_download_button(
+        label="📥 Download Store Performance",
+        df=final_store_display,
+        sheet_name='Store Performance',
+        file_stem=f"store_performance_{file_suffix}",
+        export_format=export_format,
+        bundle=bundle
+    )
+
+# Function to show the store, staff, RBM and product category performance tables
+@st.fragment
+def show_performance_tables(summaries, view_label, file_suffix, value_conv_bounds, sort_slot, value_conv_slot, export_format, bundle):
+    """Performance tables of the current view; changing the sort reruns only this section
+
+    summaries holds the store, staff, rbm, category and item_category summaries of the filtered data.
+    """
+    with sort_slot:
+        # Sorting option for all tables
+        st.markdown('<hr>', unsafe_allow_html=True)
+        sort_by = st.selectbox("📊 Sort All Tables By", SORT_OPTIONS, index=0)
+        sort_order = st.selectbox("↕️ Sort Order", ["Descending", "Ascending"], index=0)
+
+    # The store table is a fragment of its own so the slider leaves the other tables alone
+    show_store_performance(summaries['store'], view_label, file_suffix, sort_by, sort_order, value_conv_bounds, value_conv_slot, export_format, bundle)
+
+    # Staff Performance Table
+    st.markdown(f'<h3 class="subheader">👨‍💼 Staff Performance Analysis - {view_label}</h3>', unsafe_allow_html=True)
+    staff_display_with_total = performance_table(
+        summaries['staff'],
+        {'Staff Name': 'Staff Name', 'Store': 'Store'},
+        ['Value Conv (%)', 'Count Conv (%)', 'WarrantyPrice', 'WarrantyCount', 'AHSP'],
+        sort_by,
+        sort_order
+    )
+
+    render_table(staff_display_with_total, key='staff_performance_table', pin_total=True)
+
+    table_download_button(
+        label="📥 Download Staff Performance",
+        df=staff_display_with_total,
+        sheet_name='Staff Performance',
+        file_stem=f"staff_performance_{file_suffix}",
+        export_format=export_format,
+        bundle=bundle
+    )
+
+    # RBM Performance
+    st.markdown(f'<h3 class="subheader">👥 RBM Performance Analysis - {view_label}</h3>', unsafe_allow_html=True)
+    rbm_display_with_total = performance_table(
+        summaries['rbm'],
+        {'RBM': 'RBM'},
+        ['Count Conv (%)', 'Value Conv (%)', 'AHSP', 'WarrantyPrice', 'WarrantyCount'],
+        sort_by,
+        sort_order
+    )
+
+    render_table(rbm_display_with_total, key='rbm_performance_table')
+
+    table_download_button(
+        label="📥 Download RBM Performance",
+        df=rbm_display_with_total,
+        sheet_name='RBM Performance',
+        file_stem=f"rbm_performance_{file_suffix}",
+        export_format=export_format,
+        bundle=bundle
+    )
+
+    # Product Category Performance with Small Appliance Grouping
+    st.markdown(f'<h3 class="subheader">📦 Product Category Performance - {view_label}</h3>', unsafe_allow_html=True)
+    if not summaries['category'].empty:
+        category_display_with_total = performance_table(
+            summaries['category'],
+            {'Grouped Category': 'Product Category'},
+            ['Count Conv (%)', 'Value Conv (%)', 'AHSP', 'WarrantyPrice', 'WarrantyCount'],
+            sort_by,
+            sort_order
+        )
+
+        render_table(category_display_with_total, key='category_performance_table')
+
+        table_download_button(
+            label="📥 Download Product Category Performance",
+            df=category_display_with_total,
+            sheet_name='Product Category Performance',
+            file_stem=f"product_category_performance_{file_suffix}",
+            export_format=export_format,
+            bundle=bundle
+        )
+    else:
+        st.warning("⚠️ No category data available with current filters.")
+
+    # Item Category Performance (Full Product Breakdown)
+    st.markdown(f'<h3 class="subheader">📋 Item Category Performance - Full Product Breakdown - {view_label}</h3>', unsafe_allow_html=True)
+    if not summaries['item_category'].empty:
+        item_category_display_with_total = performance_table(
+            summaries['item_category'],
+            {'Item Category': 'Item Category'},
+            ['Count Conv (%)', 'Value Conv (%)', 'AHSP', 'WarrantyPrice', 'WarrantyCount'],
+            sort_by,
+            sort_order
+        )
+
+        render_table(item_category_display_with_total, key='item_category_performance_table')
+
+        table_download_button(
+            label="📥 Download Item Category Performance",
+            df=item_category_display_with_total,
+            sheet_name='Item Category Performance',
+            file_stem=f"item_category_performance_{file_suffix}",
+            export_format=export_format,
+            bundle=bundle
+        )
+    else:
+        st.info("ℹ️ No item category data available with current filters.")
+
+# Function to show the month-over-month comparison of three or more months
+@st.fragment
+def show_period_comparison(filtered_df, period_list, export_format, bundle):
+    """Month-over-month metrics table; its dimension, metric and change controls rerun only this section"""
+    st.markdown(f'<h3 class="subheader">📆 Month-over-Month Comparison</h3>', unsafe_allow_html=True)
+    
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        period_dimension = st.selectbox("Compare by", list(PERIOD_COMPARISON_DIMENSIONS), key="period_comparison_dimension")
+    with col2:
+        period_metric = st.selectbox("Metric", list(PERIOD_COMPARISON_METRICS), key="period_comparison_metric")
+    with col3:
+        show_period_changes = st.checkbox("Show change from previous month", key="period_comparison_changes")
+    
+    # All months and keys come from one pass over the filtered cube
+    period_keys = PERIOD_COMPARISON_DIMENSIONS[period_dimension]
+    period_metrics = build_period_metrics(filtered_df, period_keys, period_list)
+    
+    metric_column, value_format, change_format = PERIOD_COMPARISON_METRICS[period_metric]
+    if show_period_changes:
+        metric_column = COMPARISON_CHANGES[metric_column]
+    
+    # One row per key and one column per month for the chosen metric
+    if period_keys:
+        period_view = period_metrics.pivot(index=period_keys, columns='Month', values=metric_column)
+    else:
+        period_view = period_metrics.set_index('Month')[[metric_column]].T.rename(index={metric_column: 'All'})
+    period_view.columns = period_view.columns.astype(str)
+    
+    st.dataframe(
+        period_view.style.format(change_format if show_period_changes else value_format, na_rep='—'),
+        use_container_width=True
+    )
+    
+    with st.expander("📋 All month-over-month metrics (long format)"):
+        st.dataframe(period_metrics, use_container_width=True)
+        table_download_button(
+            label="📥 Download Month-over-Month Metrics",
+            df=period_metrics,
+            sheet_name='Month-over-Month',
+            file_stem=f"month_over_month_{slugify(period_dimension)}",
+            export_format=export_format,
+            bundle=bundle
+        )
+    
+    # One month against the average of the loaded months before it, for the chosen dimension
+    rolling_month = st.selectbox(
+        "Month to compare with its rolling baseline",
+        period_list,
+        index=len(period_list) - 1,
+        key="rolling_baseline_month",
+        help=f"The baseline averages up to {ROLLING_BASELINE_MONTHS} loaded months before it"
+    )
+    baseline = rolling_baseline(rolling_month, ROLLING_BASELINE_MONTHS, period_list)
+    rolling_comparison = compare_periods(filtered_df, period_keys, rolling_month, baseline)
+    
+    st.markdown(f'#### 🎯 {rolling_month} vs {baseline_label(baseline)}')
+    if rolling_comparison.empty:
+        st.info(f"No month before {rolling_month} is loaded to compare it with." if not baseline else "No rows appear on both sides of the comparison.")
+    else:
+        rolling_columns = {
+            'Value Conv Change': 'Value Conv Change (%)',
+            'Count Conv Change': 'Count Conv Change (%)',
+            'AHSP Change': 'AHSP Change (₹)',
+            'Warranty Sales Change': 'Warranty Sales Change (₹)',
+            'Warranty Sales Change %': 'Warranty Sales Change (%)',
+            'Warranty Units Change': 'Warranty Units Change',
+            'Warranty Units Change %': 'Warranty Units Change (%)'
+        }
+        rolling_display = rolling_comparison[period_keys + list(rolling_columns)].rename(columns=rolling_columns)
+        if not period_keys:
+            rolling_display.index = ['All']
+        render_table(rolling_display, key='rolling_baseline_table', na_rep='—')
+
+# --- Process-wide Shared Dataset ---
+# Sessions viewing the same months point at one read-only SharedDataset instead of each
+# holding its own copy in session state, so server memory grows with the data rather than
+# with data x users. Datasets are keyed by their months' cache keys, and the live month by
+# its content, so a month whose rows changed gives a new dataset while sessions opened in
+# different refresh windows still share one. Each is dropped when its last session lets go.
+class SharedDataset:
+    """The measure cube of a set of months and everything derived from it; shared, so never modified"""
+    
+    def __init__(self, key, sheets, measure_cube):
+        self.key = key
+        self.sheets = tuple(sheets)
+        self.measure_cube = measure_cube
+        self.month_cubes = types.MappingProxyType(split_cube_by_month(measure_cube))
+        self.load_statistics = compute_load_statistics(measure_cube, self.month_cubes)
+        self.hierarchies = {}
+        self.lock = threading.Lock()
+        
+        # Filter indexes are built up front, while the dataset is still private to its loader
+        for cube_frame in [measure_cube, *self.month_cubes.values()]:
+            get_filter_index(cube_frame)
+    
+    def dimension_hierarchy(self, scope):
+        """Return the hierarchy of a category scope ('all', 'replacement' or 'speaker'), building it on first use"""
+        with self.lock:
+            if scope not in self.hierarchies:
+                cube = self.measure_cube
+                data = cube if scope == 'all' else cube.take(get_filter_index(cube)[scope])
+                category_column = 'Replacement Category' if scope == 'replacement' else 'Item Category'
+                self.hierarchies[scope] = build_dimension_hierarchy(data, category_column)
+            return self.hierarchies[scope]
+
+class DatasetHandle:
+    """A session's reference to a dataset, released once: explicitly or when the session state is discarded"""
+    
+    def __init__(self, dataset, store=None):
+        self.dataset = dataset
+        self.store = store
+        self.release = weakref.finalize(self, store.release, dataset.key) if store is not None else (lambda: None)
+
+class SharedDatasetStore:
+    """Datasets shared by every session, with the number of sessions referencing each"""
+    
+    def __init__(self):
+        self.datasets = {}
+        self.references = {}
+        self.lock = threading.Lock()
+    
+    def acquire(self, dataset):
+        """Count one more session using a stored dataset; the caller holds the lock"""
+        self.references[dataset.key] = self.references.get(dataset.key, 0) + 1
+        return DatasetHandle(dataset, self)
+    
+    def checkout(self, key):
+        """Return a handle to the dataset stored under key, or None if no session has loaded it"""
+        with self.lock:
+            dataset = self.datasets.get(key)
+            return self.acquire(dataset) if dataset is not None else None
+    
+    def publish(self, dataset):
+        """Store a freshly built dataset and return a handle to it, or to the one another session stored first"""
+        with self.lock:
+            return self.acquire(self.datasets.setdefault(dataset.key, dataset))
+    
+    def release(self, key):
+        with self.lock:
+            self.references[key] -= 1
+            if not self.references[key]:
+                del self.references[key]
+                self.datasets.pop(key, None)
+
+# The store is a cached resource because the script's own globals are rebuilt on every rerun
+@st.cache_resource
+def shared_dataset_store():
+    """Return the process-wide SharedDatasetStore"""
+    return SharedDatasetStore()
+
+# Function to drop the session's dataset so the next run loads the selected months
+def reset_loaded_data():
+    """Release the session's dataset handle and mark the data as not loaded"""
+    if st.session_state.dataset_handle is not None:
+        st.session_state.dataset_handle.release()
+    st.session_state.dataset_handle = None
+    st.session_state.data_loaded = False
+
 # Session state initialization
+# Only selections and a handle into the shared dataset live here; the data itself is shared
 if 'data_loaded' not in st.session_state:
     st.session_state.data_loaded = False
-if 'current_df' not in st.session_state:
-    st.session_state.current_df = None
+if 'dataset_handle' not in st.session_state:
+    st.session_state.dataset_handle = None
 if 'selected_sheets' not in st.session_state:
     st.session_state.selected_sheets = [SHEETS[11]]  # Default to first sheet
-if 'individual_month_data' not in st.session_state:
-    st.session_state.individual_month_data = {}
+if 'load_trace' not in st.session_state:
+    st.session_state.load_trace = []
 if 'comparison_filters' not in st.session_state:
     st.session_state.comparison_filters = {
         'selected_bdm': 'All',
@@ -1326,16 +2780,19 @@ with st.sidebar:
     # Update session state if selection changes
     if selected_sheets != st.session_state.selected_sheets:
         st.session_state.selected_sheets = selected_sheets
-        st.session_state.current_df = None
-        st.session_state.data_loaded = False
-        st.cache_data.clear()
-    
-    # Refresh Button
-    if st.button("🔄 Refresh Data"):
-        st.cache_data.clear()
-        st.session_state.current_df = None
-        st.session_state.data_loaded = False
-        st.session_state.individual_month_data = {}
+        reset_loaded_data()
+    
+    # Refresh Buttons
+    # Closed months never change, so the usual refresh only syncs the live month;
+    # every other month is reused from the cache
+    if st.button("🔄 Refresh Live Month", help=f"Fetch the latest rows of {LIVE_SHEET}"):
+        invalidate_months([LIVE_SHEET])
+        reset_loaded_data()
+        st.rerun()
+    
+    if st.button("♻️ Reload Selected Months", help="Download the selected months again from Google Sheets"):
+        invalidate_months(SHEETS if "All" in st.session_state.selected_sheets else st.session_state.selected_sheets, refetch=True)
+        reset_loaded_data()
         st.rerun()
 
 # Generate dashboard title based on selected sheets
@@ -1357,100 +2814,301 @@ st.markdown(f'<div class="main-header">{dashboard_title}</div>', unsafe_allow_ht
 # Load data function
 required_columns = ['Item Category', 'BDM', 'RBM', 'Store', 'Staff Name', 'TotalSoldPrice', 'WarrantyPrice', 'TotalCount', 'WarrantyCount']
 
-@st.cache_data
-def load_individual_month(sheet_name):
-    """Load individual month data"""
+# Columns stored as pandas Categorical; months share one vocabulary per column once combined
+CATEGORICAL_COLUMNS = ['Item Category', 'BDM', 'RBM', 'Store', 'Staff Name', 'Month', 'Replacement Category', 'Appliance Type']
+
+def compact_numeric_column(series):
+    """Store whole-number columns as int32 when they fit; anything else stays float64"""
+    values = series.to_numpy(dtype='float64')
+    int32_max = np.iinfo(np.int32).max
+    if np.isfinite(values).all() and (values == np.round(values)).all() and (len(values) == 0 or np.abs(values).max() <= int32_max):
+        return series.astype('int32')
+    return series.astype('float64')
+
+def unify_categories(frames):
+    """Give each categorical column the same categories in every frame so they concatenate as categoricals"""
+    for col in CATEGORICAL_COLUMNS:
+        columns = [frame[col] for frame in frames if col in frame.columns and isinstance(frame[col].dtype, pd.CategoricalDtype)]
+        if len(columns) < 2:
+            continue
+        
+        # Frames whose values were inferred differently (e.g. numeric codes in one chunk) share object categories
+        if len({column.cat.categories.dtype for column in columns}) > 1:
+            for frame in frames:
+                if col in frame.columns and isinstance(frame[col].dtype, pd.CategoricalDtype):
+                    frame[col] = frame[col].astype(pd.CategoricalDtype(frame[col].cat.categories.astype(object)))
+            columns = [frame[col] for frame in frames if col in frame.columns and isinstance(frame[col].dtype, pd.CategoricalDtype)]
+        
+        categories = pd.api.types.union_categoricals(columns, ignore_order=True).categories
+        for frame in frames:
+            if col in frame.columns and isinstance(frame[col].dtype, pd.CategoricalDtype):
+                frame[col] = frame[col].cat.set_categories(categories)
+    return frames
+
+@traced('transform', name=lambda df, sheet_name: f"process_month_data {sheet_name}")
+def process_month_data(df, sheet_name):
+    """Validate raw sheet rows, add the derived columns and store them in a compact layout"""
+    missing_columns = [col for col in required_columns if col not in df.columns]
+    if missing_columns:
+        st.error(f"Missing columns in Google Sheets data for {sheet_name}: {', '.join(missing_columns)}")
+        return None
+    
+    numeric_cols = ['TotalSoldPrice', 'WarrantyPrice', 'TotalCount', 'WarrantyCount']
+    for col in numeric_cols:
+        df[col] = pd.to_numeric(df[col], errors='coerce')
+    
+    if df[numeric_cols].isna().any().any():
+        st.warning(f"Missing or invalid values in numeric columns for {sheet_name}. Filling with 0.")
+        df[numeric_cols] = df[numeric_cols].fillna(0)
+    
+    for col in numeric_cols:
+        df[col] = compact_numeric_column(df[col])
+    
+    # Classification runs once per distinct item category rather than once per row
+    df['Item Category'] = df['Item Category'].astype('category')
+    df['Replacement Category'] = map_distinct(df['Item Category'], map_to_replacement_category)
+    df['Appliance Type'] = map_distinct(df['Item Category'], get_appliance_type)
+    
+    # CORRECTED: Use WarrantyCount for warranty units and count conversion
+    ratios = ratio_metrics(df)
+    df['Conversion% (Count)'] = ratios['Count Conv (%)'].astype('float32')
+    df['Conversion% (Price)'] = ratios['Value Conv (%)'].astype('float32')
+    df['AHSP'] = ratios['AHSP'].astype('float32')
+    df['Month'] = sheet_name
+    
+    # Repeated dimension strings are stored once per distinct value
+    for col in CATEGORICAL_COLUMNS:
+        df[col] = df[col].astype('category')
+    
+    return df
+
+def sync_month_delta(sheet_name, cached_df):
+    """Append the rows added to a sheet since cached_df was saved, or return None if a full reload is needed"""
+    delta = fetch_sheet_delta(sheet_name, len(cached_df))
+    if delta is None:
+        # The error is already reported; keep serving the rows we have
+        return cached_df
+    
+    new_rows, is_full_sheet = delta
+    if new_rows is None:
+        return None
+    if is_full_sheet:
+        return process_month_data(new_rows, sheet_name) if not new_rows.empty else None
+    if new_rows.empty:
+        return cached_df
+    
+    processed_rows = process_month_data(new_rows, sheet_name)
+    if processed_rows is None:
+        return None
+    
+    return pd.concat(unify_categories([cached_df, processed_rows]), ignore_index=True)
+
+class MonthLoadError(Exception):
+    """Raised by the cached month loader so a failed load is retried instead of cached"""
+
+@st.cache_data(max_entries=2 * len(SHEETS))
+@traced('load', name=lambda sheet_name, cache_key: f"load_cached_month {sheet_name}")
+def load_cached_month(sheet_name, cache_key):
+    """Load individual month data; cache_key comes from month_cache_key and only versions the cache entry"""
     try:
-        df = fetch_data_from_sheets(sheet_name)
-        if df is None:
-            return None
+        # Closed months (and a fresh live month) come straight from the on-disk cache
+        cached_df, is_fresh = read_month_cache(sheet_name)
+        if cached_df is not None and is_fresh:
+            return cached_df
         
-        missing_columns = [col for col in required_columns if col not in df.columns]
-        if missing_columns:
-            st.error(f"Missing columns in Google Sheets data for {sheet_name}: {', '.join(missing_columns)}")
-            return None
-        
-        numeric_cols = ['TotalSoldPrice', 'WarrantyPrice', 'TotalCount', 'WarrantyCount']
-        for col in numeric_cols:
-            df[col] = pd.to_numeric(df[col], errors='coerce')
+        # A stale live month only downloads the rows appended since it was cached
+        df = sync_month_delta(sheet_name, cached_df) if cached_df is not None else None
         
-        if df[numeric_cols].isna().any().any():
-            st.warning(f"Missing or invalid values in numeric columns for {sheet_name}. Filling with 0.")
-            df[numeric_cols] = df[numeric_cols].fillna(0)
-        
-        df['Replacement Category'] = df['Item Category'].apply(map_to_replacement_category)
-        df['Appliance Type'] = df['Item Category'].apply(get_appliance_type)
+        if df is None:
+            df = fetch_data_from_sheets(sheet_name)
+            if df is None:
+                raise MonthLoadError(sheet_name)
+            df = process_month_data(df, sheet_name)
+            if df is None:
+                raise MonthLoadError(sheet_name)
         
-        # CORRECTED: Use WarrantyCount for warranty units and count conversion
-        df['Conversion% (Count)'] = (df['WarrantyCount'] / df['TotalCount'] * 100).round(2)
-        df['Conversion% (Price)'] = (df['WarrantyPrice'] / df['TotalSoldPrice'] * 100).where(df['TotalSoldPrice'] > 0, 0).round(2)
-        df['AHSP'] = (df['WarrantyPrice'] / df['WarrantyCount']).where(df['WarrantyCount'] > 0, 0).round(2)
-        df['Month'] = sheet_name
+        write_month_cache(sheet_name, df)
         
         return df
+    except MonthLoadError:
+        raise
     except Exception as e:
         st.error(f"❌ Error loading data for {sheet_name}: {str(e)}")
+        raise MonthLoadError(sheet_name) from e
+
+def load_individual_month(sheet_name, cache_key):
+    """Load individual month data, or None if it failed (the error has already been reported)"""
+    try:
+        return load_cached_month(sheet_name, cache_key)
+    except MonthLoadError:
         return None
 
-@st.cache_data
-def load_all_data(sheet_names):
-    """Load data for all selected sheets"""
+# Function to fingerprint the live month as loaded under one cache key
+@st.cache_data(max_entries=4)
+def live_month_content(sheet_name, cache_key):
+    """Return (row count, content fingerprint) of the live month loaded under cache_key"""
+    df = load_cached_month(sheet_name, cache_key)
+    return len(df), month_fingerprint(df)
+
+def dataset_month_key(sheet_name):
+    """Return what a month contributes to the key of a shared dataset
+
+    The live month's cache key moves on every refresh window even when no rows arrived, so
+    the live month is keyed by its content instead; closed months by their cache key.
+    """
+    cache_key = month_cache_key(sheet_name)
+    if sheet_name != LIVE_SHEET:
+        return cache_key
+    try:
+        row_count, fingerprint = live_month_content(sheet_name, cache_key)
+    except MonthLoadError:
+        # The load that follows reports the failure, and a partial load is never shared
+        return cache_key
+    return f"v{MONTH_CACHE_VERSION}-r{row_count}-{fingerprint}"
+
+def load_months_concurrently(sheet_names, max_workers=MAX_CONCURRENT_FETCHES, on_loaded=None):
+    """Load several months in parallel and return a {sheet_name: DataFrame or None} dict
+
+    on_loaded(sheet_name, df) runs on the calling thread as each month finishes, so it can update the page.
+    """
+    if not sheet_names:
+        return {}
+    
+    # Worker threads need the script run context so st.error / st.warning
+    # raised while loading a sheet still reach the current session
+    ctx = get_script_run_ctx()
+    
+    def attach_context():
+        add_script_run_ctx(ctx=ctx)
+    
+    workers = max(1, min(max_workers, len(sheet_names)))
+    with ThreadPoolExecutor(max_workers=workers, initializer=attach_context) as executor:
+        futures = {
+            executor.submit(load_individual_month, sheet_name, month_cache_key(sheet_name)): sheet_name
+            for sheet_name in sheet_names
+        }
+        results = {}
+        for future in as_completed(futures):
+            sheet_name = futures[future]
+            results[sheet_name] = future.result()
+            if on_loaded is not None:
+                on_loaded(sheet_name, results[sheet_name])
+        return {sheet_name: results[sheet_name] for sheet_name in sheet_names}
+
+def load_all_data(sheet_names, max_workers=MAX_CONCURRENT_FETCHES):
+    """Load and combine the selected sheets, showing progress and running KPIs as each month arrives
+
+    Returns (combined DataFrame, names of the sheets that loaded), or (None, None) if none did.
+    """
     try:
         # Show loading animation
         with st.spinner(''):
             # Handle "All" selection
             if "All" in sheet_names:
-                actual_sheets = SHEETS
-                show_loading_animation(
-                    "Loading All Months Data", 
-                    "Combining data from all available months..."
-                )
+                loading_message = "Loading All Months Data"
+                loading_submessage = "Combining data from all available months..."
             elif len(sheet_names) > 1:
-                show_loading_animation(
-                    f"Loading {len(sheet_names)} Months Data", 
-                    f"Loading data for comparison: {', '.join(sheet_names)}"
-                )
+                loading_message = f"Loading {len(sheet_names)} Months Data"
+                loading_submessage = f"Loading data for comparison: {', '.join(sheet_names)}"
             else:
-                show_loading_animation(
-                    f"Loading {sheet_names[0]} Data", 
-                    "Fetching data from Google Sheets and processing..."
-                )
+                loading_message = f"Loading {sheet_names[0]} Data"
+                loading_submessage = "Fetching data from Google Sheets and processing..."
             
-            # Simulate loading time for better UX
-            time.sleep(1.5)
+            loading_placeholder = st.empty()
+            kpi_placeholder = st.empty()
+            show_loading_animation(loading_message, loading_submessage, 0.0, loading_placeholder)
             
             all_dfs = []
-            individual_data = {}
+            loaded_sheets = []
             
             # Determine which sheets to load
             sheets_to_load = SHEETS if "All" in sheet_names else sheet_names
             
+            # Running KPI totals over the months that have arrived, with the current filters applied
+            filters = st.session_state.comparison_filters
+            category_column = 'Replacement Category' if filters['replacement_filter'] else 'Item Category'
+            arrived_sheets = []
+            running_totals = dict.fromkeys(MEASURE_COLUMNS, 0)
+            
+            def on_month_loaded(sheet_name, month_df):
+                arrived_sheets.append(sheet_name)
+                pending_sheets = [name for name in sheets_to_load if name not in arrived_sheets]
+                status = f"{len(arrived_sheets)} of {len(sheets_to_load)} months loaded"
+                status += f" · waiting for {', '.join(pending_sheets)}" if pending_sheets else " · combining months..."
+                show_loading_animation(loading_message, status, len(arrived_sheets) / len(sheets_to_load), loading_placeholder)
+                
+                if month_df is None:
+                    return
+                # Each month is only filtered here, so it is masked directly instead of being indexed
+                month_measures = month_df[MEASURE_COLUMNS]
+                if has_active_filters(filters, filters['replacement_filter'], filters['speaker_filter']):
+                    month_measures = month_measures[filter_mask(month_df, filters, category_column, filters['replacement_filter'], filters['speaker_filter'])]
+                for col in MEASURE_COLUMNS:
+                    running_totals[col] += month_measures[col].sum()
+                
+                with kpi_placeholder.container():
+                    if pending_sheets:
+                        st.caption(f"Preliminary figures from {len(arrived_sheets)} of {len(sheets_to_load)} months; the rest are still loading")
+                    show_kpi_metrics(
+                        running_totals['WarrantyPrice'],
+                        running_totals['WarrantyCount'],
+                        running_totals['TotalCount'],
+                        running_totals['TotalSoldPrice']
+                    )
+            
+            # Fetch all sheets in parallel, then combine them in the selected order
+            loaded_months = load_months_concurrently(sheets_to_load, max_workers, on_loaded=on_month_loaded)
+            
             for sheet_name in sheets_to_load:
-                df = load_individual_month(sheet_name)
+                df = loaded_months[sheet_name]
                 if df is not None:
                     all_dfs.append(df)
-                    individual_data[sheet_name] = df
+                    loaded_sheets.append(sheet_name)
                 else:
                     st.error(f"Failed to load data for {sheet_name}")
             
             if not all_dfs:
+                loading_placeholder.empty()
+                kpi_placeholder.empty()
                 st.error("❌ No data could be loaded from any selected sheets.")
                 return None, None
             
-            # Combine all DataFrames
-            combined_df = pd.concat(all_dfs, ignore_index=True)
-            return combined_df, individual_data
+            # Combine all DataFrames; a shared category vocabulary keeps the result categorical
+            combined_df = pd.concat(unify_categories(all_dfs), ignore_index=True)
+            return combined_df, loaded_sheets
             
     except Exception as e:
         st.error(f"❌ Error loading data from Google Sheets: {str(e)}")
         return None, None
 
+# Function to point the session at the shared dataset of the selected months
+def load_shared_dataset(sheet_names):
+    """Return a DatasetHandle for the selected months, loading them only if no session has yet, or None if nothing loaded"""
+    sheets_to_load = SHEETS if "All" in sheet_names else sheet_names
+    key = tuple((sheet_name, dataset_month_key(sheet_name)) for sheet_name in sheets_to_load)
+    store = shared_dataset_store()
+    handle = store.checkout(key)
+    if handle is not None:
+        return handle
+    
+    combined_df, loaded_sheets = load_all_data(sheet_names)
+    if combined_df is None:
+        return None
+    
+    # Build the cube once per dataset; every table below is a roll-up over it, so the raw rows aren't kept
+    dataset = SharedDataset(key, loaded_sheets, build_measure_cube(combined_df))
+    
+    # A partial load stays private to this session so the next session retries the missing months
+    if len(loaded_sheets) < len(sheets_to_load):
+        return DatasetHandle(dataset)
+    return store.publish(dataset)
+
 # Load data from Google Sheets
-if st.session_state.current_df is None and st.session_state.selected_sheets:
-    combined_df, individual_data = load_all_data(st.session_state.selected_sheets)
-    if combined_df is not None:
-        st.session_state.current_df = combined_df
-        st.session_state.individual_month_data = individual_data
+if st.session_state.dataset_handle is None and st.session_state.selected_sheets:
+    # The handle goes straight into session state: script globals can outlive the session
+    # (cached functions keep their run's globals), and a handle left there would never be released
+    st.session_state.dataset_handle = load_shared_dataset(st.session_state.selected_sheets)
+    if st.session_state.dataset_handle is not None:
         st.session_state.data_loaded = True
         if "All" in st.session_state.selected_sheets:
             st.success(f"✅ Data loaded successfully for all {len(SHEETS)} months combined!")
@@ -1458,13 +3116,17 @@ if st.session_state.current_df is None and st.session_state.selected_sheets:
             st.success(f"✅ Data loaded successfully for {len(st.session_state.selected_sheets)} months comparison!")
         else:
             st.success(f"✅ Data loaded successfully for {st.session_state.selected_sheets[0]}!")
+        # The load's spans are kept for the debug panel, since this rerun ends here
+        st.session_state.load_trace = list(TRACE_SPANS)
         st.rerun()
 
 # Now that we have data, set up the filters in sidebar
-if st.session_state.data_loaded and st.session_state.current_df is not None:
-    df = st.session_state.current_df
-    individual_data = st.session_state.individual_month_data
-    
+if st.session_state.data_loaded and st.session_state.dataset_handle is not None:
+    # Filters, KPIs and tables all work on the shared pre-aggregated cube rather than the raw rows
+    dataset = st.session_state.dataset_handle.dataset
+    individual_data = dataset.month_cubes
+    load_statistics = dataset.load_statistics
+
     with st.sidebar:
         # Sidebar filters
         st.markdown('<hr>', unsafe_allow_html=True)
@@ -1478,63 +3140,34 @@ if st.session_state.data_loaded and st.session_state.current_df is not None:
         st.session_state.comparison_filters['replacement_filter'] = replacement_filter
         st.session_state.comparison_filters['speaker_filter'] = speaker_filter
         st.session_state.comparison_filters['future_filter'] = future_filter
-        # Value Conversion range filter
-        st.markdown('<hr>', unsafe_allow_html=True)
-        st.markdown('<h4 style="color: #1e293b; font-weight: 600;">📊 Value Conversion Filter</h4>', unsafe_allow_html=True)
-        
-        store_summary_temp = df.groupby('Store').agg({
-            'TotalSoldPrice': 'sum',
-            'WarrantyPrice': 'sum'
-        }).reset_index()
-        store_summary_temp['Value Conv (%)'] = (store_summary_temp['WarrantyPrice'] / store_summary_temp['TotalSoldPrice'] * 100).where(store_summary_temp['TotalSoldPrice'] > 0, 0).round(2)
-        
-        min_conv = float(store_summary_temp['Value Conv (%)'].min())
-        max_conv = float(store_summary_temp['Value Conv (%)'].max())
-        
-        if min_conv == max_conv:
-            min_conv = max(0, min_conv - 0.1)
-            max_conv = max_conv + 0.1
-        
-        value_conv_range = st.slider(
-            "Filter by Value Conversion (%)",
-            min_value=min_conv,
-            max_value=max_conv,
-            value=(min_conv, max_conv),
-            step=0.1,
-            help="Filter stores based on Value Conversion percentage range"
+        # Value Conversion range filter and sorting options, drawn here by the sections that use them
+        value_conv_slot = st.container()
+        sort_slot = st.container()
+        export_format = st.selectbox(
+            "📁 Download Format",
+            list(EXPORT_FORMATS),
+            index=0,
+            help="Excel keeps the dashboard formatting; gzip CSV and Parquet are smaller and quicker to load into other tools"
         )
-        
-        # Sorting option for all tables
-        st.markdown('<hr>', unsafe_allow_html=True)
-        sort_by = st.selectbox("📊 Sort All Tables By", ["Count Conv (%)", "Value Conv (%)", "AHSP (₹)", "Warranty Sales (₹)", "Warranty Units"], index=0)
-        sort_order = st.selectbox("↕️ Sort Order", ["Descending", "Ascending"], index=0)
 
     # Apply replacement or speaker filter
     if replacement_filter:
-        replacement_categories = ['FAN', 'MIXER GRINDER', 'IRON BOX', 'ELECTRIC KETTLE', 'OTG', 'STEAMER', 'INDUCTION COOKER']
-        df = df[df['Replacement Category'].isin(replacement_categories)]
         category_column = 'Replacement Category'
-    elif speaker_filter:
-        speaker_categories = ['SOUND BAR', 'PARTY SPEAKER', 'BLUETOOTH SPEAKER', 'HOME THEATRE']
-        df = df[df['Item Category'].isin(speaker_categories)]
-        category_column = 'Item Category'
     else:
         category_column = 'Item Category'
+    hierarchy = get_dimension_hierarchy(dataset, replacement_filter, speaker_filter)
 
-    # Define filters after df is loaded
+    # Define filters after df is loaded; each dropdown only offers values under the ones above it
     with st.sidebar:
-        bdm_options = ['All'] + sorted(df['BDM'].unique().tolist())
-        rbm_options = ['All'] + sorted(df['RBM'].unique().tolist())
-        store_options = ['All'] + sorted(df['Store'].unique().tolist())
-        category_options = ['All'] + sorted(df[category_column].unique().tolist())
+        bdm_options = hierarchy_options(hierarchy, 'BDM', [])
         selected_bdm = st.selectbox("👔 BDM", bdm_options, index=bdm_options.index(st.session_state.comparison_filters['selected_bdm']) if st.session_state.comparison_filters['selected_bdm'] in bdm_options else 0)
+        rbm_options = hierarchy_options(hierarchy, 'RBM', [selected_bdm])
         selected_rbm = st.selectbox("👤 RBM", rbm_options, index=rbm_options.index(st.session_state.comparison_filters['selected_rbm']) if st.session_state.comparison_filters['selected_rbm'] in rbm_options else 0)
+        store_options = hierarchy_options(hierarchy, 'Store', [selected_bdm, selected_rbm])
         selected_store = st.selectbox("🏪 Store", store_options, index=store_options.index(st.session_state.comparison_filters['selected_store']) if st.session_state.comparison_filters['selected_store'] in store_options else 0)
+        category_options = ['All'] + hierarchy['categories']
         selected_category = st.selectbox(f"📦 {category_column}", category_options, index=category_options.index(st.session_state.comparison_filters['selected_category']) if st.session_state.comparison_filters['selected_category'] in category_options else 0)
-        if selected_rbm != 'All':
-            staff_options = ['All'] + sorted(df[df['RBM'] == selected_rbm]['Staff Name'].unique().tolist())
-        else:
-            staff_options = ['All'] + sorted(df['Staff Name'].unique().tolist())
+        staff_options = hierarchy_options(hierarchy, 'Staff Name', [selected_bdm, selected_rbm, selected_store])
         selected_staff = st.selectbox("👨‍💼 Staff", staff_options, index=staff_options.index(st.session_state.comparison_filters['selected_staff']) if st.session_state.comparison_filters['selected_staff'] in staff_options else 0)
 
         # Update session state for dropdown filters
@@ -1544,38 +3177,9 @@ if st.session_state.data_loaded and st.session_state.current_df is not None:
         st.session_state.comparison_filters['selected_category'] = selected_category
         st.session_state.comparison_filters['selected_staff'] = selected_staff
 
-    # Apply filters function for comparison data
-    def apply_comparison_filters(data, filters, category_column, replacement_filter, speaker_filter):
-        """Apply filters to comparison data"""
-        filtered_data = data.copy()
-        
-        # Apply replacement or speaker filter first
-        if replacement_filter:
-            replacement_categories = ['FAN', 'MIXER GRINDER', 'IRON BOX', 'ELECTRIC KETTLE', 'OTG', 'STEAMER', 'INDUCTION COOKER']
-            filtered_data = filtered_data[filtered_data['Replacement Category'].isin(replacement_categories)]
-        elif speaker_filter:
-            speaker_categories = ['SOUND BAR', 'PARTY SPEAKER', 'BLUETOOTH SPEAKER', 'HOME THEATRE']
-            filtered_data = filtered_data[filtered_data['Item Category'].isin(speaker_categories)]
-        
-        # Apply other filters
-        if filters['selected_bdm'] != 'All':
-            filtered_data = filtered_data[filtered_data['BDM'] == filters['selected_bdm']]
-        if filters['selected_rbm'] != 'All':
-            filtered_data = filtered_data[filtered_data['RBM'] == filters['selected_rbm']]
-        if filters['selected_store'] != 'All':
-            filtered_data = filtered_data[filtered_data['Store'] == filters['selected_store']]
-        if filters['selected_category'] != 'All':
-            filtered_data = filtered_data[filtered_data[category_column] == filters['selected_category']]
-        if filters['selected_staff'] != 'All':
-            filtered_data = filtered_data[filtered_data['Staff Name'] == filters['selected_staff']]
-        if filters['future_filter']:
-            filtered_data = filtered_data[filtered_data['Store'].str.contains('FUTURE', case=True)]
-            
-        return filtered_data
-
-    # Apply filters to main data
+    # Apply filters to main data; the full cube is passed so its prebuilt filter index is reused
     filtered_df = apply_comparison_filters(
-        df, 
+        dataset.measure_cube, 
         st.session_state.comparison_filters, 
         category_column,
         replacement_filter,
@@ -1594,336 +3198,19 @@ if st.session_state.data_loaded and st.session_state.current_df is not None:
     else:
         period_text = f"{len(st.session_state.selected_sheets)} Selected Months"
 
+    # Every table offered for download is also collected into one all-tables workbook, by sheet name
+    # (fragment reruns replace their tables in place, so the bundle always holds the current ones)
+    export_tables = {}
+
     # COMPARISON SECTION - Show only when exactly 2 months are selected (and not "All")
     if len(st.session_state.selected_sheets) == 2 and "All" not in st.session_state.selected_sheets:
-        st.markdown(f'<div class="comparison-header">📊 Monthly Comparison Analysis</div>', unsafe_allow_html=True)
-        
-        month1 = st.session_state.selected_sheets[0]
-        month2 = st.session_state.selected_sheets[1]
-        
-        st.markdown(f'### 🔄 Comparison: {month1} vs {month2}')
-        
-        # Apply filters to individual month data for comparison
-        month1_filtered = apply_comparison_filters(
-            individual_data[month1], 
-            st.session_state.comparison_filters, 
-            category_column,
-            replacement_filter,
-            speaker_filter
+        show_comparison_section(
+            filtered_df,
+            st.session_state.selected_sheets[0],
+            st.session_state.selected_sheets[1],
+            export_format,
+            export_tables
         )
-        month2_filtered = apply_comparison_filters(
-            individual_data[month2], 
-            st.session_state.comparison_filters, 
-            category_column,
-            replacement_filter,
-            speaker_filter
-        )
-        
-        # Calculate comparison metrics for all tables with filtered data
-        comparison_data = calculate_comparison(
-            month1_filtered, 
-            month2_filtered, 
-            month1, 
-            month2
-        )
-        
-        # Display overall KPI comparison - Show only changes, not combined totals
-        kpis = comparison_data['overall_kpis']
-        col1, col2, col3, col4, col5 = st.columns(5)
-        
-        with col1:
-            st.metric(
-                "💰 Warranty Sales Change", 
-                f"₹{kpis['warranty_change']:+,.0f}",
-                f"{kpis['warranty_change_pct']:+.1f}%",
-                delta_color="normal"
-            )
-        
-        with col2:
-            st.metric(
-                "📦 Warranty Units Change", 
-                f"{kpis['warranty_units_change']:+,.0f}",
-                f"{kpis['warranty_units_change_pct']:+.1f}%",
-                delta_color="normal"
-            )
-        
-        with col3:
-            st.metric(
-                "📊 Count Conversion Change", 
-                f"{kpis['count_conv_change']:+.2f}%",
-                delta_color="normal"
-            )
-        
-        with col4:
-            st.metric(
-                "📈 Value Conversion Change", 
-                f"{kpis['value_conv_change']:+.2f}%",
-                delta_color="normal"
-            )
-        
-        with col5:
-            st.metric(
-                "💵 AHSP Change", 
-                f"₹{kpis['ahsp_change']:+.2f}",
-                delta_color="normal"
-            )
-        
-        # Store comparison table - Show only changes
-        st.markdown(f'#### 🏬 Store Performance Changes')
-        store_comp = comparison_data['store_comparison']
-        
-        # Create display table with only change columns
-        display_cols = ['Store']
-        # Add change columns only
-        display_cols.extend([
-            'Value Conv Change', 
-            'Count Conv Change', 
-            'AHSP Change', 
-            'Warranty Sales Change',
-            'Warranty Sales Change %',
-            'Warranty Units Change',
-            'Warranty Units Change %'
-        ])
-        
-        # Check if all required columns exist
-        missing_cols = [col for col in display_cols if col not in store_comp.columns]
-        if missing_cols:
-            st.warning(f"Some comparison data is missing: {missing_cols}")
-            # Use only available columns
-            display_cols = [col for col in display_cols if col in store_comp.columns]
-        
-        comparison_display = store_comp[display_cols].copy()
-        
-        # Rename columns for better display
-        column_mapping = {
-            'Value Conv Change': 'Value Conv Change (%)',
-            'Count Conv Change': 'Count Conv Change (%)',
-            'AHSP Change': 'AHSP Change (₹)',
-            'Warranty Sales Change': 'Warranty Sales Change (₹)',
-            'Warranty Sales Change %': 'Warranty Sales Change (%)',
-            'Warranty Units Change': 'Warranty Units Change',
-            'Warranty Units Change %': 'Warranty Units Change (%)'
-        }
-        
-        comparison_display = comparison_display.rename(columns=column_mapping)
-        
-        # Format the display
-        def format_comparison_row(row):
-            formats = {}
-            for col in comparison_display.columns:
-                if 'Value Conv Change (%)' in col:
-                    formats[col] = '{:+.2f}%'
-                elif 'Count Conv Change (%)' in col:
-                    formats[col] = '{:+.2f}%'
-                elif 'AHSP Change (₹)' in col:
-                    formats[col] = '₹{:+.2f}'
-                elif 'Warranty Sales Change (₹)' in col:
-                    formats[col] = '₹{:+,.0f}'
-                elif 'Warranty Sales Change (%)' in col:
-                    formats[col] = '{:+.2f}%'
-                elif 'Warranty Units Change' in col:
-                    formats[col] = '{:+,.0f}'
-                elif 'Warranty Units Change (%)' in col:
-                    formats[col] = '{:+.2f}%'
-            return formats
-        
-        format_dict = format_comparison_row(comparison_display.iloc[0] if not comparison_display.empty else {})
-        
-        styled_comparison = comparison_display.style.format(format_dict)
-        
-        st.dataframe(styled_comparison, use_container_width=True)
-        
-        # Staff Performance Comparison
-        st.markdown(f'#### 👨‍💼 Staff Performance Changes')
-        staff_comp = comparison_data['staff_comparison']
-        
-        # Create display table with only change columns
-        staff_display_cols = ['Staff Name', 'Store']
-        staff_display_cols.extend([
-            'Value Conv Change', 
-            'Count Conv Change', 
-            'AHSP Change', 
-            'Warranty Sales Change',
-            'Warranty Units Change'
-        ])
-        
-        staff_comparison_display = staff_comp[staff_display_cols].copy()
-        
-        # Rename columns for better display
-        staff_column_mapping = {
-            'Value Conv Change': 'Value Conv Change (%)',
-            'Count Conv Change': 'Count Conv Change (%)',
-            'AHSP Change': 'AHSP Change (₹)',
-            'Warranty Sales Change': 'Warranty Sales Change (₹)',
-            'Warranty Units Change': 'Warranty Units Change'
-        }
-        
-        staff_comparison_display = staff_comparison_display.rename(columns=staff_column_mapping)
-        
-        # Format the display
-        def format_staff_comparison_row(row):
-            formats = {}
-            for col in staff_comparison_display.columns:
-                if 'Value Conv Change (%)' in col:
-                    formats[col] = '{:+.2f}%'
-                elif 'Count Conv Change (%)' in col:
-                    formats[col] = '{:+.2f}%'
-                elif 'AHSP Change (₹)' in col:
-                    formats[col] = '₹{:+.2f}'
-                elif 'Warranty Sales Change (₹)' in col:
-                    formats[col] = '₹{:+,.0f}'
-                elif 'Warranty Units Change' in col:
-                    formats[col] = '{:+,.0f}'
-            return formats
-        
-        staff_format_dict = format_staff_comparison_row(staff_comparison_display.iloc[0] if not staff_comparison_display.empty else {})
-        
-        styled_staff_comparison = staff_comparison_display.style.format(staff_format_dict)
-        
-        st.dataframe(styled_staff_comparison, use_container_width=True)
-        
-        # RBM Performance Comparison
-        st.markdown(f'#### 👥 RBM Performance Changes')
-        rbm_comp = comparison_data['rbm_comparison']
-        
-        # Create display table with only change columns
-        rbm_display_cols = ['RBM']
-        rbm_display_cols.extend([
-            'Value Conv Change', 
-            'Count Conv Change', 
-            'AHSP Change', 
-            'Warranty Sales Change',
-            'Warranty Units Change'
-        ])
-        
-        rbm_comparison_display = rbm_comp[rbm_display_cols].copy()
-        
-        # Rename columns for better display
-        rbm_column_mapping = {
-            'Value Conv Change': 'Value Conv Change (%)',
-            'Count Conv Change': 'Count Conv Change (%)',
-            'AHSP Change': 'AHSP Change (₹)',
-            'Warranty Sales Change': 'Warranty Sales Change (₹)',
-            'Warranty Units Change': 'Warranty Units Change'
-        }
-        
-        rbm_comparison_display = rbm_comparison_display.rename(columns=rbm_column_mapping)
-        
-        # Format the display
-        def format_rbm_comparison_row(row):
-            formats = {}
-            for col in rbm_comparison_display.columns:
-                if 'Value Conv Change (%)' in col:
-                    formats[col] = '{:+.2f}%'
-                elif 'Count Conv Change (%)' in col:
-                    formats[col] = '{:+.2f}%'
-                elif 'AHSP Change (₹)' in col:
-                    formats[col] = '₹{:+.2f}'
-                elif 'Warranty Sales Change (₹)' in col:
-                    formats[col] = '₹{:+,.0f}'
-                elif 'Warranty Units Change' in col:
-                    formats[col] = '{:+,.0f}'
-            return formats
-        
-        rbm_format_dict = format_rbm_comparison_row(rbm_comparison_display.iloc[0] if not rbm_comparison_display.empty else {})
-        
-        styled_rbm_comparison = rbm_comparison_display.style.format(rbm_format_dict)
-        
-        st.dataframe(styled_rbm_comparison, use_container_width=True)
-        
-        # Product Category Performance Comparison
-        st.markdown(f'#### 📦 Product Category Performance Changes')
-        category_comp = comparison_data['category_comparison']
-        
-        # Create display table with only change columns
-        category_display_cols = ['Item Category']
-        category_display_cols.extend([
-            'Value Conv Change', 
-            'Count Conv Change', 
-            'AHSP Change', 
-            'Warranty Sales Change',
-            'Warranty Units Change'
-        ])
-        
-        category_comparison_display = category_comp[category_display_cols].copy()
-        
-        # Rename columns for better display
-        category_column_mapping = {
-            'Value Conv Change': 'Value Conv Change (%)',
-            'Count Conv Change': 'Count Conv Change (%)',
-            'AHSP Change': 'AHSP Change (₹)',
-            'Warranty Sales Change': 'Warranty Sales Change (₹)',
-            'Warranty Units Change': 'Warranty Units Change'
-        }
-        
-        category_comparison_display = category_comparison_display.rename(columns=category_column_mapping)
-        
-        # Format the display
-        def format_category_comparison_row(row):
-            formats = {}
-            for col in category_comparison_display.columns:
-                if 'Value Conv Change (%)' in col:
-                    formats[col] = '{:+.2f}%'
-                elif 'Count Conv Change (%)' in col:
-                    formats[col] = '{:+.2f}%'
-                elif 'AHSP Change (₹)' in col:
-                    formats[col] = '₹{:+.2f}'
-                elif 'Warranty Sales Change (₹)' in col:
-                    formats[col] = '₹{:+,.0f}'
-                elif 'Warranty Units Change' in col:
-                    formats[col] = '{:+,.0f}'
-            return formats
-        
-        category_format_dict = format_category_comparison_row(category_comparison_display.iloc[0] if not category_comparison_display.empty else {})
-        
-        styled_category_comparison = category_comparison_display.style.format(category_format_dict)
-        
-        st.dataframe(styled_category_comparison, use_container_width=True)
-        
-        # Download option for comparison data
-        st.markdown("---")
-        st.markdown("#### 📥 Download Comparison Data")
-        
-        col1, col2, col3, col4 = st.columns(4)
-        
-        with col1:
-            store_comparison_download = store_comp[['Store'] + [col for col in store_comp.columns if 'Change' in col]]
-            st.download_button(
-                label="Download Store Comparison",
-                data=to_excel(store_comparison_download, 'Store Comparison'),
-                file_name=f"store_comparison_{month1}_vs_{month2}.xlsx",
-                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-            )
-        
-        with col2:
-            staff_comparison_download = staff_comp[['Staff Name', 'Store'] + [col for col in staff_comp.columns if 'Change' in col]]
-            st.download_button(
-                label="Download Staff Comparison",
-                data=to_excel(staff_comparison_download, 'Staff Comparison'),
-                file_name=f"staff_comparison_{month1}_vs_{month2}.xlsx",
-                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-            )
-        
-        with col3:
-            rbm_comparison_download = rbm_comp[['RBM'] + [col for col in rbm_comp.columns if 'Change' in col]]
-            st.download_button(
-                label="Download RBM Comparison",
-                data=to_excel(rbm_comparison_download, 'RBM Comparison'),
-                file_name=f"rbm_comparison_{month1}_vs_{month2}.xlsx",
-                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-            )
-        
-        with col4:
-            category_comparison_download = category_comp[['Item Category'] + [col for col in category_comp.columns if 'Change' in col]]
-            st.download_button(
-                label="Download Category Comparison",
-                data=to_excel(category_comparison_download, 'Category Comparison'),
-                file_name=f"category_comparison_{month1}_vs_{month2}.xlsx",
-                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-            )
-        
-        # Add some space between comparisons
-        st.markdown("---")
 
     # MAIN DASHBOARD SECTION (Individual, Combined, or All data view)
     # Show this section for all cases except when exactly 2 months are selected for comparison
@@ -1958,391 +3245,64 @@ if st.session_state.data_loaded and st.session_state.current_df is not None:
 
         # KPI metrics
         st.markdown('<h3 style="color: #1e293b; font-weight: 600; margin: 25px 0 15px 0;">🎯 Key Performance Indicators</h3>', unsafe_allow_html=True)
-        col1, col2, col3, col4, col5 = st.columns(5)
-        total_warranty = display_df['WarrantyPrice'].sum()
-        total_units = display_df['TotalCount'].sum()
-        total_warranty_units = display_df['WarrantyCount'].sum()  # CORRECTED: Use WarrantyCount for warranty units
-        total_sales = display_df['TotalSoldPrice'].sum()
-        count_conversion = (total_warranty_units / total_units * 100) if total_units > 0 else 0  # CORRECTED: WarrantyCount/TotalCount
-        value_conversion = (total_warranty / total_sales * 100) if total_sales > 0 else 0
-        ahsp = (total_warranty / total_warranty_units) if total_warranty_units > 0 else 0  # CORRECTED: Use WarrantyCount for AHSP
-
-        with col1:
-            st.metric("💰 Warranty Sales", f"₹{total_warranty:,.0f}")
-        with col2:
-            st.metric("📦 Warranty Units", f"{total_warranty_units:,.0f}")  # CORRECTED: Show WarrantyCount
-        with col3:
-            st.metric("📊 Count Conversion", f"{count_conversion:.2f}%")
-        with col4:
-            st.metric("📈 Value Conversion", f"{value_conversion:.2f}%")
-        with col5:
-            st.metric("💵 AHSP", f"₹{ahsp:,.2f}")
-
-        # Store Performance
-        if "All" in st.session_state.selected_sheets:
-            st.markdown(f'<h3 class="subheader">🏬 Store Performance Analysis - All Months Combined</h3>', unsafe_allow_html=True)
-        elif len(st.session_state.selected_sheets) == 1:
-            st.markdown(f'<h3 class="subheader">🏬 Store Performance Analysis - {current_month}</h3>', unsafe_allow_html=True)
-        else:
-            st.markdown(f'<h3 class="subheader">🏬 Store Performance Analysis - Combined View</h3>', unsafe_allow_html=True)
-
-        store_summary = display_df.groupby('Store').agg({
-            'TotalSoldPrice': 'sum',
-            'WarrantyPrice': 'sum',
-            'TotalCount': 'sum',
-            'WarrantyCount': 'sum'  # CORRECTED: Include WarrantyCount
-        }).reset_index()
-
-        # CORRECTED: Use WarrantyCount for count conversion and warranty units
-        store_summary['Count Conv (%)'] = (store_summary['WarrantyCount'] / store_summary['TotalCount'] * 100).round(2)
-        store_summary['Value Conv (%)'] = (store_summary['WarrantyPrice'] / store_summary['TotalSoldPrice'] * 100).round(2)
-        store_summary['AHSP'] = (store_summary['WarrantyPrice'] / store_summary['WarrantyCount']).where(store_summary['WarrantyCount'] > 0, 0).round(2)
-
-        store_summary['Count Conv (%)'] = store_summary['Count Conv (%)'].replace([float('inf'), -float('inf')], 0).fillna(0)
-        store_summary['Value Conv (%)'] = store_summary['Value Conv (%)'].replace([float('inf'), -float('inf')], 0).fillna(0)
-
-        store_display = store_summary[['Store', 'WarrantyPrice', 'WarrantyCount', 'Count Conv (%)', 'Value Conv (%)', 'AHSP']].copy()  # CORRECTED: Use WarrantyCount
-        store_display.columns = ['Store', 'Warranty Sales (₹)', 'Warranty Units', 'Count Conv (%)', 'Value Conv (%)', 'AHSP (₹)']
-
-        total_sales = store_summary['TotalSoldPrice'].sum()
-        total_warranty_sales = store_summary['WarrantyPrice'].sum()
-        total_units = store_summary['TotalCount'].sum()
-        total_warranty_units = store_summary['WarrantyCount'].sum()  # CORRECTED: Use WarrantyCount
-        
-        total_count_conv = (total_warranty_units / total_units * 100) if total_units > 0 else 0  # CORRECTED: WarrantyCount/TotalCount
-        total_value_conv = (total_warranty_sales / total_sales * 100) if total_sales > 0 else 0
-        total_ahsp = (total_warranty_sales / total_warranty_units) if total_warranty_units > 0 else 0  # CORRECTED: Use WarrantyCount
-
-        total_row = pd.DataFrame({
-            'Store': ['Total'],
-            'Warranty Sales (₹)': [total_warranty_sales],
-            'Warranty Units': [total_warranty_units],  # CORRECTED: Use WarrantyCount
-            'Count Conv (%)': [round(total_count_conv, 2)],
-            'Value Conv (%)': [round(total_value_conv, 2)],
-            'AHSP (₹)': [round(total_ahsp, 2)]
-        })
+        show_kpi_metrics(
+            display_df['WarrantyPrice'].sum(),
+            display_df['WarrantyCount'].sum(),  # CORRECTED: Use WarrantyCount for warranty units
+            display_df['TotalCount'].sum(),
+            display_df['TotalSoldPrice'].sum()
+        )
 
-        non_total_stores = store_display[store_display['Store'] != 'Total']
-        if value_conv_range != (min_conv, max_conv):
-            non_total_stores = non_total_stores[
-                (non_total_stores['Value Conv (%)'] >= value_conv_range[0]) & 
-                (non_total_stores['Value Conv (%)'] <= value_conv_range[1])
-            ]
-
-        sort_ascending = True if sort_order == "Ascending" else False
-        sort_column_mapping = {
-            "Count Conv (%)": "Count Conv (%)",
-            "Value Conv (%)": "Value Conv (%)", 
-            "AHSP (₹)": "AHSP (₹)",
-            "Warranty Sales (₹)": "Warranty Sales (₹)",
-            "Warranty Units": "Warranty Units"
-        }
-        sort_column = sort_column_mapping.get(sort_by, "Count Conv (%)")
-        non_total_stores = non_total_stores.sort_values(sort_column, ascending=sort_ascending)
-
-        final_store_display = pd.concat([non_total_stores, total_row], ignore_index=True)
-
-        def highlight_low_value_conversion(row):
-            if row['Value Conv (%)'] < 2.0 and row['Store'] != 'Total':
-                return ['background-color: #fee2e2'] * len(row)
-            return [''] * len(row)
-
-        styled_final_display = final_store_display.style.format({
-            'Warranty Sales (₹)': '₹{:,.0f}',
-            'Warranty Units': '{:,.0f}',
-            'Count Conv (%)': '{:.2f}%',
-            'Value Conv (%)': '{:.2f}%',
-            'AHSP (₹)': '₹{:.2f}'
-        }).apply(highlight_low_value_conversion, axis=1)
-
-        st.dataframe(styled_final_display, use_container_width=True)
-
-        # Generate filename based on selected sheets
+        # Section titles and file names follow the selected period
         if "All" in st.session_state.selected_sheets:
+            view_label = "All Months Combined"
             file_suffix = "all_months_combined"
         elif len(st.session_state.selected_sheets) == 1:
-            file_suffix = st.session_state.selected_sheets[0].lower().replace(' ', '_')
+            view_label = current_month
+            file_suffix = slugify(current_month)
         else:
+            view_label = "Combined View"
             file_suffix = f"{len(st.session_state.selected_sheets)}_months_combined"
 
-        st.download_button(
-            label="📥 Download Store Performance as Excel",
-            data=to_excel(final_store_display, 'Store Performance'),
-            file_name=f"store_performance_{file_suffix}.xlsx",
-            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+        # The summaries only depend on the filters, so sorting and the store slider reuse them in fragment reruns
+        # Major appliances stay as separate rows; everything else is grouped as SMALL APPLIANCE
+        # (display_df may be the shared cube, so it is not modified)
+        grouped_category = map_distinct(display_df['Item Category'], lambda category: category if category in MAJOR_APPLIANCES else 'SMALL APPLIANCE')
+        performance_summaries = {
+            'store': summarise_performance(display_df, 'Store', 'store'),
+            'staff': summarise_performance(display_df, ['Staff Name', 'Store'], 'staff'),
+            'rbm': summarise_performance(display_df, 'RBM', 'rbm'),
+            'category': summarise_performance(display_df, grouped_category.rename('Grouped Category'), 'category'),
+            'item_category': summarise_performance(display_df, 'Item Category', 'item_category')
+        }
+
+        show_performance_tables(
+            performance_summaries,
+            view_label,
+            file_suffix,
+            load_statistics['value_conv_bounds'],
+            sort_slot,
+            value_conv_slot,
+            export_format,
+            export_tables
         )
-
-        # Staff Performance Table
-        if "All" in st.session_state.selected_sheets:
-            st.markdown(f'<h3 class="subheader">👨‍💼 Staff Performance Analysis - All Months Combined</h3>', unsafe_allow_html=True)
-        elif len(st.session_state.selected_sheets) == 1:
-            st.markdown(f'<h3 class="subheader">👨‍💼 Staff Performance Analysis - {current_month}</h3>', unsafe_allow_html=True)
-        else:
-            st.markdown(f'<h3 class="subheader">👨‍💼 Staff Performance Analysis - Combined View</h3>', unsafe_allow_html=True)
-
-        staff_summary = display_df.groupby(['Staff Name', 'Store']).agg({
-            'TotalSoldPrice': 'sum',
-            'WarrantyPrice': 'sum',
-            'TotalCount': 'sum',
-            'WarrantyCount': 'sum'  # CORRECTED: Include WarrantyCount
-        }).reset_index()
-
-        # CORRECTED: Use WarrantyCount for count conversion and warranty units
-        staff_summary['Count Conv (%)'] = (staff_summary['WarrantyCount'] / staff_summary['TotalCount'] * 100).round(2)
-        staff_summary['Value Conv (%)'] = (staff_summary['WarrantyPrice'] / staff_summary['TotalSoldPrice'] * 100).round(2)
-        staff_summary['AHSP'] = (staff_summary['WarrantyPrice'] / staff_summary['WarrantyCount']).where(staff_summary['WarrantyCount'] > 0, 0).round(2)
-
-        staff_summary['Count Conv (%)'] = staff_summary['Count Conv (%)'].replace([float('inf'), -float('inf')], 0).fillna(0)
-        staff_summary['Value Conv (%)'] = staff_summary['Value Conv (%)'].replace([float('inf'), -float('inf')], 0).fillna(0)
-
-        staff_display = staff_summary[['Staff Name', 'Store', 'Value Conv (%)', 'Count Conv (%)', 'WarrantyPrice', 'WarrantyCount', 'AHSP']].copy()  # CORRECTED: Use WarrantyCount
-        staff_display.columns = ['Staff Name', 'Store', 'Value Conv (%)', 'Count Conv (%)', 'Warranty Sales (₹)', 'Warranty Units', 'AHSP (₹)']
-        
-        # Apply sorting to staff performance table
-        staff_sort_column_mapping = {
-            "Count Conv (%)": "Count Conv (%)",
-            "Value Conv (%)": "Value Conv (%)", 
-            "AHSP (₹)": "AHSP (₹)",
-            "Warranty Sales (₹)": "Warranty Sales (₹)",
-            "Warranty Units": "Warranty Units"
-        }
-        staff_sort_column = staff_sort_column_mapping.get(sort_by, "Count Conv (%)")
-        staff_display = staff_display.sort_values(staff_sort_column, ascending=sort_ascending)
-        
-        # Add total row to staff performance table
-        total_staff_row = pd.DataFrame({
-            'Staff Name': ['Total'],
-            'Store': [''],
-            'Value Conv (%)': [round((staff_summary['WarrantyPrice'].sum() / staff_summary['TotalSoldPrice'].sum() * 100) if staff_summary['TotalSoldPrice'].sum() > 0 else 0, 2)],
-            'Count Conv (%)': [round((staff_summary['WarrantyCount'].sum() / staff_summary['TotalCount'].sum() * 100) if staff_summary['TotalCount'].sum() > 0 else 0, 2)],
-            'Warranty Sales (₹)': [staff_summary['WarrantyPrice'].sum()],
-            'Warranty Units': [staff_summary['WarrantyCount'].sum()],
-            'AHSP (₹)': [round((staff_summary['WarrantyPrice'].sum() / staff_summary['WarrantyCount'].sum()) if staff_summary['WarrantyCount'].sum() > 0 else 0, 2)]
-        })
-        
-        staff_display_with_total = pd.concat([staff_display, total_staff_row], ignore_index=True)
-
-        st.dataframe(staff_display_with_total.style.format({
-            'Value Conv (%)': '{:.2f}%',
-            'Count Conv (%)': '{:.2f}%',
-            'Warranty Sales (₹)': '₹{:.0f}',
-            'Warranty Units': '{:.0f}',
-            'AHSP (₹)': '₹{:.2f}'
-        }), use_container_width=True)
-
-        st.download_button(
-            label="📥 Download Staff Performance as Excel",
-            data=to_excel(staff_display_with_total, 'Staff Performance'),
-            file_name=f"staff_performance_{file_suffix}.xlsx",
-            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-        )
-
-        # RBM Performance
-        if "All" in st.session_state.selected_sheets:
-            st.markdown(f'<h3 class="subheader">👥 RBM Performance Analysis - All Months Combined</h3>', unsafe_allow_html=True)
-        elif len(st.session_state.selected_sheets) == 1:
-            st.markdown(f'<h3 class="subheader">👥 RBM Performance Analysis - {current_month}</h3>', unsafe_allow_html=True)
-        else:
-            st.markdown(f'<h3 class="subheader">👥 RBM Performance Analysis - Combined View</h3>', unsafe_allow_html=True)
-
-        rbm_summary = display_df.groupby('RBM').agg({
-            'TotalSoldPrice': 'sum',
-            'WarrantyPrice': 'sum',
-            'TotalCount': 'sum',
-            'WarrantyCount': 'sum'  # CORRECTED: Include WarrantyCount
-        }).reset_index()
-
-        # CORRECTED: Use WarrantyCount for count conversion and warranty units
-        rbm_summary['Count Conv (%)'] = (rbm_summary['WarrantyCount'] / rbm_summary['TotalCount'] * 100).round(2)
-        rbm_summary['Value Conv (%)'] = (rbm_summary['WarrantyPrice'] / rbm_summary['TotalSoldPrice'] * 100).round(2)
-        rbm_summary['AHSP'] = (rbm_summary['WarrantyPrice'] / rbm_summary['WarrantyCount']).where(rbm_summary['WarrantyCount'] > 0, 0).round(2)
-
-        rbm_summary['Count Conv (%)'] = rbm_summary['Count Conv (%)'].replace([float('inf'), -float('inf')], 0).fillna(0)
-        rbm_summary['Value Conv (%)'] = rbm_summary['Value Conv (%)'].replace([float('inf'), -float('inf')], 0).fillna(0)
-
-        rbm_display = rbm_summary[['RBM', 'Count Conv (%)', 'Value Conv (%)', 'AHSP', 'WarrantyPrice', 'WarrantyCount']]  # CORRECTED: Use WarrantyCount
-        rbm_display.columns = ['RBM', 'Count Conv (%)', 'Value Conv (%)', 'AHSP (₹)', 'Warranty Sales (₹)', 'Warranty Units']
-        
-        # Apply sorting to RBM performance table
-        rbm_sort_column_mapping = {
-            "Count Conv (%)": "Count Conv (%)",
-            "Value Conv (%)": "Value Conv (%)", 
-            "AHSP (₹)": "AHSP (₹)",
-            "Warranty Sales (₹)": "Warranty Sales (₹)",
-            "Warranty Units": "Warranty Units"
-        }
-        rbm_sort_column = rbm_sort_column_mapping.get(sort_by, "Count Conv (%)")
-        rbm_display = rbm_display.sort_values(rbm_sort_column, ascending=sort_ascending)
-        
-        # Add total row to RBM performance table
-        total_rbm_row = pd.DataFrame({
-            'RBM': ['Total'],
-            'Count Conv (%)': [round((rbm_summary['WarrantyCount'].sum() / rbm_summary['TotalCount'].sum() * 100) if rbm_summary['TotalCount'].sum() > 0 else 0, 2)],
-            'Value Conv (%)': [round((rbm_summary['WarrantyPrice'].sum() / rbm_summary['TotalSoldPrice'].sum() * 100) if rbm_summary['TotalSoldPrice'].sum() > 0 else 0, 2)],
-            'AHSP (₹)': [round((rbm_summary['WarrantyPrice'].sum() / rbm_summary['WarrantyCount'].sum()) if rbm_summary['WarrantyCount'].sum() > 0 else 0, 2)],
-            'Warranty Sales (₹)': [rbm_summary['WarrantyPrice'].sum()],
-            'Warranty Units': [rbm_summary['WarrantyCount'].sum()]
-        })
-        
-        rbm_display_with_total = pd.concat([rbm_display, total_rbm_row], ignore_index=True)
-
-        st.dataframe(rbm_display_with_total.style.format({
-            'Count Conv (%)': '{:.2f}%',
-            'Value Conv (%)': '{:.2f}%',
-            'AHSP (₹)': '₹{:.2f}',
-            'Warranty Sales (₹)': '₹{:.0f}',
-            'Warranty Units': '{:.0f}'
-        }), use_container_width=True)
-
-        st.download_button(
-            label="📥 Download RBM Performance as Excel",
-            data=to_excel(rbm_display_with_total, 'RBM Performance'),
-            file_name=f"rbm_performance_{file_suffix}.xlsx",
-            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-        )
-
-        # Product Category Performance with Small Appliance Grouping
-        if "All" in st.session_state.selected_sheets:
-            st.markdown(f'<h3 class="subheader">📦 Product Category Performance - All Months Combined</h3>', unsafe_allow_html=True)
-        elif len(st.session_state.selected_sheets) == 1:
-            st.markdown(f'<h3 class="subheader">📦 Product Category Performance - {current_month}</h3>', unsafe_allow_html=True)
-        else:
-            st.markdown(f'<h3 class="subheader">📦 Product Category Performance - Combined View</h3>', unsafe_allow_html=True)
-
-        # Define major appliances that should stay as separate rows
-        major_appliances = ['AC', 'TV', 'WASHING MACHINE', 'REFRIGERATOR', 'MICROWAVE OVEN', 'DISH WASHER', 'DRYER']
-
-        # Create a new column for the grouped category
-        display_df['Grouped Category'] = display_df['Item Category'].apply(
-            lambda x: 'SMALL APPLIANCE' if x not in major_appliances else x
-        )
-
-        category_summary = display_df.groupby('Grouped Category').agg({
-            'TotalSoldPrice': 'sum',
-            'WarrantyPrice': 'sum',
-            'TotalCount': 'sum',
-            'WarrantyCount': 'sum'  # CORRECTED: Include WarrantyCount
-        }).reset_index()
-
-        # CORRECTED: Use WarrantyCount for count conversion and warranty units
-        category_summary['Count Conv (%)'] = (category_summary['WarrantyCount'] / category_summary['TotalCount'] * 100).round(2)
-        category_summary['Value Conv (%)'] = (category_summary['WarrantyPrice'] / category_summary['TotalSoldPrice'] * 100).round(2)
-        category_summary['AHSP'] = (category_summary['WarrantyPrice'] / category_summary['WarrantyCount']).where(category_summary['WarrantyCount'] > 0, 0).round(2)
-
-        category_summary['Count Conv (%)'] = category_summary['Count Conv (%)'].replace([float('inf'), -float('inf')], 0).fillna(0)
-        category_summary['Value Conv (%)'] = category_summary['Value Conv (%)'].replace([float('inf'), -float('inf')], 0).fillna(0)
-
-        if not category_summary.empty:
-            category_display = category_summary[['Grouped Category', 'Count Conv (%)', 'Value Conv (%)', 'AHSP', 'WarrantyPrice', 'WarrantyCount']]  # CORRECTED: Use WarrantyCount
-            category_display.columns = ['Product Category', 'Count Conv (%)', 'Value Conv (%)', 'AHSP (₹)', 'Warranty Sales (₹)', 'Warranty Units']
-            
-            # Apply sorting to category performance table
-            category_sort_column_mapping = {
-                "Count Conv (%)": "Count Conv (%)",
-                "Value Conv (%)": "Value Conv (%)", 
-                "AHSP (₹)": "AHSP (₹)",
-                "Warranty Sales (₹)": "Warranty Sales (₹)",
-                "Warranty Units": "Warranty Units"
-            }
-            category_sort_column = category_sort_column_mapping.get(sort_by, "Count Conv (%)")
-            category_display = category_display.sort_values(category_sort_column, ascending=sort_ascending)
-            
-            # Add total row to category performance table
-            total_category_row = pd.DataFrame({
-                'Product Category': ['Total'],
-                'Count Conv (%)': [round((category_summary['WarrantyCount'].sum() / category_summary['TotalCount'].sum() * 100) if category_summary['TotalCount'].sum() > 0 else 0, 2)],
-                'Value Conv (%)': [round((category_summary['WarrantyPrice'].sum() / category_summary['TotalSoldPrice'].sum() * 100) if category_summary['TotalSoldPrice'].sum() > 0 else 0, 2)],
-                'AHSP (₹)': [round((category_summary['WarrantyPrice'].sum() / category_summary['WarrantyCount'].sum()) if category_summary['WarrantyCount'].sum() > 0 else 0, 2)],
-                'Warranty Sales (₹)': [category_summary['WarrantyPrice'].sum()],
-                'Warranty Units': [category_summary['WarrantyCount'].sum()]
-            })
-            
-            category_display_with_total = pd.concat([category_display, total_category_row], ignore_index=True)
-
-            st.dataframe(category_display_with_total.style.format({
-                'Count Conv (%)': '{:.2f}%',
-                'Value Conv (%)': '{:.2f}%',
-                'AHSP (₹)': '₹{:.2f}',
-                'Warranty Sales (₹)': '₹{:.0f}',
-                'Warranty Units': '{:.0f}'
-            }), use_container_width=True)
-
-            st.download_button(
-                label="📥 Download Product Category Performance as Excel",
-                data=to_excel(category_display_with_total, 'Product Category Performance'),
-                file_name=f"product_category_performance_{file_suffix}.xlsx",
-                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-            )
-        else:
-            st.warning("⚠️ No category data available with current filters.")
-
-        # Item Category Performance (Full Product Breakdown)
-        if "All" in st.session_state.selected_sheets:
-            st.markdown(f'<h3 class="subheader">📋 Item Category Performance - Full Product Breakdown - All Months Combined</h3>', unsafe_allow_html=True)
-        elif len(st.session_state.selected_sheets) == 1:
-            st.markdown(f'<h3 class="subheader">📋 Item Category Performance - Full Product Breakdown - {current_month}</h3>', unsafe_allow_html=True)
-        else:
-            st.markdown(f'<h3 class="subheader">📋 Item Category Performance - Full Product Breakdown - Combined View</h3>', unsafe_allow_html=True)
-
-        # Full item category performance without grouping
-        item_category_summary = display_df.groupby('Item Category').agg({
-            'TotalSoldPrice': 'sum',
-            'WarrantyPrice': 'sum',
-            'TotalCount': 'sum',
-            'WarrantyCount': 'sum'  # CORRECTED: Include WarrantyCount
-        }).reset_index()
-
-        # CORRECTED: Use WarrantyCount for count conversion and warranty units
-        item_category_summary['Count Conv (%)'] = (item_category_summary['WarrantyCount'] / item_category_summary['TotalCount'] * 100).round(2)
-        item_category_summary['Value Conv (%)'] = (item_category_summary['WarrantyPrice'] / item_category_summary['TotalSoldPrice'] * 100).round(2)
-        item_category_summary['AHSP'] = (item_category_summary['WarrantyPrice'] / item_category_summary['WarrantyCount']).where(item_category_summary['WarrantyCount'] > 0, 0).round(2)
-
-        item_category_summary['Count Conv (%)'] = item_category_summary['Count Conv (%)'].replace([float('inf'), -float('inf')], 0).fillna(0)
-        item_category_summary['Value Conv (%)'] = item_category_summary['Value Conv (%)'].replace([float('inf'), -float('inf')], 0).fillna(0)
-
-        if not item_category_summary.empty:
-            item_category_display = item_category_summary[['Item Category', 'Count Conv (%)', 'Value Conv (%)', 'AHSP', 'WarrantyPrice', 'WarrantyCount']]  # CORRECTED: Use WarrantyCount
-            item_category_display.columns = ['Item Category', 'Count Conv (%)', 'Value Conv (%)', 'AHSP (₹)', 'Warranty Sales (₹)', 'Warranty Units']
-            
-            # Apply sorting to item category performance table
-            item_category_sort_column_mapping = {
-                "Count Conv (%)": "Count Conv (%)",
-                "Value Conv (%)": "Value Conv (%)", 
-                "AHSP (₹)": "AHSP (₹)",
-                "Warranty Sales (₹)": "Warranty Sales (₹)",
-                "Warranty Units": "Warranty Units"
-            }
-            item_category_sort_column = item_category_sort_column_mapping.get(sort_by, "Count Conv (%)")
-            item_category_display = item_category_display.sort_values(item_category_sort_column, ascending=sort_ascending)
-            
-            # Add total row to item category performance table
-            total_item_category_row = pd.DataFrame({
-                'Item Category': ['Total'],
-                'Count Conv (%)': [round((item_category_summary['WarrantyCount'].sum() / item_category_summary['TotalCount'].sum() * 100) if item_category_summary['TotalCount'].sum() > 0 else 0, 2)],
-                'Value Conv (%)': [round((item_category_summary['WarrantyPrice'].sum() / item_category_summary['TotalSoldPrice'].sum() * 100) if item_category_summary['TotalSoldPrice'].sum() > 0 else 0, 2)],
-                'AHSP (₹)': [round((item_category_summary['WarrantyPrice'].sum() / item_category_summary['WarrantyCount'].sum()) if item_category_summary['WarrantyCount'].sum() > 0 else 0, 2)],
-                'Warranty Sales (₹)': [item_category_summary['WarrantyPrice'].sum()],
-                'Warranty Units': [item_category_summary['WarrantyCount'].sum()]
-            })
-            
-            item_category_display_with_total = pd.concat([item_category_display, total_item_category_row], ignore_index=True)
-
-            st.dataframe(item_category_display_with_total.style.format({
-                'Count Conv (%)': '{:.2f}%',
-                'Value Conv (%)': '{:.2f}%',
-                'AHSP (₹)': '₹{:.2f}',
-                'Warranty Sales (₹)': '₹{:.0f}',
-                'Warranty Units': '{:.0f}'
-            }), use_container_width=True)
-
-            st.download_button(
-                label="📥 Download Item Category Performance as Excel",
-                data=to_excel(item_category_display_with_total, 'Item Category Performance'),
-                file_name=f"item_category_performance_{file_suffix}.xlsx",
-                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-            )
-        else:
-            st.info("ℹ️ No item category data available with current filters.")
+    
+    # Aggregate the monthly measures once per grouping; the sales and value conversion views share them
+    rbm_monthly_measures = build_monthly_measures(
+        individual_data, 
+        st.session_state.comparison_filters, 
+        category_column,
+        replacement_filter,
+        speaker_filter,
+        'RBM'
+    )
+    product_monthly_measures = build_monthly_measures(
+        individual_data, 
+        st.session_state.comparison_filters, 
+        category_column,
+        replacement_filter,
+        speaker_filter,
+        'Product'
+    )
     
     # NEW: RBM-WISE MONTHLY SUMMARY TABLE
     st.markdown(f'<h3 class="subheader">👥 RBM-wise Monthly Warranty Sales Summary</h3>', unsafe_allow_html=True)
@@ -2353,7 +3313,8 @@ if st.session_state.data_loaded and st.session_state.current_df is not None:
         st.session_state.comparison_filters, 
         category_column,
         replacement_filter,
-        speaker_filter
+        speaker_filter,
+        rbm_monthly_measures
     )
     
     if not rbm_summary_table.empty:
@@ -2361,11 +3322,13 @@ if st.session_state.data_loaded and st.session_state.current_df is not None:
         st.dataframe(rbm_summary_table, use_container_width=True)
         
         # Download button for the RBM summary
-        st.download_button(
-            label="📥 Download RBM Monthly Summary as Excel",
-            data=to_excel(rbm_summary_table, 'RBM Monthly Summary'),
-            file_name="rbm_monthly_summary.xlsx",
-            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+        table_download_button(
+            label="📥 Download RBM Monthly Summary",
+            df=rbm_summary_table,
+            sheet_name='RBM Monthly Summary',
+            file_stem="rbm_monthly_summary",
+            export_format=export_format,
+            bundle=export_tables
         )
     else:
         st.info("No RBM summary data available with current filters.")
@@ -2379,7 +3342,8 @@ if st.session_state.data_loaded and st.session_state.current_df is not None:
         st.session_state.comparison_filters, 
         category_column,
         replacement_filter,
-        speaker_filter
+        speaker_filter,
+        rbm_monthly_measures
     )
     
     if not rbm_value_conversion_table.empty:
@@ -2387,11 +3351,13 @@ if st.session_state.data_loaded and st.session_state.current_df is not None:
         st.dataframe(rbm_value_conversion_table, use_container_width=True)
         
         # Download button for the RBM value conversion summary
-        st.download_button(
-            label="📥 Download RBM Value Conversion Summary as Excel",
-            data=to_excel(rbm_value_conversion_table, 'RBM Value Conv Summary'),
-            file_name="rbm_value_conversion_summary.xlsx",
-            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+        table_download_button(
+            label="📥 Download RBM Value Conversion Summary",
+            df=rbm_value_conversion_table,
+            sheet_name='RBM Value Conv Summary',
+            file_stem="rbm_value_conversion_summary",
+            export_format=export_format,
+            bundle=export_tables
         )
     else:
         st.info("No RBM value conversion summary data available with current filters.")
@@ -2405,7 +3371,8 @@ if st.session_state.data_loaded and st.session_state.current_df is not None:
         st.session_state.comparison_filters, 
         category_column,
         replacement_filter,
-        speaker_filter
+        speaker_filter,
+        product_monthly_measures
     )
     
     if not product_summary_table.empty:
@@ -2413,11 +3380,13 @@ if st.session_state.data_loaded and st.session_state.current_df is not None:
         st.dataframe(product_summary_table, use_container_width=True)
         
         # Download button for the product summary
-        st.download_button(
-            label="📥 Download Product Monthly Summary as Excel",
-            data=to_excel(product_summary_table, 'Product Monthly Summary'),
-            file_name="product_monthly_summary.xlsx",
-            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+        table_download_button(
+            label="📥 Download Product Monthly Summary",
+            df=product_summary_table,
+            sheet_name='Product Monthly Summary',
+            file_stem="product_monthly_summary",
+            export_format=export_format,
+            bundle=export_tables
         )
     else:
         st.info("No product summary data available with current filters.")
@@ -2431,7 +3400,8 @@ if st.session_state.data_loaded and st.session_state.current_df is not None:
         st.session_state.comparison_filters, 
         category_column,
         replacement_filter,
-        speaker_filter
+        speaker_filter,
+        product_monthly_measures
     )
     
     if not product_value_conversion_table.empty:
@@ -2439,11 +3409,13 @@ if st.session_state.data_loaded and st.session_state.current_df is not None:
         st.dataframe(product_value_conversion_table, use_container_width=True)
         
         # Download button for the product value conversion summary
-        st.download_button(
-            label="📥 Download Product Value Conversion Summary as Excel",
-            data=to_excel(product_value_conversion_table, 'Product Value Conv Summary'),
-            file_name="product_value_conversion_summary.xlsx",
-            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+        table_download_button(
+            label="📥 Download Product Value Conversion Summary",
+            df=product_value_conversion_table,
+            sheet_name='Product Value Conv Summary',
+            file_stem="product_value_conversion_summary",
+            export_format=export_format,
+            bundle=export_tables
         )
     else:
         st.info("No product value conversion summary data available with current filters.")
@@ -2452,11 +3424,28 @@ if st.session_state.data_loaded and st.session_state.current_df is not None:
     st.markdown(f'<h3 class="subheader">📈 Monthly Warranty Sales Trend</h3>', unsafe_allow_html=True)
     
     # Create and display the monthly trend chart
-    trend_chart = create_monthly_trend_chart(st.session_state.individual_month_data)
+    trend_chart = create_monthly_trend_chart(load_statistics['monthly_warranty_sales'])
     if trend_chart:
         st.plotly_chart(trend_chart, use_container_width=True)
     else:
         st.info("No trend data available to display.")
+    
+    # MULTI-MONTH COMPARISON SECTION - Month-over-month metrics when more than two months are loaded
+    if len(individual_data) > 2:
+        show_period_comparison(filtered_df, [sheet for sheet in SHEETS if sheet in individual_data], export_format, export_tables)
+
+    # Export everything - one sheet per table above, built only when the button is clicked
+    if export_tables:
+        with st.sidebar:
+            st.markdown('<hr>', unsafe_allow_html=True)
+            bundle_data, bundle_extension, bundle_mime = export_download(export_tables, export_format)
+            st.download_button(
+                label=f"📦 Download All Tables as {export_format}",
+                data=bundle_data,
+                file_name=f"warranty_dashboard_{slugify(period_text)}.{bundle_extension}",
+                mime=bundle_mime,
+                help="One Excel workbook with a sheet per table, or a zip archive with a file per table"
+            )
 
 else:
     if not st.session_state.data_loaded and st.session_state.selected_sheets:
@@ -2468,3 +3457,8 @@ else:
         st.warning("⚠️ Please select at least one month from the sidebar to view data.")
     else:
         st.error("❌ Failed to load data from Google Sheets. Please check the Apps Script URL, Spreadsheet ID, or network connection.")
+
+# Timing breakdown of this rerun, for whoever opened the dashboard with ?debug=1
+record_span({"name": "rerun", "category": "rerun", "duration_ms": round((time.perf_counter() - RERUN_STARTED) * 1000, 3)})
+if DEBUG_PANEL_DEFAULT or st.query_params.get("debug") == "1":
+    show_trace_panel(TRACE_SPANS, st.session_state.load_trace)
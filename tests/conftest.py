@@ -0,0 +1,44 @@
+"""Shared fixtures: a mock_apps_script stand-in on a free port for the dashboard to load from"""
+import os
+import sys
+import threading
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from helpers import restart_server
+from mock_apps_script import SheetStore, make_handler
+
+ROWS_PER_SHEET = 300
+
+@pytest.fixture
+def served_requests():
+    """The path of every request the stand-in answered, in order"""
+    return []
+
+@pytest.fixture
+def sheet_store(request, served_requests, monkeypatch, tmp_path):
+    """Start a stand-in server and point the dashboard at it, with an empty month cache
+
+    Parametrize indirectly with a response layout to have the server answer in that layout only.
+    """
+    store = SheetStore(rows_per_sheet=ROWS_PER_SHEET)
+
+    class RecordingHandler(make_handler(store, fixed_format=getattr(request, 'param', None))):
+        def do_GET(self):
+            served_requests.append(self.path)
+            super().do_GET()
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), RecordingHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setenv('APPS_SCRIPT_URL', f"http://127.0.0.1:{server.server_address[1]}/exec")
+    monkeypatch.setenv('MONTH_CACHE_DIR', str(tmp_path / 'month_cache'))
+
+    # Cached months live in the test process, so every test starts like a fresh server
+    restart_server()
+    yield store
+    server.shutdown()
+    server.server_close()
@@ -0,0 +1,78 @@
+"""Helpers to drive the dashboard through AppTest and work out the figures it should show"""
+import os
+import random
+from urllib.parse import parse_qs, urlparse
+
+import pandas as pd
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+
+from mock_apps_script import make_row
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'streamlit_app.py')
+
+def open_dashboard(months):
+    """Start a session with the given months selected and run it until their data is shown"""
+    at = AppTest.from_file(APP_PATH, default_timeout=60)
+    at.session_state.selected_sheets = list(months)
+    at.run()
+    assert not at.exception, at.exception
+    return at
+
+def restart_server():
+    """Drop what the Streamlit process keeps in memory, as a restart would; the disk cache stays"""
+    st.cache_data.clear()
+    st.cache_resource.clear()
+
+def kpis(at):
+    """Return the headline KPI metrics as {label: shown value}"""
+    return {metric.label: metric.value for metric in at.metric}
+
+def table(at, first_column):
+    """Return the first table whose leading column is first_column"""
+    return next(frame.value for frame in at.dataframe if frame.value.columns[0] == first_column)
+
+def expected_kpis(rows):
+    """Return the KPI metrics the dashboard should show for a frame of sheet rows"""
+    warranty, units = rows['WarrantyPrice'].sum(), rows['WarrantyCount'].sum()
+    count, sales = rows['TotalCount'].sum(), rows['TotalSoldPrice'].sum()
+    return {
+        '💰 Warranty Sales': f"₹{warranty:,.0f}",
+        '📦 Warranty Units': f"{units:,.0f}",
+        '📊 Count Conversion': f"{units / count * 100 if count > 0 else 0:.2f}%",
+        '📈 Value Conversion': f"{warranty / sales * 100 if sales > 0 else 0:.2f}%",
+        '💵 AHSP': f"₹{warranty / units if units > 0 else 0:,.2f}"
+    }
+
+def served_rows(store, months):
+    """Return the rows the stand-in currently serves for the given months as one frame"""
+    return pd.DataFrame([row for month in months for row in store.rows(month)])
+
+def append_rows(store, sheet_name, count, seed=0):
+    """Append rows to a served sheet, as the people filling it in would"""
+    rng = random.Random(f"{sheet_name}-{seed}")
+    store.rows(sheet_name)
+    store.sheets[sheet_name].extend(make_row(rng) for _ in range(count))
+
+def sheet_requests(served_requests, sheet_name):
+    """Return the query parameters of every request the stand-in answered for a sheet"""
+    queries = [parse_qs(urlparse(path).query) for path in served_requests]
+    return [query for query in queries if query.get('sheet') == [sheet_name]]
+
+def select(at, label, value):
+    """Choose a value in the selectbox with the given label and run the session again"""
+    next(box for box in at.selectbox if box.label == label).set_value(value).run()
+    assert not at.exception, at.exception
+    return at
+
+def tick(at, label):
+    """Tick the checkbox with the given label and run the session again"""
+    next(box for box in at.checkbox if box.label == label).check().run()
+    assert not at.exception, at.exception
+    return at
+
+def click(at, label):
+    """Click the button with the given label and run the session again"""
+    next(button for button in at.button if button.label == label).click().run()
+    assert not at.exception, at.exception
+    return at
@@ -0,0 +1,41 @@
+"""The two-month comparison shows the change between the served rows of each month"""
+import numpy as np
+
+from helpers import kpis, open_dashboard, served_rows, table, tick
+
+BEFORE, AFTER = '2025 OCT', '2025 NOV'
+MEASURES = ['WarrantyPrice', 'WarrantyCount', 'TotalCount', 'TotalSoldPrice']
+UNMATCHED = "Include stores, staff and categories present in only one month"
+
+def sums_by(store, month, keys):
+    return served_rows(store, [month]).groupby(keys)[MEASURES].sum()
+
+def test_store_changes_match_the_served_rows(sheet_store):
+    stores = table(open_dashboard([BEFORE, AFTER]), 'Store').set_index('Store')
+    before, after = sums_by(sheet_store, BEFORE, 'Store'), sums_by(sheet_store, AFTER, 'Store')
+
+    assert sorted(stores.index) == sorted(before.index.intersection(after.index))
+    before, after = before.loc[stores.index], after.loc[stores.index]
+    np.testing.assert_array_equal(stores['Warranty Sales Change (₹)'], after['WarrantyPrice'] - before['WarrantyPrice'])
+    np.testing.assert_array_equal(stores['Warranty Units Change'], after['WarrantyCount'] - before['WarrantyCount'])
+    value_conv = lambda sums: (sums['WarrantyPrice'] / sums['TotalSoldPrice'] * 100).round(2)
+    np.testing.assert_allclose(stores['Value Conv Change (%)'], value_conv(after) - value_conv(before), atol=1e-9)
+
+def test_overall_change_is_the_difference_of_the_month_totals(sheet_store):
+    at = open_dashboard([BEFORE, AFTER])
+    change = served_rows(sheet_store, [AFTER])['WarrantyPrice'].sum() - served_rows(sheet_store, [BEFORE])['WarrantyPrice'].sum()
+
+    assert kpis(at)['💰 Warranty Sales Change'] == f"₹{change:+,.0f}"
+
+def test_staff_seen_in_one_month_only_are_listed_on_request(sheet_store):
+    at = open_dashboard([BEFORE, AFTER])
+    keys = ['Staff Name', 'Store']
+    before, after = sums_by(sheet_store, BEFORE, keys), sums_by(sheet_store, AFTER, keys)
+
+    matched = table(at, 'Staff Name').set_index(keys)
+    assert sorted(matched.index) == sorted(before.index.intersection(after.index))
+
+    everyone = table(tick(at, UNMATCHED), 'Staff Name').set_index(keys)
+    assert sorted(everyone.index) == sorted(before.index.union(after.index))
+    only_after = after.index.difference(before.index)
+    np.testing.assert_array_equal(everyone.loc[only_after, 'Warranty Sales Change (₹)'], after.loc[only_after, 'WarrantyPrice'])
@@ -0,0 +1,80 @@
+"""Sidebar filters resolved through the filter index select the same rows as plain pandas masks"""
+import pytest
+
+from helpers import expected_kpis, kpis, open_dashboard, select, served_rows, tick
+
+MONTH = '2025 NOV'
+SPEAKER_CATEGORIES = ['SOUND BAR', 'PARTY SPEAKER', 'BLUETOOTH SPEAKER', 'HOME THEATRE']
+
+def busiest(rows, column):
+    """The value of a column with the most rows, so the filter keeps a fair share of the month"""
+    return rows[column].value_counts().index[0]
+
+# Each case maps the served rows to (sidebar settings, mask of the rows they should keep);
+# a setting is ('select', label, value) or ('tick', label)
+FILTER_CASES = {
+    'none': lambda rows: ([], rows.index == rows.index),
+    'bdm': lambda rows: ([('select', '👔 BDM', 'BDM 2')], rows['BDM'] == 'BDM 2'),
+    'rbm': lambda rows: ([('select', '👤 RBM', 'RBM 5')], rows['RBM'] == 'RBM 5'),
+    'store': lambda rows: ([('select', '🏪 Store', busiest(rows, 'Store'))], rows['Store'] == busiest(rows, 'Store')),
+    'staff': lambda rows: ([('select', '👨‍💼 Staff', busiest(rows, 'Staff Name'))], rows['Staff Name'] == busiest(rows, 'Staff Name')),
+    'category': lambda rows: ([('select', '📦 Item Category', 'TV')], rows['Item Category'] == 'TV'),
+    'future': lambda rows: ([('tick', '🏢 Show only FUTURE stores')], rows['Store'].str.contains('FUTURE')),
+    'speaker': lambda rows: ([('tick', '🔊 Show Speaker Categories Only')], rows['Item Category'].isin(SPEAKER_CATEGORIES)),
+    'bdm_category_future': lambda rows: (
+        [('select', '👔 BDM', 'BDM 3'), ('select', '📦 Item Category', 'AC'), ('tick', '🏢 Show only FUTURE stores')],
+        (rows['BDM'] == 'BDM 3') & (rows['Item Category'] == 'AC') & rows['Store'].str.contains('FUTURE')
+    )
+}
+
+@pytest.mark.parametrize('case', FILTER_CASES)
+def test_filtered_kpis_match_a_pandas_mask(sheet_store, case):
+    at = open_dashboard([MONTH])
+    rows = served_rows(sheet_store, [MONTH])
+    settings, mask = FILTER_CASES[case](rows)
+    assert mask.any()
+
+    for action, label, *value in settings:
+        if action == 'select':
+            select(at, label, *value)
+        else:
+            tick(at, label)
+
+    assert kpis(at) == expected_kpis(rows[mask])
+
+def test_replacement_filter_groups_item_categories(sheet_store):
+    at = open_dashboard([MONTH])
+    rows = served_rows(sheet_store, [MONTH])
+    fans = ['CEILING FAN', 'PEDESTAL FAN', 'TABLE FAN']
+    replacement_items = fans + ['MIXER GRINDER', 'IRON BOX', 'ELECTRIC KETTLE', 'OTG', 'GARMENTS STEAMER', 'INDUCTION COOKER']
+
+    tick(at, '🔄 Show Replacement Warranty Categories Only')
+    assert kpis(at) == expected_kpis(rows[rows['Item Category'].isin(replacement_items)])
+
+    category_box = next(box for box in at.selectbox if box.label == '📦 Replacement Category')
+    assert category_box.options == ['All', 'ELECTRIC KETTLE', 'FAN', 'INDUCTION COOKER', 'IRON BOX', 'MIXER GRINDER', 'OTG', 'STEAMER']
+    select(at, '📦 Replacement Category', 'FAN')
+    assert kpis(at) == expected_kpis(rows[rows['Item Category'].isin(fans)])
+
+def options(at, label):
+    return next(box for box in at.selectbox if box.label == label).options
+
+def test_dropdowns_offer_only_what_lies_under_the_selection_above(sheet_store):
+    rows = served_rows(sheet_store, [MONTH])
+    at = select(select(open_dashboard([MONTH]), '👔 BDM', 'BDM 2'), '👤 RBM', 'RBM 5')
+    bdm = rows[rows['BDM'] == 'BDM 2']
+    rbm = bdm[bdm['RBM'] == 'RBM 5']
+    store = busiest(rbm, 'Store')
+    select(at, '🏪 Store', store)
+
+    assert options(at, '👤 RBM') == ['All'] + sorted(bdm['RBM'].unique())
+    assert options(at, '🏪 Store') == ['All'] + sorted(rbm['Store'].unique())
+    assert options(at, '👨‍💼 Staff') == ['All'] + sorted(rbm.loc[rbm['Store'] == store, 'Staff Name'].unique())
+
+def test_a_selection_outside_the_new_branch_falls_back_to_all(sheet_store):
+    rows = served_rows(sheet_store, [MONTH])
+    at = select(open_dashboard([MONTH]), '🏪 Store', busiest(rows[rows['BDM'] == 'BDM 1'], 'Store'))
+    select(at, '👔 BDM', 'BDM 2')
+
+    assert next(box for box in at.selectbox if box.label == '🏪 Store').value == 'All'
+    assert kpis(at) == expected_kpis(rows[rows['BDM'] == 'BDM 2'])
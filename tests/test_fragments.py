@@ -0,0 +1,24 @@
+"""Controls inside a fragment update their own tables"""
+import numpy as np
+
+from helpers import open_dashboard, select, table
+
+def test_sort_controls_reorder_the_performance_tables(sheet_store):
+    at = open_dashboard(['2025 NOV'])
+    select(select(at, '📊 Sort All Tables By', 'Warranty Sales (₹)'), '↕️ Sort Order', 'Ascending')
+
+    for first_column in ['Store', 'RBM']:
+        rows = table(at, first_column)
+        sales = rows.loc[rows[first_column] != 'Total', 'Warranty Sales (₹)'].to_numpy()
+        assert np.all(np.diff(sales) >= 0)
+
+def test_value_conversion_slider_filters_the_store_table(sheet_store):
+    at = open_dashboard(['2025 NOV'])
+    slider = next(slider for slider in at.slider if 'Value Conversion' in slider.label)
+    low, high = slider.value
+    slider.set_value((round((low + high) / 2, 1), high)).run()
+    assert not at.exception, at.exception
+
+    stores = table(at, 'Store')
+    assert (stores.loc[stores['Store'] != 'Total', 'Value Conv (%)'] >= (low + high) / 2 - 0.1).all()
+    assert len(stores) < len(table(open_dashboard(['2025 NOV']), 'Store'))
@@ -0,0 +1,46 @@
+"""Syncing the live month: only the new rows are requested, and the result matches a full reload"""
+import os
+import shutil
+
+import pandas as pd
+
+from helpers import append_rows, click, expected_kpis, kpis, open_dashboard, restart_server, served_rows, sheet_requests
+
+LIVE_MONTH = '2025 DECEMBER'
+
+def full_reload(months):
+    """Open a session on the months with nothing cached in memory or on disk"""
+    restart_server()
+    shutil.rmtree(os.environ['MONTH_CACHE_DIR'], ignore_errors=True)
+    return open_dashboard(months)
+
+def sorted_rows(frame):
+    """Put a table's rows in a fixed order"""
+    return frame.sort_values(list(frame.columns)).reset_index(drop=True)
+
+def assert_same_tables(at, expected):
+    """Compare every table two sessions show"""
+    assert len(at.dataframe) == len(expected.dataframe)
+    for table, expected_table in zip(at.dataframe, expected.dataframe):
+        # Appended rows add their new names at the end of the categories, so rows with tied
+        # sort keys can come out in another order than after a full reload
+        pd.testing.assert_frame_equal(sorted_rows(table.value), sorted_rows(expected_table.value))
+
+def test_refresh_requests_only_the_rows_added_since_the_last_load(sheet_store, served_requests):
+    at = open_dashboard([LIVE_MONTH])
+    append_rows(sheet_store, LIVE_MONTH, 37)
+
+    click(at, "🔄 Refresh Live Month")
+
+    assert sheet_requests(served_requests, LIVE_MONTH)[-1]['after'] == ['300']
+    assert kpis(at) == expected_kpis(served_rows(sheet_store, [LIVE_MONTH]))
+    assert_same_tables(at, full_reload([LIVE_MONTH]))
+
+def test_a_live_month_that_shrank_is_loaded_again_in_full(sheet_store, served_requests):
+    at = open_dashboard([LIVE_MONTH])
+    del sheet_store.sheets[LIVE_MONTH][-50:]
+
+    click(at, "🔄 Refresh Live Month")
+
+    assert 'after' not in sheet_requests(served_requests, LIVE_MONTH)[-1]
+    assert kpis(at) == expected_kpis(served_rows(sheet_store, [LIVE_MONTH]))
@@ -0,0 +1,24 @@
+"""Tables rolled up from the measure cube show the same figures as the sheet rows"""
+import numpy as np
+
+from helpers import expected_kpis, kpis, open_dashboard, served_rows, table
+
+def test_all_months_show_the_totals_of_every_served_row(sheet_store):
+    at = open_dashboard(['All'])
+    rows = served_rows(sheet_store, list(sheet_store.sheets))
+
+    assert len(sheet_store.sheets) == 13
+    assert kpis(at) == expected_kpis(rows)
+
+def test_store_table_matches_the_served_rows(sheet_store):
+    stores = table(open_dashboard(['All']), 'Store').set_index('Store')
+    sums = served_rows(sheet_store, list(sheet_store.sheets)).groupby('Store')[['WarrantyPrice', 'WarrantyCount', 'TotalCount', 'TotalSoldPrice']].sum()
+
+    assert stores.loc['Total', 'Warranty Sales (₹)'] == sums['WarrantyPrice'].sum()
+    assert sorted(stores.index.drop('Total')) == sorted(sums.index)
+    stores = stores.loc[sums.index]
+    np.testing.assert_array_equal(stores['Warranty Sales (₹)'], sums['WarrantyPrice'])
+    np.testing.assert_array_equal(stores['Warranty Units'], sums['WarrantyCount'])
+    np.testing.assert_allclose(stores['Count Conv (%)'], (sums['WarrantyCount'] / sums['TotalCount'] * 100).round(2))
+    np.testing.assert_allclose(stores['Value Conv (%)'], (sums['WarrantyPrice'] / sums['TotalSoldPrice'] * 100).round(2))
+    np.testing.assert_allclose(stores['AHSP (₹)'], (sums['WarrantyPrice'] / sums['WarrantyCount']).round(2))
@@ -0,0 +1,113 @@
+"""The on-disk month cache: closed months survive a restart, the live month is fetched again"""
+import json
+import os
+import time
+
+from helpers import append_rows, click, expected_kpis, kpis, open_dashboard, restart_server, served_rows, sheet_requests
+
+CLOSED_MONTH = '2025 NOV'
+LIVE_MONTH = '2025 DECEMBER'
+
+def meta_path(sheet_name):
+    return os.path.join(os.environ['MONTH_CACHE_DIR'], f"{sheet_name.lower().replace(' ', '_')}.json")
+
+def update_meta(sheet_name, **changes):
+    """Change fields of a cached month's JSON sidecar"""
+    with open(meta_path(sheet_name), encoding='utf-8') as f:
+        meta = json.load(f)
+    with open(meta_path(sheet_name), 'w', encoding='utf-8') as f:
+        json.dump({**meta, **changes}, f)
+
+def test_closed_month_is_read_from_disk_after_a_restart(sheet_store, served_requests):
+    first_load = kpis(open_dashboard([CLOSED_MONTH]))
+    assert first_load == expected_kpis(served_rows(sheet_store, [CLOSED_MONTH]))
+    assert any(name.endswith('.parquet') for name in os.listdir(os.environ['MONTH_CACHE_DIR']))
+
+    # Rows the sheet gains now are never fetched: a closed month is served from disk for good
+    append_rows(sheet_store, CLOSED_MONTH, 20)
+    restart_server()
+
+    assert kpis(open_dashboard([CLOSED_MONTH])) == first_load
+    assert len(sheet_requests(served_requests, CLOSED_MONTH)) == 1
+
+def test_refresh_fetches_the_live_month_again(sheet_store):
+    at = open_dashboard([LIVE_MONTH])
+    append_rows(sheet_store, LIVE_MONTH, 20)
+
+    click(at, "🔄 Refresh Live Month")
+
+    assert kpis(at) == expected_kpis(served_rows(sheet_store, [LIVE_MONTH]))
+
+def test_adding_a_month_loads_only_that_month(sheet_store, served_requests):
+    at = open_dashboard(['2025 OCT', CLOSED_MONTH])
+    at.multiselect[0].set_value(['2025 OCT', CLOSED_MONTH, LIVE_MONTH]).run()
+
+    assert kpis(at) == expected_kpis(served_rows(sheet_store, ['2025 OCT', CLOSED_MONTH, LIVE_MONTH]))
+    assert [len(sheet_requests(served_requests, month)) for month in ['2025 OCT', CLOSED_MONTH, LIVE_MONTH]] == [1, 1, 1]
+
+def test_refresh_leaves_closed_months_alone(sheet_store, served_requests):
+    at = open_dashboard(['2025 OCT', CLOSED_MONTH, LIVE_MONTH])
+
+    click(at, "🔄 Refresh Live Month")
+
+    assert len(sheet_requests(served_requests, CLOSED_MONTH)) == 1
+    assert len(sheet_requests(served_requests, LIVE_MONTH)) == 2
+
+def test_reload_downloads_the_selected_months_again(sheet_store, served_requests):
+    at = open_dashboard([CLOSED_MONTH])
+    append_rows(sheet_store, CLOSED_MONTH, 20)
+
+    click(at, "♻️ Reload Selected Months")
+
+    assert kpis(at) == expected_kpis(served_rows(sheet_store, [CLOSED_MONTH]))
+    assert 'after' not in sheet_requests(served_requests, CLOSED_MONTH)[-1]
+
+def test_a_month_cached_while_live_is_synced_once_after_it_closed(sheet_store, served_requests):
+    open_dashboard([CLOSED_MONTH])
+    # Mark the copy as written while the month was still live
+    update_meta(CLOSED_MONTH, live=True)
+    append_rows(sheet_store, CLOSED_MONTH, 20)
+    restart_server()
+
+    assert kpis(open_dashboard([CLOSED_MONTH])) == expected_kpis(served_rows(sheet_store, [CLOSED_MONTH]))
+    assert sheet_requests(served_requests, CLOSED_MONTH)[-1]['after'] == ['300']
+
+    restart_server()
+    open_dashboard([CLOSED_MONTH])
+    assert len(sheet_requests(served_requests, CLOSED_MONTH)) == 2
+
+def test_a_rewrite_keeps_recently_replaced_files_for_concurrent_writers(sheet_store):
+    at = open_dashboard([LIVE_MONTH])
+    cache_dir = os.environ['MONTH_CACHE_DIR']
+    recent, old = [os.path.join(cache_dir, f"2025_december-{name}.parquet") for name in ['recent', 'old']]
+    for path in [recent, old]:
+        open(path, 'wb').close()
+    os.utime(old, (time.time() - 3600, time.time() - 3600))
+    append_rows(sheet_store, LIVE_MONTH, 20)
+
+    click(at, "🔄 Refresh Live Month")
+
+    assert os.path.exists(recent)
+    assert not os.path.exists(old)
+    assert not [name for name in os.listdir(cache_dir) if name.endswith('.tmp')]
+
+def test_a_closed_month_flagged_stale_is_synced_on_its_next_load(sheet_store, served_requests):
+    open_dashboard([CLOSED_MONTH])
+    update_meta(CLOSED_MONTH, stale=True)
+    append_rows(sheet_store, CLOSED_MONTH, 20)
+    restart_server()
+
+    assert kpis(open_dashboard([CLOSED_MONTH])) == expected_kpis(served_rows(sheet_store, [CLOSED_MONTH]))
+    assert sheet_requests(served_requests, CLOSED_MONTH)[-1]['after'] == ['300']
+    with open(meta_path(CLOSED_MONTH), encoding='utf-8') as f:
+        assert 'stale' not in json.load(f)
+
+def test_refresh_flags_the_live_month_stale_until_it_is_synced(sheet_store, served_requests):
+    at = open_dashboard([LIVE_MONTH])
+    update_meta(LIVE_MONTH, saved_at=time.time() + 3600)
+    append_rows(sheet_store, LIVE_MONTH, 20)
+
+    click(at, "🔄 Refresh Live Month")
+
+    assert kpis(at) == expected_kpis(served_rows(sheet_store, [LIVE_MONTH]))
+    assert sheet_requests(served_requests, LIVE_MONTH)[-1]['after'] == ['300']
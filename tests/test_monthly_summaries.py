@@ -0,0 +1,21 @@
+"""The RBM and product monthly summaries built from one grouped pass"""
+from helpers import open_dashboard, served_rows
+
+def monthly_table(at, first_column, value_suffix):
+    """Return the month-by-month summary led by first_column whose cells end with value_suffix"""
+    return next(
+        frame.value.set_index(first_column) for frame in at.dataframe
+        if frame.value.columns[0] == first_column and '2025 NOV' in frame.value.columns
+        and str(frame.value['2025 NOV'].iloc[0]).endswith(value_suffix)
+    )
+
+def test_rbm_value_conversion_summary_matches_the_served_rows(sheet_store):
+    summary = monthly_table(open_dashboard(['All']), 'RBM', '%')
+    rows = served_rows(sheet_store, list(sheet_store.sheets))
+    rows['Month'] = [month for month in sheet_store.sheets for _ in sheet_store.rows(month)]
+    sums = rows.groupby(['RBM', 'Month'])[['WarrantyPrice', 'TotalSoldPrice']].sum()
+    expected = (sums['WarrantyPrice'] / sums['TotalSoldPrice'] * 100).unstack('Month')
+
+    for rbm in expected.index:
+        for month in sheet_store.sheets:
+            assert summary.loc[rbm, month] == f"{expected.loc[rbm, month]:.2f}%", (rbm, month)
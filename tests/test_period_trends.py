@@ -0,0 +1,56 @@
+"""With three or more months loaded, the month-over-month view follows the served rows"""
+import numpy as np
+import pandas as pd
+
+from helpers import open_dashboard, select, served_rows, tick
+
+MONTHS = ['2025 SEP', '2025 OCT', '2025 NOV']
+
+def month_rows(store, months):
+    """The served rows of the given months with a Month column"""
+    return pd.concat([served_rows(store, [month]).assign(Month=month) for month in months])
+
+def period_view(at, months):
+    """The month-per-column view of the chosen metric"""
+    return next(frame.value for frame in at.dataframe if list(frame.value.columns) == months)
+
+def rolling_table(at, first_column):
+    """The table comparing a month with its rolling baseline"""
+    return next(frame.value for frame in at.dataframe
+                if frame.value.columns[0] == first_column and 'Warranty Sales Change (₹)' in frame.value.columns)
+
+def test_store_sales_per_month_match_the_served_rows(sheet_store):
+    at = select(select(open_dashboard(MONTHS), 'Compare by', 'Store'), 'Metric', 'Warranty Sales (₹)')
+    expected = month_rows(sheet_store, MONTHS).pivot_table(index='Store', columns='Month', values='WarrantyPrice', aggfunc='sum', fill_value=0)
+
+    shown = period_view(at, MONTHS)
+    assert sorted(shown.index) == sorted(expected.index)
+    np.testing.assert_array_equal(shown.loc[expected.index, MONTHS], expected[MONTHS])
+
+def test_changes_are_taken_from_the_previous_month(sheet_store):
+    at = tick(select(open_dashboard(MONTHS), 'Metric', 'Warranty Sales (₹)'), 'Show change from previous month')
+    totals = [served_rows(sheet_store, [month])['WarrantyPrice'].sum() for month in MONTHS]
+
+    overall = next(frame.value for frame in at.dataframe if 'Month' in frame.value.columns).set_index('Month')
+    np.testing.assert_array_equal(overall.loc[MONTHS, 'WarrantyPrice'], totals)
+    assert np.isnan(overall.loc[MONTHS[0], 'Warranty Sales Change'])
+    np.testing.assert_array_equal(overall.loc[MONTHS[1:], 'Warranty Sales Change'], np.diff(totals))
+    np.testing.assert_array_equal(period_view(at, MONTHS).loc['All', MONTHS[1:]], np.diff(totals))
+
+def test_latest_month_is_compared_with_the_average_of_the_months_before(sheet_store):
+    months = ['2025 AUG'] + MONTHS
+    at = select(open_dashboard(months), 'Compare by', 'Store')
+    sales = month_rows(sheet_store, months).pivot_table(index='Store', columns='Month', values='WarrantyPrice', aggfunc='sum')
+    both = sales[sales[MONTHS[-1]].notna() & sales[months[:-1]].notna().any(axis=1)]
+
+    shown = rolling_table(at, 'Store').set_index('Store')
+    assert sorted(shown.index) == sorted(both.index)
+    expected = both[MONTHS[-1]] - both[months[:-1]].fillna(0).mean(axis=1)
+    np.testing.assert_allclose(shown.loc[both.index, 'Warranty Sales Change (₹)'], expected)
+    assert any(f"{MONTHS[-1]} vs Avg 2025 AUG to {MONTHS[-2]}" in markdown.value for markdown in at.markdown)
+
+def test_the_first_loaded_month_has_no_baseline(sheet_store):
+    at = select(open_dashboard(MONTHS), 'Month to compare with its rolling baseline', MONTHS[0])
+
+    assert any(f"{MONTHS[0]} vs No baseline" in markdown.value for markdown in at.markdown)
+    assert any(f"No month before {MONTHS[0]}" in info.value for info in at.info)
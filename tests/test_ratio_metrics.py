@@ -0,0 +1,31 @@
+"""Count Conv, Value Conv and AHSP are 0 wherever their denominator is 0"""
+from helpers import expected_kpis, kpis, open_dashboard, select, served_rows, table
+
+MONTH = '2025 NOV'
+
+def add_store(store, name, **measures):
+    """Append one row for a store that has no other rows in the month"""
+    template = served_rows(store, [MONTH]).iloc[0].to_dict()
+    store.sheets[MONTH].append({**template, 'Store': name, 'Staff Name': f"STAFF {name}", **measures})
+
+def test_stores_without_warranties_or_sales_show_zero_rates(sheet_store):
+    add_store(sheet_store, 'STORE 901', TotalSoldPrice=25000, WarrantyPrice=0, TotalCount=1, WarrantyCount=0)
+    add_store(sheet_store, 'STORE 902', TotalSoldPrice=0, WarrantyPrice=0, TotalCount=0, WarrantyCount=0)
+    stores = table(open_dashboard([MONTH]), 'Store').set_index('Store')
+
+    assert stores.loc['STORE 901', ['Count Conv (%)', 'Value Conv (%)', 'AHSP (₹)']].tolist() == [0, 0, 0]
+    assert stores.loc['STORE 902', ['Count Conv (%)', 'Value Conv (%)', 'AHSP (₹)']].tolist() == [0, 0, 0]
+
+def test_kpis_of_a_store_without_warranties(sheet_store):
+    add_store(sheet_store, 'STORE 901', TotalSoldPrice=25000, WarrantyPrice=0, TotalCount=1, WarrantyCount=0)
+    at = select(open_dashboard([MONTH]), '🏪 Store', 'STORE 901')
+    rows = served_rows(sheet_store, [MONTH])
+
+    assert kpis(at) == expected_kpis(rows[rows['Store'] == 'STORE 901'])
+    assert kpis(at)['💵 AHSP'] == '₹0.00'
+
+def test_net_returns_with_negative_totals_show_zero_rates(sheet_store):
+    add_store(sheet_store, 'STORE 903', TotalSoldPrice=-30000, WarrantyPrice=-500, TotalCount=-1, WarrantyCount=-1)
+    stores = table(open_dashboard([MONTH]), 'Store').set_index('Store')
+
+    assert stores.loc['STORE 903', ['Count Conv (%)', 'Value Conv (%)', 'AHSP (₹)']].tolist() == [0, 0, 0]
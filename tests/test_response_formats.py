@@ -0,0 +1,30 @@
+"""Every layout the endpoint may answer with is parsed into the same month"""
+import pytest
+
+from helpers import append_rows, click, expected_kpis, kpis, open_dashboard, served_rows
+
+MONTH = '2025 NOV'
+LIVE_MONTH = '2025 DECEMBER'
+RESPONSE_FORMATS = ['records', 'rows', 'csv']
+
+@pytest.mark.parametrize('sheet_store', RESPONSE_FORMATS, indirect=True)
+def test_each_layout_shows_the_served_rows(sheet_store):
+    # A name with quotes, a comma and non-ASCII text has to survive JSON escapes and CSV quoting
+    sheet_store.rows(MONTH)
+    sheet_store.sheets[MONTH][0]['Staff Name'] = 'STAFF "Ré", 001'
+
+    at = open_dashboard([MONTH])
+    rows = served_rows(sheet_store, [MONTH])
+
+    assert kpis(at) == expected_kpis(rows)
+    staff_box = next(box for box in at.selectbox if box.label == '👨‍💼 Staff')
+    assert sorted(staff_box.options[1:]) == sorted(rows['Staff Name'].unique())
+
+@pytest.mark.parametrize('sheet_store', RESPONSE_FORMATS, indirect=True)
+def test_each_layout_syncs_the_live_month(sheet_store):
+    at = open_dashboard([LIVE_MONTH])
+    append_rows(sheet_store, LIVE_MONTH, 25)
+
+    click(at, "🔄 Refresh Live Month")
+
+    assert kpis(at) == expected_kpis(served_rows(sheet_store, [LIVE_MONTH]))
@@ -0,0 +1,53 @@
+"""Sessions viewing the same months share one dataset, which goes away with its last session"""
+import time
+
+from helpers import append_rows, expected_kpis, kpis, open_dashboard, served_rows, sheet_requests
+
+MONTH, OTHER_MONTH, LIVE_MONTH = '2025 NOV', '2025 OCT', '2025 DECEMBER'
+
+def handle(at):
+    return at.session_state['dataset_handle']
+
+def switch_months(at, months):
+    at.multiselect[0].set_value(months).run()
+    assert not at.exception, at.exception
+
+def test_a_second_session_reuses_the_loaded_dataset(sheet_store, served_requests):
+    first = open_dashboard([MONTH])
+    second = open_dashboard([MONTH])
+
+    assert handle(second).dataset is handle(first).dataset
+    assert len(sheet_requests(served_requests, MONTH)) == 1
+    assert handle(first).store.references[handle(first).dataset.key] == 2
+
+def test_a_dataset_is_dropped_with_its_last_session(sheet_store):
+    first, second = open_dashboard([MONTH]), open_dashboard([MONTH])
+    store, key = handle(first).store, handle(first).dataset.key
+
+    switch_months(first, [OTHER_MONTH])
+    assert store.references[key] == 1 and key in store.datasets
+
+    switch_months(second, [OTHER_MONTH])
+    assert key not in store.references and key not in store.datasets
+    assert handle(second).dataset is handle(first).dataset
+
+def later(monkeypatch, seconds):
+    """Move the clock on, past the live month's refresh window"""
+    now = time.time
+    monkeypatch.setattr(time, 'time', lambda: now() + seconds)
+
+def test_sessions_opened_in_different_minutes_share_an_unchanged_live_month(sheet_store, monkeypatch):
+    first = open_dashboard([LIVE_MONTH])
+    later(monkeypatch, 120)
+    second = open_dashboard([LIVE_MONTH])
+
+    assert handle(second).dataset is handle(first).dataset
+
+def test_rows_arriving_in_the_live_month_give_a_new_dataset(sheet_store, monkeypatch):
+    first = open_dashboard([LIVE_MONTH])
+    append_rows(sheet_store, LIVE_MONTH, 20)
+    later(monkeypatch, 120)
+    second = open_dashboard([LIVE_MONTH])
+
+    assert handle(second).dataset is not handle(first).dataset
+    assert kpis(second) == expected_kpis(served_rows(sheet_store, [LIVE_MONTH]))
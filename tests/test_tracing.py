@@ -0,0 +1,16 @@
+"""Spans of each rerun are appended to DASHBOARD_TRACE_FILE as JSON lines"""
+import json
+
+from helpers import open_dashboard
+
+def test_loading_a_month_writes_fetch_and_render_spans(sheet_store, monkeypatch, tmp_path):
+    trace_file = tmp_path / 'trace.jsonl'
+    monkeypatch.setenv('DASHBOARD_TRACE_FILE', str(trace_file))
+    open_dashboard(['2025 NOV'])
+
+    spans = [json.loads(line) for line in trace_file.read_text(encoding='utf-8').splitlines()]
+    categories = {span['category'] for span in spans}
+    assert {'fetch', 'transform', 'render'} <= categories
+    assert all(span['duration_ms'] >= 0 and span['run'] for span in spans)
+    fetches = [span for span in spans if span['category'] == 'fetch' and 'bytes' in span]
+    assert fetches and all(span['bytes'] > 0 for span in fetches)